@@ -1,18 +1,794 @@
-import tkinter as tk
-from tkinter import messagebox
+import math
+import operator
+import sys
+
+import metrics
+
+# Expression engine: bytecode operations, and binary operators as
+# symbol: (precedence, right associative, opcode); × and ÷ are the button forms
+PUSH, NEGATE, PERCENT, ADD, SUBTRACT, MULTIPLY, DIVIDE, POWER, LOAD = range(9)
+BINARY_OPERATORS = {
+    '+': (1, False, ADD),
+    '-': (1, False, SUBTRACT),
+    '×': (2, False, MULTIPLY),
+    '*': (2, False, MULTIPLY),
+    '÷': (2, False, DIVIDE),
+    '/': (2, False, DIVIDE),
+    '^': (3, True, POWER)
+}
+DIGITS = "0123456789"
+
+# Unary minus binds tighter than × but looser than ^, so -2^2 is -4
+UNARY_PRECEDENCE = 3
+
+# Operators the buttons append to the expression
+OPERATOR_SYMBOLS = "+-×÷^"
+
+# Arithmetic modes: binary floats (rounded to 8 places on display), or exact
+# decimal.Decimal / fractions.Fraction arithmetic
+MODE_FLOAT = 'float'
+MODE_DECIMAL = 'decimal'
+MODE_FRACTION = 'fraction'
+MODES = (MODE_FLOAT, MODE_DECIMAL, MODE_FRACTION)
+
+# Significant digits kept by decimal mode (the decimal module's own default)
+DECIMAL_PRECISION = 28
+
+# Largest power, or literal exponent, that the exact modes will expand
+EXACT_EXPONENT_LIMIT = 4096
+
+# Veltkamp splitting constant (2**27 + 1) and the magnitudes the exact float
+# fast path trusts, well inside the range where its error terms cannot underflow
+FLOAT_SPLITTER = 134217729.0
+FLOAT_EXACT_MIN = 2.0 ** -500
+FLOAT_EXACT_MAX = 2.0 ** 500
+FLOAT_EXACT_INTEGER = 2.0 ** 53
+
+# Compiled expressions kept by an ExpressionCache, and constant results memoised
+EXPRESSION_CACHE_SIZE = 1024
+RESULT_MEMO_SIZE = 4096
+
+# Lines per task for --eval-file; each worker holds about two chunks in flight
+EVAL_CHUNK_LINES = 10000
+
+# Rows read from a CSV file per evaluate_columns() call
+CSV_CHUNK_ROWS = 100000
+
+# Per-row error codes written by evaluate_columns(errors=...): (exception type, message)
+COLUMN_ERRORS = (
+    (None, ""),
+    (ZeroDivisionError, "Cannot divide by zero!"),
+    (ValueError, "Result is not a real number"),
+    (OverflowError, "Numerical result out of range"),
+    (ValueError, "Not a number")
+)
+ROW_DIVIDE_BY_ZERO, ROW_NOT_REAL, ROW_OVERFLOW, ROW_NOT_A_NUMBER = range(1, 5)
+
+# GUI modules, imported when a Calculator window is created so headless use never loads Tk
+tk = None
+messagebox = None
+
+def load_gui_modules():
+    """Import tkinter and messagebox into the module globals"""
+    global tk, messagebox
+    import tkinter as tk
+    from tkinter import messagebox
+
+def format_result(result, mode=MODE_FLOAT, precision=DECIMAL_PRECISION):
+    """Format a result for the display (drop unnecessary decimals)"""
+    if mode == MODE_DECIMAL:
+        if result and not -precision <= result.adjusted() < precision:
+            # Digits past the precision were never computed, so they are not printed as zeros
+            mantissa, _, exponent = str(result).partition('E')
+            if '.' in mantissa:
+                mantissa = mantissa.rstrip('0').rstrip('.')
+            return f"{mantissa}E{exponent}"
+        if result == result.to_integral_value():
+            return int(result)
+        return format(result, 'f').rstrip('0')
+    if mode == MODE_FRACTION:
+        return _format_fraction(result)
+    if not math.isfinite(result):
+        # A float step such as 1e308*10 overflowed to inf, or inf - inf gave nan
+        exception, message = COLUMN_ERRORS[ROW_OVERFLOW if math.isinf(result) else ROW_NOT_A_NUMBER]
+        raise exception(message)
+    if result == int(result):
+        return int(result)
+    return round(result, 8)  # Round to 8 decimal places
+
+def _format_fraction(result):
+    """Whole numbers and terminating decimals in full, anything else as numerator/denominator"""
+    numerator, denominator = result.numerator, result.denominator
+    if denominator == 1:
+        return numerator
+    twos = (denominator & -denominator).bit_length() - 1
+    rest = denominator >> twos
+    fives = 0
+    while rest % 5 == 0:
+        rest //= 5
+        fives += 1
+    if rest != 1:
+        return f"{numerator}/{denominator}"
+    places = max(twos, fives)
+    digits = str(abs(numerator) * 10 ** places // denominator).rjust(places + 1, '0')
+    text = (digits[:-places] + '.' + digits[-places:]).rstrip('0')
+    return '-' + text if numerator < 0 else text
+
+class ExpressionError(ValueError):
+    """A calculator expression that cannot be parsed"""
+    
+    def __init__(self, message, position):
+        super().__init__(message)
+        self.position = position
+
+def error_message(error):
+    """Text shown for an evaluation error, in the display and in batch output"""
+    if isinstance(error, (ArithmeticError, ValueError)):
+        # Evaluation raises these with readable messages, such as the COLUMN_ERRORS ones
+        return str(error)
+    return "Invalid calculation"
+
+def tokenize(text):
+    """Split an expression into (kind, text, position) tokens
+    
+    kind is 'number', 'name', 'operator', '(', ')' or '%'. Numbers may carry
+    an exponent, as in the 1e-05 that str() gives for small results; names
+    are variables such as x or unit_price.
+    """
+    tokens = []
+    position = 0
+    length = len(text)
+    while position < length:
+        char = text[position]
+        if char in DIGITS or char == '.':
+            start = position
+            while position < length and (text[position] in DIGITS or text[position] == '.'):
+                position += 1
+            if position < length and text[position] in 'eE':
+                exponent = position + 1
+                if exponent < length and text[exponent] in '+-':
+                    exponent += 1
+                if exponent < length and text[exponent] in DIGITS:
+                    position = exponent
+                    while position < length and text[position] in DIGITS:
+                        position += 1
+            tokens.append(('number', text[start:position], start))
+        elif char in BINARY_OPERATORS:
+            tokens.append(('operator', char, position))
+            position += 1
+        elif char.isalpha() or char == '_':
+            start = position
+            while position < length and (text[position].isalnum() or text[position] == '_'):
+                position += 1
+            tokens.append(('name', text[start:position], start))
+        elif char in '()%':
+            tokens.append((char, char, position))
+            position += 1
+        elif char.isspace():
+            position += 1
+        else:
+            raise ExpressionError(f"Unexpected character '{char}'", position)
+    return tokens
+
+class _Parser:
+    """Precedence-climbing parser that emits bytecode as it reads the tokens"""
+    
+    def __init__(self, text):
+        self.text = text
+        self.tokens = tokenize(text)
+        self.index = 0
+        self.code = []
+        self.names = {}
+    
+    def peek(self):
+        return self.tokens[self.index] if self.index < len(self.tokens) else None
+    
+    def parse(self):
+        if not self.tokens:
+            raise ExpressionError("Empty expression", 0)
+        self.binary(1)
+        token = self.peek()
+        if token is not None:
+            raise ExpressionError(f"Unexpected '{token[1]}'", token[2])
+        return self.code
+    
+    def binary(self, min_precedence):
+        """Parse operands joined by operators binding at least as tightly as min_precedence"""
+        self.unary()
+        while True:
+            token = self.peek()
+            if token is None or token[0] != 'operator':
+                return
+            precedence, right_associative, opcode = BINARY_OPERATORS[token[1]]
+            if precedence < min_precedence:
+                return
+            self.index += 1
+            self.binary(precedence if right_associative else precedence + 1)
+            self.code.append((opcode, None))
+    
+    def unary(self):
+        token = self.peek()
+        if token is not None and token[1] in '+-':
+            self.index += 1
+            self.binary(UNARY_PRECEDENCE)
+            if token[1] == '-':
+                self.code.append((NEGATE, None))
+            return
+        
+        self.primary()
+        token = self.peek()
+        while token is not None and token[0] == '%':
+            self.code.append((PERCENT, None))
+            self.index += 1
+            token = self.peek()
+    
+    def primary(self):
+        token = self.peek()
+        if token is None:
+            raise ExpressionError("Incomplete expression", len(self.text))
+        kind, value, position = token
+        self.index += 1
+        if kind == 'number':
+            # Literals stay as text so each arithmetic mode can convert them exactly
+            try:
+                float(value)
+            except ValueError:
+                raise ExpressionError(f"Invalid number '{value}'", position) from None
+            self.code.append((PUSH, value))
+        elif kind == 'name':
+            # Variables are bound when the expression is evaluated
+            self.names.setdefault(value, position)
+            self.code.append((LOAD, value))
+        elif kind == '(':
+            self.binary(1)
+            closing = self.peek()
+            if closing is None or closing[0] != ')':
+                raise ExpressionError("Missing ')'", closing[2] if closing else len(self.text))
+            self.index += 1
+        else:
+            raise ExpressionError(f"Unexpected '{value}'", position)
+
+def _divide(left, right):
+    if right == 0:
+        raise ZeroDivisionError("Cannot divide by zero!")
+    return left / right
+
+def _power(left, right):
+    if left == 0 and right < 0:
+        raise ZeroDivisionError("Cannot divide by zero!")
+    try:
+        result = left ** right
+    except OverflowError:
+        # float pow reports this as "(34, 'Numerical result out of range')"
+        raise OverflowError("Numerical result out of range") from None
+    if isinstance(result, complex):
+        raise ValueError("Result is not a real number")
+    return result
+
+def _exact_power(left, right):
+    if hasattr(right, 'denominator'):
+        # Fraction ** Fraction would quietly return a float, and big powers grow without bound
+        if right.denominator != 1:
+            raise ValueError("Fraction mode only supports whole-number powers")
+        if abs(right) > EXACT_EXPONENT_LIMIT:
+            raise OverflowError("Power is too large for exact arithmetic")
+    return _power(left, right)
+
+# Functions for the binary opcodes, indexed by opcode
+BINARY_FUNCTIONS = (None, None, None, operator.add, operator.sub, operator.mul, _divide, _power)
+EXACT_BINARY_FUNCTIONS = BINARY_FUNCTIONS[:POWER] + (_exact_power,)
+
+def _run(code, functions):
+    """Evaluate bytecode with the given binary operator functions"""
+    stack = []
+    push = stack.append
+    pop = stack.pop
+    for opcode, constant in code:
+        if opcode == PUSH:
+            push(constant)
+        elif opcode == NEGATE:
+            stack[-1] = -stack[-1]
+        elif opcode == PERCENT:
+            stack[-1] = stack[-1] / 100
+        else:
+            right = pop()
+            stack[-1] = functions[opcode](stack[-1], right)
+    return stack[0]
+
+def _literal_ratio(text):
+    """Exact (numerator, denominator) of a literal such as '2.50', '.5' or '1e-05'"""
+    mantissa, _, exponent = text.lower().partition('e')
+    whole, _, fraction = mantissa.partition('.')
+    scale = int(exponent or 0) - len(fraction)
+    if abs(scale) > EXACT_EXPONENT_LIMIT:
+        raise OverflowError("Number is too large for exact arithmetic")
+    numerator = int(whole + fraction or '0')
+    if scale >= 0:
+        return numerator * 10 ** scale, 1
+    return numerator, 10 ** -scale
+
+def _float_is_exact(text):
+    """True if float(text) is exactly the decimal value written, within the fast path's range"""
+    value = float(text)
+    if value != 0.0 and not FLOAT_EXACT_MIN < abs(value) < FLOAT_EXACT_MAX:
+        return False
+    try:
+        numerator, denominator = _literal_ratio(text)
+    except OverflowError:
+        return False
+    float_numerator, float_denominator = value.as_integer_ratio()
+    return numerator * float_denominator == float_numerator * denominator
+
+def _product_error(left, right, product):
+    """Rounding error of product = left * right (Dekker), 0.0 when the product is exact"""
+    c = FLOAT_SPLITTER * left
+    left_high = c - (c - left)
+    left_low = left - left_high
+    c = FLOAT_SPLITTER * right
+    right_high = c - (c - right)
+    right_low = right - right_high
+    return ((left_high * right_high - product) + left_high * right_low + left_low * right_high) + left_low * right_low
+
+def _exact_float_operation(opcode, left, right):
+    """left (op) right in floats if no rounding happens, else None"""
+    if opcode == ADD or opcode == SUBTRACT:
+        if opcode == SUBTRACT:
+            right = -right
+        result = left + right
+        # Knuth's two-sum: what rounding dropped from left + right
+        partial = result - left
+        if (left - (result - partial)) + (right - partial) != 0.0:
+            return None
+    elif opcode == MULTIPLY:
+        result = left * right
+        if _product_error(left, right, result) != 0.0:
+            return None
+    elif opcode == DIVIDE:
+        if right == 0:
+            raise ZeroDivisionError("Cannot divide by zero!")
+        result = left / right
+        # The quotient is exact only if multiplying back gives left with no rounding
+        product = result * right
+        if product != left or _product_error(result, right, product) != 0.0:
+            return None
+    else:
+        if left == 0 and right < 0:
+            raise ZeroDivisionError("Cannot divide by zero!")
+        if right != int(right) or abs(right) > 64:
+            return None
+        result = 1.0
+        for _ in range(int(abs(right))):
+            result = _exact_float_operation(MULTIPLY, result, left)
+            if result is None:
+                return None
+        if right < 0:
+            return _exact_float_operation(DIVIDE, 1.0, result)
+    if result != 0.0 and not FLOAT_EXACT_MIN < abs(result) < FLOAT_EXACT_MAX:
+        return None
+    return result
+
+def _run_exact_float(code):
+    """Evaluate float bytecode, or return None as soon as a step would round"""
+    stack = []
+    push = stack.append
+    pop = stack.pop
+    for opcode, constant in code:
+        if opcode == PUSH:
+            push(constant)
+        elif opcode == NEGATE:
+            stack[-1] = -stack[-1]
+        else:
+            if opcode == PERCENT:
+                opcode, right = DIVIDE, 100.0
+            else:
+                right = pop()
+            left = stack[-1]
+            
+            # Whole-number sums and products well inside 2**53 are exact; anything else is checked
+            if opcode <= MULTIPLY and left.is_integer() and right.is_integer():
+                result = left + right if opcode == ADD else left - right if opcode == SUBTRACT else left * right
+                if -FLOAT_EXACT_INTEGER < result < FLOAT_EXACT_INTEGER:
+                    stack[-1] = result
+                    continue
+            result = _exact_float_operation(opcode, left, right)
+            if result is None:
+                return None
+            stack[-1] = result
+    return stack[0]
+
+class Expression:
+    """A compiled expression: flat stack bytecode that can be evaluated any number of times"""
+    
+    __slots__ = ('text', 'code', 'literals', 'names', '_exact_code', '_float_exact', '_column_plan')
+    
+    def __init__(self, text, code, names=None):
+        self.text = text
+        self.literals = tuple(literal for opcode, literal in code if opcode == PUSH)
+        self.code = tuple((opcode, float(literal) if opcode == PUSH else literal) for opcode, literal in code)
+        self.names = dict(names or {})
+        self._exact_code = {}
+        self._float_exact = None
+        self._column_plan = None
+    
+    def evaluate(self, mode=MODE_FLOAT, precision=DECIMAL_PRECISION, variables=None):
+        """Run the bytecode and return the (unformatted) result
+        
+        variables maps each name in the expression to a number (or, in the
+        exact modes, a numeric string such as '0.1').
+        
+        In fraction mode, expressions whose literals are exact binary floats
+        first run in floats with every step checked for rounding; the
+        Fraction bytecode is only used when a step would round. Decimal mode
+        always runs on Decimal, which the C decimal module makes about as
+        cheap as the checked floats.
+        """
+        if mode == MODE_FLOAT:
+            code = self.bind(self.code, variables, float) if self.names else self.code
+            return _run(code, BINARY_FUNCTIONS)
+        if mode == MODE_DECIMAL:
+            import decimal
+            with decimal.localcontext() as context:
+                context.prec = precision
+                code = self.exact_code(mode)
+                if self.names:
+                    code = self.bind(code, variables, decimal.Decimal)
+                try:
+                    return +_run(code, EXACT_BINARY_FUNCTIONS)
+                except decimal.Overflow:
+                    raise OverflowError("Numerical result out of range") from None
+                except decimal.InvalidOperation:
+                    # Such as a fractional power of a negative number
+                    raise ValueError("Result is not a real number") from None
+        if mode != MODE_FRACTION:
+            raise ValueError(f"Unknown arithmetic mode: {mode}")
+        
+        if self._float_exact is None:
+            self._float_exact = not self.names and all(_float_is_exact(literal) for literal in self.literals)
+        if self._float_exact:
+            result = _run_exact_float(self.code)
+            if result is not None:
+                from fractions import Fraction
+                return Fraction(result)
+        code = self.exact_code(mode)
+        if self.names:
+            from fractions import Fraction
+            code = self.bind(code, variables, Fraction)
+        return _run(code, EXACT_BINARY_FUNCTIONS)
+    
+    def bind(self, code, variables, convert):
+        """Replace each variable load in code with its converted value"""
+        values = {}
+        for name, position in self.names.items():
+            if variables is None or name not in variables:
+                raise ExpressionError(f"No value for '{name}'", position)
+            values[name] = convert(variables[name])
+        return tuple((PUSH, values[operand]) if opcode == LOAD else (opcode, operand) for opcode, operand in code)
+    
+    def exact_code(self, mode):
+        """Bytecode with literals converted to Decimal or Fraction, built once per mode"""
+        code = self._exact_code.get(mode)
+        if code is None:
+            if mode == MODE_DECIMAL:
+                from decimal import Decimal as convert
+            else:
+                from fractions import Fraction
+                def convert(literal):
+                    return Fraction(*_literal_ratio(literal))
+            literals = iter(self.literals)
+            code = self._exact_code[mode] = tuple(
+                (opcode, convert(next(literals)) if opcode == PUSH else constant)
+                for opcode, constant in self.code
+            )
+        return code
+    
+    def column_plan(self):
+        """Compile the bytecode into in-place array steps, built once
+        
+        Returns (steps, temporaries, result). Each step is (opcode, left,
+        right, slot) and writes temporary slot; operands and the result are
+        ('constant', value), ('name', name) or ('slot', index). Constant
+        subexpressions are folded, and a slot is reused as soon as the value
+        in it has been consumed, so a chain such as x*1.2 + y needs one array.
+        """
+        if self._column_plan is not None:
+            return self._column_plan
+        steps = []
+        stack = []
+        free = []
+        temporaries = 0
+        for opcode, operand in self.code:
+            if opcode == PUSH:
+                stack.append(('constant', operand))
+                continue
+            if opcode == LOAD:
+                stack.append(('name', operand))
+                continue
+            if opcode == NEGATE or opcode == PERCENT:
+                left, right = stack.pop(), None
+            else:
+                right = stack.pop()
+                left = stack.pop()
+            
+            if left[0] == 'constant' and (right is None or right[0] == 'constant'):
+                try:
+                    if opcode == NEGATE:
+                        value = -left[1]
+                    elif opcode == PERCENT:
+                        value = left[1] / 100
+                    else:
+                        value = BINARY_FUNCTIONS[opcode](left[1], right[1])
+                except (ArithmeticError, ValueError):
+                    pass  # Left to fail row by row, as each scalar evaluation would
+                else:
+                    stack.append(('constant', value))
+                    continue
+            
+            # Write into a temporary being consumed here, else take a free or new one
+            if left[0] == 'slot':
+                slot = left[1]
+                if right is not None and right[0] == 'slot':
+                    free.append(right[1])
+            elif right is not None and right[0] == 'slot':
+                slot = right[1]
+            elif free:
+                slot = free.pop()
+            else:
+                slot = temporaries
+                temporaries += 1
+            steps.append((opcode, left, right, slot))
+            stack.append(('slot', slot))
+        self._column_plan = (tuple(steps), temporaries, stack[0])
+        return self._column_plan
+    
+    def evaluate_columns(self, columns, out=None, errors=None):
+        """Evaluate over whole NumPy arrays in float mode, one ufunc call per operation
+        
+        columns maps each name to a 1-D array (or sequence) of equal length.
+        Rows match evaluate() on the same values (powers can differ in the
+        last bits, as NumPy has its own pow): NaN inputs give NaN, and a row
+        whose scalar evaluation would raise, such as one dividing by zero,
+        raises that error here naming the row. If errors (an int8
+        array) is given, such rows are marked with a COLUMN_ERRORS code and
+        set to NaN instead. out, if given, receives the result and must not
+        be one of the input columns.
+        """
+        import numpy as np  # For column mode (install: pip install numpy)
+        steps, temporaries, result = self.column_plan()
+        ufuncs = {ADD: np.add, SUBTRACT: np.subtract, MULTIPLY: np.multiply, DIVIDE: np.divide}
+        
+        arrays = {}
+        for name, position in self.names.items():
+            if name not in columns:
+                raise ExpressionError(f"No column for '{name}'", position)
+            arrays[name] = np.asarray(columns[name], dtype=np.float64)
+        lengths = {len(array) for array in arrays.values()}
+        lengths.update(len(array) for array in (out, errors) if array is not None)
+        if len(lengths) != 1:
+            raise ValueError("Columns must all have the same length" if lengths else "Column mode needs a column, out or errors array")
+        length = lengths.pop()
+        
+        buffers = [np.empty(length) for _ in range(temporaries)]
+        if out is not None and result[0] == 'slot':
+            buffers[result[1]] = out
+        
+        def value(operand):
+            kind, operand = operand
+            return operand if kind == 'constant' else arrays[operand] if kind == 'name' else buffers[operand]
+        
+        with np.errstate(all='ignore'):
+            for opcode, left, right, slot in steps:
+                left = value(left)
+                target = buffers[slot]
+                if opcode == NEGATE:
+                    np.negative(left, out=target)
+                elif opcode == PERCENT:
+                    np.divide(left, 100.0, out=target)
+                elif opcode == POWER:
+                    right = value(right)
+                    _flag_rows(np.equal(left, 0) & np.less(right, 0), ROW_DIVIDE_BY_ZERO, errors)
+                    finite = np.isfinite(left) & np.isfinite(right)
+                    np.power(left, right, out=target)
+                    _flag_rows(finite & np.isnan(target), ROW_NOT_REAL, errors)
+                    _flag_rows(finite & np.isinf(target), ROW_OVERFLOW, errors)
+                else:
+                    right = value(right)
+                    if opcode == DIVIDE:
+                        _flag_rows(np.equal(right, 0), ROW_DIVIDE_BY_ZERO, errors)
+                    ufuncs[opcode](left, right, out=target)
+        
+        if result[0] == 'slot':
+            result = buffers[result[1]]
+        elif out is not None:
+            np.copyto(out, value(result))
+            result = out
+        else:
+            result = np.full(length, value(result))
+        if errors is not None:
+            result[errors != 0] = np.nan
+        return result
+
+def _flag_rows(mask, code, errors):
+    """Raise the scalar error for the first row in mask, or record code for rows not already failed"""
+    if not mask.any():
+        return
+    if errors is None:
+        exception, message = COLUMN_ERRORS[code]
+        raise exception(f"{message} (row {int(mask.argmax()) if mask.ndim else 0})")
+    errors[mask & (errors == 0)] = code
+
+def compile_expression(text):
+    """Parse text once into an Expression"""
+    try:
+        parser = _Parser(text)
+        return Expression(text, parser.parse(), parser.names)
+    except RecursionError:
+        raise ExpressionError("Expression is nested too deeply", 0) from None
+
+def normalize_expression(text):
+    """Cache key for text: runs of spaces collapsed and operator aliases folded"""
+    return " ".join(text.split()).replace('*', '×').replace('/', '÷')
+
+class ExpressionCache:
+    """Bounded LRU of compiled expressions, plus a memo of constant results for one arithmetic mode
+    
+    Both are plain dicts in least-recently-used order. A full one is rebuilt
+    without its oldest quarter: deleting keys one at a time leaves deleted
+    slots that every later miss and oldest-key lookup has to step over.
+    Compiled expressions do not depend on the mode; memoised results
+    do, so set_mode() empties the memo whenever the mode or precision changes.
+    """
+    
+    def __init__(self, size=EXPRESSION_CACHE_SIZE, results=RESULT_MEMO_SIZE, mode=MODE_FLOAT, precision=DECIMAL_PRECISION):
+        self.size = size
+        self.results_size = results
+        self.mode = mode
+        self.precision = precision
+        self.compiled = {}
+        self.results = {}
+        self.compile_hits = self.compile_misses = 0
+        self.result_hits = self.result_misses = 0
+        self.evictions = self.invalidations = 0
+    
+    def compile(self, text):
+        """Return the Expression for text, parsing it only on a miss"""
+        return self._compile(normalize_expression(text), text)
+    
+    def _compile(self, key, text):
+        expression = self.compiled.pop(key, None)
+        if expression is not None:
+            self.compile_hits += 1
+        else:
+            self.compile_misses += 1
+            try:
+                expression = compile_expression(key)
+            except ExpressionError:
+                # Report positions in the text as given rather than the normalised key
+                compile_expression(text)
+                raise
+            if len(self.compiled) >= self.size:
+                self.compiled = self._evict(self.compiled)
+        self.compiled[key] = expression  # Most recently used goes last
+        return expression
+    
+    def evaluate(self, text, variables=None):
+        """Evaluate text in the cache's mode; constant expressions are answered from the memo"""
+        key = normalize_expression(text)
+        result = self.results.pop(key, None)
+        if result is not None:
+            self.result_hits += 1
+            self.results[key] = result
+            return result
+        
+        expression = self._compile(key, text)
+        result = expression.evaluate(self.mode, self.precision, variables)
+        if not expression.names:
+            self.result_misses += 1
+            if len(self.results) >= self.results_size:
+                self.results = self._evict(self.results)
+            self.results[key] = result
+        return result
+    
+    def _evict(self, entries):
+        """Return entries without its least recently used quarter"""
+        import itertools
+        dropped = len(entries) // 4 + 1
+        self.evictions += dropped
+        return dict(itertools.islice(entries.items(), dropped, None))
+    
+    def set_mode(self, mode, precision=DECIMAL_PRECISION):
+        """Switch arithmetic mode, forgetting memoised results if it changed"""
+        if (mode, precision) != (self.mode, self.precision):
+            self.mode = mode
+            self.precision = precision
+            self.results.clear()
+            self.invalidations += 1
+    
+    def clear(self):
+        """Drop every compiled expression and memoised result"""
+        self.compiled.clear()
+        self.results.clear()
+        self.invalidations += 1
+    
+    def stats(self):
+        """Sizes and hit/miss counters as a dict"""
+        return {
+            'compiled': len(self.compiled),
+            'compile_hits': self.compile_hits,
+            'compile_misses': self.compile_misses,
+            'results': len(self.results),
+            'result_hits': self.result_hits,
+            'result_misses': self.result_misses,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations
+        }
+
+# Shared by evaluate_expression(), the batch CLI (one per worker process) and the GUI
+expression_cache = ExpressionCache()
+
+def evaluate_expression(text, mode=MODE_FLOAT, precision=DECIMAL_PRECISION):
+    """Evaluate text through the shared cache, formatted for the display"""
+    expression_cache.set_mode(mode, precision)
+    return format_result(expression_cache.evaluate(text), mode, precision)
+
+def _evaluate_chunk(task):
+    """Evaluate a list of expression lines (runs in worker processes)
+    
+    Returns the output block, one result or 'error: ...' line per input
+    line, with the number of expressions and errors in it.
+    """
+    lines, mode, precision = task
+    results = []
+    expressions = errors = 0
+    for line in lines:
+        text = line.decode('utf-8', 'replace').strip()
+        if not text:
+            results.append("")
+            continue
+        expressions += 1
+        try:
+            results.append(str(evaluate_expression(text, mode, precision)))
+        except ExpressionError as e:
+            results.append(f"error: {e} (column {e.position + 1})")
+            errors += 1
+        except Exception as e:
+            results.append(f"error: {error_message(e)}")
+            errors += 1
+    return ("\n".join(results) + "\n").encode('utf-8', 'backslashreplace'), expressions, errors
+
+def evaluate_stream(source, out, workers=1, mode=MODE_FLOAT, precision=DECIMAL_PRECISION, chunk_lines=EVAL_CHUNK_LINES):
+    """Evaluate one expression per line of a binary stream, writing results in input order
+    
+    Memory stays flat: at most two chunks per worker are read ahead.
+    Returns (expressions, errors).
+    """
+    import itertools
+    import parallel
+    chunks = iter(lambda: list(itertools.islice(source, chunk_lines)), [])
+    tasks = ((lines, mode, precision) for lines in chunks)
+    blocks = parallel.ordered_map(_evaluate_chunk, tasks, workers)
+    try:
+        expressions = errors = 0
+        for block, block_expressions, block_errors in blocks:
+            out.write(block)
+            if chunk_lines == 1:
+                out.flush()
+            expressions += block_expressions
+            errors += block_errors
+        return expressions, errors
+    finally:
+        blocks.close()
 
 class Calculator:
     def __init__(self):
         # Create the main window
+        load_gui_modules()
         self.window = tk.Tk()
         self.window.title("Simple Calculator")
-        self.window.geometry("300x400")
+        self.window.geometry("300x500")
         self.window.configure(bg='#f0f0f0')
         
-        # Variables to store numbers and operation
-        self.current_number = ""
-        self.previous_number = ""
-        self.operation = ""
+        # Expression typed so far, evaluated as a whole by equals_click()
+        self.expression = ""
         
         # Create the display
         self.create_display()
@@ -41,6 +817,16 @@ class Calculator:
         
         # Set initial display
         self.update_display("0")
+        
+        # Arithmetic mode, and the significant digits kept in decimal mode
+        mode_frame = tk.Frame(display_frame, bg='#f0f0f0')
+        mode_frame.pack(fill='x', pady=(5, 0))
+        self.mode_var = tk.StringVar(value=MODE_FLOAT)
+        tk.Label(mode_frame, text="Mode:", bg='#f0f0f0').pack(side='left')
+        tk.OptionMenu(mode_frame, self.mode_var, *MODES).pack(side='left')
+        self.precision_var = tk.IntVar(value=DECIMAL_PRECISION)
+        tk.Spinbox(mode_frame, from_=1, to=1000, width=5, textvariable=self.precision_var).pack(side='right')
+        tk.Label(mode_frame, text="Digits:", bg='#f0f0f0').pack(side='right')
     
     def create_buttons(self):
         """Create all calculator buttons"""
@@ -50,6 +836,7 @@ class Calculator:
         
         # Button layout: [row][column]
         buttons = [
+            ['(', ')', '^', '⌫'],
             ['C', '±', '%', '÷'],
             ['7', '8', '9', '×'],
             ['4', '5', '6', '-'],
@@ -92,27 +879,30 @@ class Calculator:
         # Configure grid weights for responsive design
         for i in range(4):
             button_frame.grid_columnconfigure(i, weight=1)
-        for i in range(5):
+        for i in range(len(buttons)):
             button_frame.grid_rowconfigure(i, weight=1)
     
     def get_button_color(self, button_text):
         """Return appropriate color for each button type"""
         if button_text.isdigit() or button_text == '.':
             return '#e0e0e0'  # Light gray for numbers
-        elif button_text in ['+', '-', '×', '÷', '=']:
+        elif button_text in ['+', '-', '×', '÷', '^', '=']:
             return '#ff9500'  # Orange for operations
         else:
             return '#a6a6a6'  # Gray for special functions
     
     def button_click(self, button_text):
         """Handle button clicks"""
+        button_text = button_text.strip()  # The wide zero button is labelled '0 '
         try:
             if button_text.isdigit():
                 self.number_click(button_text)
             elif button_text == '.':
                 self.decimal_click()
-            elif button_text in ['+', '-', '×', '÷']:
+            elif button_text in ['+', '-', '×', '÷', '^']:
                 self.operation_click(button_text)
+            elif button_text in ['(', ')']:
+                self.parenthesis_click(button_text)
             elif button_text == '=':
                 self.equals_click()
             elif button_text == 'C':
@@ -121,81 +911,103 @@ class Calculator:
                 self.plus_minus_click()
             elif button_text == '%':
                 self.percent_click()
+            elif button_text == '⌫':
+                self.backspace()
         except Exception as e:
             self.show_error("Error occurred")
             self.clear_all()
     
+    def trailing_number(self):
+        """Return the number being typed at the end of the expression ('' if none)"""
+        start = len(self.expression)
+        while start > 0 and self.expression[start - 1] in DIGITS + '.':
+            start -= 1
+        return self.expression[start:]
+    
     def number_click(self, number):
         """Handle number button clicks"""
-        if self.current_number == "0":
-            self.current_number = number
-        else:
-            self.current_number += number
-        self.update_display(self.current_number)
+        if self.trailing_number() == "0":
+            self.expression = self.expression[:-1]
+        elif self.expression.endswith((')', '%')):
+            self.expression += '×'
+        self.expression += number
+        self.update_display(self.expression)
     
     def decimal_click(self):
         """Handle decimal point button click"""
-        if '.' not in self.current_number:
-            if self.current_number == "":
-                self.current_number = "0."
+        number = self.trailing_number()
+        if '.' not in number:
+            if number == "":
+                if self.expression.endswith((')', '%')):
+                    self.expression += '×'
+                self.expression += "0."
             else:
-                self.current_number += "."
-            self.update_display(self.current_number)
+                self.expression += "."
+            self.update_display(self.expression)
     
     def operation_click(self, op):
-        """Handle operation button clicks (+, -, ×, ÷)"""
-        if self.current_number == "":
+        """Handle operation button clicks (+, -, ×, ÷, ^)"""
+        if self.expression == "" or self.expression.endswith('('):
+            # Only a sign can start an operand
+            if op == '-':
+                self.expression += op
+                self.update_display(self.expression)
             return
         
-        if self.previous_number != "" and self.operation != "":
-            self.equals_click()
-        
-        self.previous_number = self.current_number
-        self.current_number = ""
-        self.operation = op
-        
-        # Show the operation on display
-        display_text = self.previous_number + " " + op
-        self.update_display(display_text)
+        if self.expression[-1] in OPERATOR_SYMBOLS:
+            if op == '-' and self.expression[-1] != '-':
+                # A minus after an operator is the next operand's sign, as in 2×-3
+                self.expression += op
+            else:
+                stripped = self.expression.rstrip(OPERATOR_SYMBOLS)
+                if stripped == "" or stripped.endswith('('):
+                    return
+                self.expression = stripped + op
+        else:
+            self.expression += op
+        self.update_display(self.expression)
+    
+    def parenthesis_click(self, parenthesis):
+        """Open a bracket (multiplying what comes before it) or close the innermost one"""
+        if parenthesis == '(':
+            if self.expression and self.expression[-1] not in OPERATOR_SYMBOLS + '(':
+                self.expression += '×'
+            self.expression += '('
+        else:
+            if self.expression.count('(') <= self.expression.count(')'):
+                return
+            if self.expression[-1] in OPERATOR_SYMBOLS + '(':
+                return
+            self.expression += ')'
+        self.update_display(self.expression)
     
     def equals_click(self):
         """Handle equals button click"""
-        if self.previous_number == "" or self.current_number == "" or self.operation == "":
+        if self.expression == "":
             return
         
+        # Brackets left open are closed at the end
+        expression = self.expression + ')' * (self.expression.count('(') - self.expression.count(')'))
+        mode = self.mode_var.get()
         try:
-            # Convert to float for calculation
-            num1 = float(self.previous_number)
-            num2 = float(self.current_number)
-            
-            # Perform calculation based on operation
-            if self.operation == '+':
-                result = num1 + num2
-            elif self.operation == '-':
-                result = num1 - num2
-            elif self.operation == '×':
-                result = num1 * num2
-            elif self.operation == '÷':
-                if num2 == 0:
-                    self.show_error("Cannot divide by zero!")
-                    self.clear_all()
-                    return
-                result = num1 / num2
-            
-            # Format result (remove unnecessary decimals)
-            if result == int(result):
-                result = int(result)
-            else:
-                result = round(result, 8)  # Round to 8 decimal places
-            
-            # Update display and reset variables
-            self.update_display(str(result))
-            self.current_number = str(result)
-            self.previous_number = ""
-            self.operation = ""
+            precision = self.precision_var.get()
+        except tk.TclError:
+            precision = DECIMAL_PRECISION
+        try:
+            precision = max(1, precision)
+            expression_cache.set_mode(mode, precision)
+            result = str(format_result(expression_cache.evaluate(expression), mode, precision))
             
+            # Update display and continue from the result; fractions and negative results are
+            # bracketed so that 1/3 stays one operand and -2 followed by ^2 gives 4
+            self.expression = f"({result})" if '/' in result or result.startswith('-') else result
+            self.update_display(result)
+        
+        except ExpressionError as e:
+            # Keep the expression so it can be corrected
+            self.show_error(str(e))
         except Exception as e:
-            self.show_error("Invalid calculation")
+            self.show_error(error_message(e))
             self.clear_all()
     
     def clear_click(self):
@@ -204,32 +1016,36 @@ class Calculator:
     
     def clear_all(self):
         """Clear all data and reset calculator"""
-        self.current_number = ""
-        self.previous_number = ""
-        self.operation = ""
+        self.expression = ""
         self.update_display("0")
     
     def plus_minus_click(self):
-        """Handle plus/minus button click (change sign)"""
-        if self.current_number != "" and self.current_number != "0":
-            if self.current_number.startswith('-'):
-                self.current_number = self.current_number[1:]
-            else:
-                self.current_number = '-' + self.current_number
-            self.update_display(self.current_number)
+        """Handle plus/minus button click (change the sign of the last number)"""
+        number = self.trailing_number()
+        if number == "":
+            # A number already negated by ±, or a negative result, loses its sign and brackets
+            start = self.expression.rfind('(-')
+            inner = self.expression[start + 2:-1]
+            if start >= 0 and self.expression.endswith(')') and inner and all(c in DIGITS + '.' for c in inner):
+                self.expression = self.expression[:start] + inner
+                self.update_display(self.expression)
+            return
+        before = self.expression[:len(self.expression) - len(number)]
+        if before.endswith('-') and (len(before) == 1 or before[-2] in OPERATOR_SYMBOLS + '('):
+            # That minus is the number's sign rather than a subtraction
+            self.expression = before[:-1] + number
+        else:
+            # Bracketed so that a following ^ raises the negative number: (-5)^2 is 25
+            self.expression = before + '(-' + number + ')'
+        self.update_display(self.expression)
     
     def percent_click(self):
-        """Handle percent button click"""
-        if self.current_number != "":
-            try:
-                result = float(self.current_number) / 100
-                if result == int(result):
-                    result = int(result)
-                self.current_number = str(result)
-                self.update_display(self.current_number)
-            except:
-                self.show_error("Invalid percentage")
+        """Handle percent button click (divides the preceding operand by 100)"""
+        if self.expression and self.expression[-1] in DIGITS + '.)':
+            self.expression += '%'
+            self.update_display(self.expression)
     
+    @metrics.registry.timed('calculator.update_display')
     def update_display(self, value):
         """Update the calculator display"""
         self.display.config(state='normal')
@@ -249,6 +1065,9 @@ class Calculator:
         
         # Start the main loop
         self.window.mainloop()
+        
+        # Written only when APP_METRICS names a file
+        metrics.registry.dump(extra=expression_cache.stats())
     
     def key_press(self, event):
         """Handle keyboard input"""
@@ -266,22 +1085,156 @@ class Calculator:
             self.button_click('×')
         elif key == '/':
             self.button_click('÷')
+        elif key in ('(', ')', '^', '%'):
+            self.button_click(key)
         elif key == '\r' or key == '=':  # Enter or equals
             self.button_click('=')
         elif key == '\x08':  # Backspace
             self.backspace()
-        elif key.lower() == 'c':
+        elif key.lower() == 'c' or key == '\x1b':  # C or Escape
             self.button_click('C')
     
     def backspace(self):
-        """Handle backspace (delete last digit)"""
-        if self.current_number != "":
-            self.current_number = self.current_number[:-1]
-            if self.current_number == "":
-                self.current_number = "0"
-            self.update_display(self.current_number)
+        """Handle backspace (delete the last character)"""
+        if self.expression != "":
+            self.expression = self.expression[:-1]
+            self.update_display(self.expression or "0")
+
+def _csv_column(rows, index, errors):
+    """One CSV column as a float64 array; empty cells are NaN, other non-numbers are marked in errors"""
+    import numpy as np  # For column mode (install: pip install numpy)
+    try:
+        # NumPy parses the strings itself, surrounding spaces included
+        return np.array([row[index] or 'nan' for row in rows], dtype=np.float64)
+    except (ValueError, IndexError):
+        cells = [row[index].strip() if index < len(row) else "" for row in rows]
+        values = np.empty(len(cells))
+        for row, cell in enumerate(cells):
+            try:
+                values[row] = float(cell) if cell else np.nan
+            except ValueError:
+                values[row] = np.nan
+                errors[row] = errors[row] or ROW_NOT_A_NUMBER
+        return values
+
+def _format_row(value):
+    """format_result() for one float column value, with the nan of an empty cell written as such"""
+    if value.is_integer():
+        return str(int(value))
+    return str(round(value, 8)) if math.isfinite(value) else str(value)
+
+def evaluate_csv(source, out, expression, chunk_rows=CSV_CHUNK_ROWS):
+    """Evaluate expression for every row of a CSV text stream, its variables naming header columns
+    
+    Writes one result per row to the binary stream out, like
+    evaluate_stream(); empty cells give nan. Rows that overflow to inf, or
+    give nan without an empty cell, are errors as format_result() makes
+    them. Returns (rows, errors).
+    """
+    import csv
+    import itertools
+    import numpy as np  # For column mode (install: pip install numpy)
+    reader = csv.reader(source)
+    header = [name.strip() for name in next(reader, [])]
+    indexes = {}
+    for name, position in expression.names.items():
+        if name not in header:
+            raise ExpressionError(f"No column for '{name}'", position)
+        indexes[name] = header.index(name)
+    
+    rows = errors = 0
+    for chunk in iter(lambda: list(itertools.islice(reader, chunk_rows)), []):
+        codes = np.zeros(len(chunk), dtype=np.int8)
+        columns = {name: _csv_column(chunk, index, codes) for name, index in indexes.items()}
+        results = expression.evaluate_columns(columns, errors=codes)
+        _flag_rows(np.isinf(results), ROW_OVERFLOW, codes)
+        not_a_number = np.isnan(results)
+        for values in columns.values():
+            not_a_number &= ~np.isnan(values)
+        _flag_rows(not_a_number, ROW_NOT_A_NUMBER, codes)
+        if codes.any():
+            lines = [
+                f"error: {COLUMN_ERRORS[code][1]}" if code else _format_row(value)
+                for value, code in zip(results.tolist(), codes.tolist())
+            ]
+        else:
+            lines = list(map(_format_row, results.tolist()))
+        out.write(("\n".join(lines) + "\n").encode('utf-8'))
+        rows += len(chunk)
+        errors += int(np.count_nonzero(codes))
+    return rows, errors
+
+def run_cli(argv):
+    """Evaluate expressions from a file or stdin without the GUI; returns the exit status"""
+    import argparse
+    import os
+    import time
+    parser = argparse.ArgumentParser(
+        prog="CALCULATOR.py",
+        description="Evaluate one expression per line and write one result per line, in order"
+    )
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--eval-file', metavar='PATH', help="file of expressions, one per line")
+    source.add_argument('--stdin', action='store_true', help="read expressions from standard input")
+    source.add_argument('--csv', metavar='PATH', help="evaluate --formula for every row of a CSV file, vectorized with NumPy")
+    parser.add_argument('--formula', help="expression for --csv; its variables name header columns")
+    parser.add_argument('--out', default='-', help="output file (default: stdout)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="number of evaluating processes (default: all cores)")
+    parser.add_argument('--mode', choices=MODES, default=MODE_FLOAT, help="arithmetic mode (default: float)")
+    parser.add_argument('--precision', type=int, default=DECIMAL_PRECISION, help="significant digits in decimal mode")
+    args = parser.parse_args(argv)
+    if args.workers < 1 or args.precision < 1:
+        parser.error("--workers and --precision must be at least 1")
+    if (args.csv is None) != (args.formula is None):
+        parser.error("--csv and --formula go together")
+    if args.csv and args.mode != MODE_FLOAT:
+        parser.error("--csv only supports float mode")
+    
+    if args.csv:
+        try:
+            expression = compile_expression(args.formula)
+        except ExpressionError as e:
+            parser.error(f"--formula: {e} (column {e.position + 1})")
+        started = time.perf_counter()
+        with open(args.csv, newline='', encoding='utf-8') as source:
+            out = open(args.out, 'wb', buffering=1 << 20) if args.out != '-' else sys.stdout.buffer
+            try:
+                rows, errors = evaluate_csv(source, out, expression)
+            except ExpressionError as e:
+                parser.error(str(e))
+            finally:
+                if out is not sys.stdout.buffer:
+                    out.close()
+                else:
+                    out.flush()
+        elapsed = time.perf_counter() - started
+        print(f"Evaluated {rows:,} rows ({errors:,} errors) in {elapsed:.2f} s ({rows / max(elapsed, 1e-9):,.0f}/s)", file=sys.stderr)
+        return 1 if errors else 0
+    
+    source = open(args.eval_file, 'rb') if args.eval_file else sys.stdin.buffer
+    out = open(args.out, 'wb', buffering=1 << 20) if args.out != '-' else sys.stdout.buffer
+    
+    # Typing at a terminal gets each answer straight away
+    chunk_lines = 1 if source.isatty() else EVAL_CHUNK_LINES
+    workers = 1 if source.isatty() else args.workers
+    
+    started = time.perf_counter()
+    try:
+        expressions, errors = evaluate_stream(source, out, workers, args.mode, args.precision, chunk_lines)
+    finally:
+        if source is not sys.stdin.buffer:
+            source.close()
+        if out is not sys.stdout.buffer:
+            out.close()
+        else:
+            out.flush()
+    elapsed = time.perf_counter() - started
+    print(f"Evaluated {expressions:,} expressions ({errors:,} errors) in {elapsed:.2f} s ({expressions / max(elapsed, 1e-9):,.0f}/s)", file=sys.stderr)
+    return 1 if errors else 0
 
 # Create and run the calculator
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(run_cli(sys.argv[1:]))
     calculator = Calculator()
     calculator.run()
@@ -1,8 +1,179 @@
-import tkinter as tk
-from tkinter import ttk, messagebox
-import random
-import string
-import pyperclip  # For clipboard functionality (install: pip install pyperclip)
+import array
+import bisect
+import collections
+import functools
+import itertools
+import math
+import os
+import struct
+import sys
+import threading
+import time
+
+import metrics
+
+APP_TITLE = "🔐 Password Generator"
+
+# Delay between checks for a finished background generation (ms)
+GENERATION_POLL_MS = 10
+
+# Ready passwords kept by the background pool, and how many it makes per refill
+POOL_CAPACITY = 32
+POOL_BATCH_SIZE = 8
+
+# Clipboard: copies run off the Tk thread and are wiped after a delay (0 = never)
+CLIPBOARD_CLEAR_SECONDS = 30
+CLIPBOARD_LATENCY_WINDOW = 100
+TOAST_MS = 2500
+
+# Password list window: default and largest count, rows per background chunk, row height (px)
+LIST_DEFAULT_COUNT = 1000
+LIST_MAX_COUNT = 100000
+LIST_CHUNK_SIZE = 2000
+LIST_ROW_HEIGHT = 20
+
+# Character classes offered by the generator
+UPPERCASE_CHARS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+LOWERCASE_CHARS = "abcdefghijklmnopqrstuvwxyz"
+DIGIT_CHARS = "0123456789"
+SYMBOL_CHARS = "!@#$%^&*()_+-=[]{}|;:,.<>?"
+
+# Local service defaults: address, micro-batch window (s) and size limits;
+# SERVICE_MAX_MINIMUMS caps a policy's per-class minimums added together
+SERVICE_HOST = "127.0.0.1"
+SERVICE_PORT = 8765
+SERVICE_BATCH_WINDOW = 0.002
+SERVICE_MAX_BATCH = 1024
+SERVICE_MAX_COUNT = 100000
+SERVICE_MAX_LENGTH = 128
+SERVICE_MAX_MINIMUMS = 8
+SERVICE_LATENCY_WINDOW = 10000
+SERVICE_RATE_WINDOW = 10.0
+
+# Look-alike characters dropped by Policy(exclude_ambiguous=True)
+AMBIGUOUS_CHARS = "Il1|O0o"
+
+# Number of bytes requested from the OS CSPRNG per refill, and how many a generator keeps between calls
+RANDOM_CHUNK_SIZE = 1 << 16
+RANDOM_KEEP_BYTES = 4096
+ALL_BYTES = bytes(range(256))
+
+# Constrained policies draw whole strings and reject the invalid ones while at least this fraction passes
+POLICY_REJECTION_ACCEPTANCE = 1 / 16
+
+# Deterministic source for tests and benchmarks: key personalisation and (stream, call) counter
+SEEDED_SOURCE_PERSON = b"PASSWORD.py seed"
+SEEDED_SOURCE_COUNTER = struct.Struct("<QQ")
+
+# Passwords generated per block by the streaming command line mode
+CLI_BLOCK_SIZE = 50000
+
+# Audit mode: bytes of the input file per scoring task, and how many weakest passwords to list
+AUDIT_CHUNK_BYTES = 4 << 20
+AUDIT_WEAKEST = 10
+
+# Passwords packed into one NumPy array by the batch scorer
+SCORE_CHUNK_SIZE = 65536
+
+# Strength bands as (exclusive upper score, description, color)
+STRENGTH_BANDS = [
+    (30, "Very Weak", "#e74c3c"),
+    (50, "Weak", "#f39c12"),
+    (70, "Moderate", "#f1c40f"),
+    (85, "Strong", "#27ae60"),
+    (None, "Very Strong", "#2ecc71")
+]
+
+# Compiled wordlist index used by the entropy estimator, if one has been built
+DEFAULT_STRENGTH_INDEX = os.path.join(os.path.dirname(os.path.abspath(__file__)), "strength_index.bin")
+STRENGTH_INDEX_MAGIC = b"PWSIDX01"
+STRENGTH_INDEX_HEADER = struct.Struct("<8s?III")
+
+# Shortest wordlist entry worth matching, and the fewest guesses any match counts for
+DICTIONARY_MIN_LENGTH = 3
+MIN_MATCH_GUESSES = 50
+
+# Built-in wordlists (most common first) used when no index file exists
+COMMON_PASSWORDS = """
+123456 password 123456789 12345678 12345 qwerty 1234567 111111 1234567890 123123
+abc123 1234 password1 iloveyou 1q2w3e4r 000000 qwerty123 zaq12wsx dragon sunshine
+princess letmein 654321 monkey 1qaz2wsx 123321 qwertyuiop superman asdfghjkl
+trustno1 football baseball welcome shadow master hello freedom whatever qazwsx
+michael login starwars passw0rd admin ninja mustang access flower 696969 batman
+charlie donald aa123456 jordan23 loveme zaq1zaq1 password123 lovely 7777777
+888888 123qwe 666666 google secret computer jessica hunter buster soccer harley
+ranger daniel thomas robert tigger pepper summer ashley nicole chelsea biteme
+matthew yankees andrew killer 112233 cheese maggie ginger hammer silver
+internet samsung orange banana purple cookie coffee letmein1 welcome1 admin123
+root toor pass test guest changeme default administrator 11111111 987654321
+"""
+COMMON_WORDS = """
+the and you that was for are with his they this have from one had word but not
+what all were when your can said there use each which she how their will other
+about out many then them these some her would make like him into time has look
+two more write see number way could people than first water been call who its
+now find long down day did get come made may part love life world house home
+family friend money music school work night light water summer winter spring
+autumn monday tuesday wednesday thursday friday saturday sunday january february
+march april june july august september october november december secret dragon
+tiger lion bear wolf eagle horse monkey black white green blue yellow purple
+orange red apple banana cherry lemon mango peach happy sunny lucky magic power
+master angel star moon sun sky fire ice snow rain storm thunder shadow ghost
+king queen prince princess knight castle heaven hell soccer football baseball
+hockey tennis golf game player hunter killer ninja pirate rock metal jazz blues
+dance party candy sugar honey cookie coffee pizza chicken cheese bread butter
+computer internet system server access login admin welcome hello freedom peace
+forever always never nothing something everything baby girl boy mother father
+sister brother daughter son michael jennifer jessica ashley amanda joshua daniel
+david james robert john matthew andrew thomas charlie george william elizabeth
+"""
+
+# Characters translated back to letters before dictionary matching
+L33T_TABLE = str.maketrans("4@8(36!1|0$5+72", "aabcegiilossttz")
+
+# Brute-force alphabet size for each character class
+BRUTEFORCE_CARDINALITY = {'lower': 26, 'upper': 26, 'digit': 10, 'symbol': 33, 'other': 100}
+
+# US QWERTY rows as (unshifted keys, shifted keys, horizontal offset)
+KEYBOARD_ROWS = [
+    ("`1234567890-=", "~!@#$%^&*()_+", 0.0),
+    ("qwertyuiop[]\\", "QWERTYUIOP{}|", 1.5),
+    ("asdfghjkl;'", 'ASDFGHJKL:"', 1.75),
+    ("zxcvbnm,./", "ZXCVBNM<>?", 2.25)
+]
+KEYBOARD_SHIFTED = set("".join(shifted for _, shifted, _ in KEYBOARD_ROWS))
+KEYBOARD_STARTS = 47
+KEYBOARD_DEGREE = 4
+
+# Years close to the reference year are guessed first
+DATE_REFERENCE_YEAR = 2025
+DATE_MIN_YEAR_SPACE = 20
+DATE_PATTERN = r"\d+"
+SEPARATED_DATE_PATTERN = r"(\d{1,4})([-/._ ])(\d{1,2})\2(\d{1,4})"
+
+# Breach corpus built from a HIBP-style SHA-1 list, if one has been built
+DEFAULT_BREACH_INDEX = os.path.join(os.path.dirname(os.path.abspath(__file__)), "breach.idx")
+BREACH_MAGIC = b"PWBRCH01"
+BREACH_HEADER = struct.Struct("<8sQQI4x")
+BREACH_FANOUT = struct.Struct("<65537Q")
+BREACH_RECORD = struct.Struct(">20sI")
+BREACH_FALSE_POSITIVE_RATE = 0.01
+
+# Offset-indexed passphrase wordlist, if one has been built
+DEFAULT_WORDLIST_INDEX = os.path.join(os.path.dirname(os.path.abspath(__file__)), "wordlist.idx")
+WORDLIST_MAGIC = b"PWWORD01"
+WORDLIST_HEADER = struct.Struct("<8sQ")
+
+# Packed 64-bit fingerprints that keep bulk output unique across runs
+FINGERPRINT_MAGIC = b"PWFSET02"
+FINGERPRINT_HEADER = struct.Struct("<8s?7x16s16sQQ")
+FINGERPRINT_MIN_SLOTS = 1024
+FINGERPRINT_MAX_LOAD = 0.75
+
+# GUI modules, imported on first GUI use so headless callers never load Tk
+tk = None
+ttk = None
+messagebox = None
 
 # Global variables to store GUI elements
 root = None
@@ -14,15 +185,51 @@ symbols_var = None
 password_var = None
 strength_var = None
 strength_progress = None
+estimator_var = None
+breach_var = None
+passphrase_var = None
+passphrase_words_var = None
+clipboard_clear_var = None
+metrics_var = None
+
+# Background regeneration state for slider and checkbox changes
+regeneration_job = None
+title_reset_job = None
+generation_executor = None
+generation_token = 0
+password_pool = None
+
+# Clipboard copy/clear state
+clipboard_executor = None
+clipboard_clear_job = None
+clipboard_backend = None
+clipboard_contents = None
+clipboard_copies = 0
+clipboard_latencies = collections.deque(maxlen=CLIPBOARD_LATENCY_WINDOW)
+toast_job = None
+
+# Running counts for the "check your own password" field
+own_password_scorer = None
+
+# Password list window: chunk generation thread and the token of the current fill
+list_executor = None
+list_token = 0
+
+def load_gui_modules():
+    """Import tkinter, ttk and messagebox into the module globals"""
+    global tk, ttk, messagebox
+    import tkinter as tk
+    from tkinter import ttk, messagebox
 
 def initialize_gui():
     """Initialize the main GUI window and all variables"""
-    global root, length_var, uppercase_var, lowercase_var, numbers_var, symbols_var, password_var, strength_var, strength_progress
+    load_gui_modules()
+    global root, length_var, uppercase_var, lowercase_var, numbers_var, symbols_var, password_var, strength_var, strength_progress, estimator_var, breach_var, passphrase_var, passphrase_words_var, clipboard_clear_var, metrics_var
     
     # Create main window
     root = tk.Tk()
-    root.title("🔐 Password Generator")
-    root.geometry("600x750")
+    root.title(APP_TITLE)
+    root.geometry("600x820")
     root.configure(bg='#f0f2f5')
     root.resizable(False, False)
     
@@ -34,6 +241,12 @@ def initialize_gui():
     symbols_var = tk.BooleanVar(value=True)
     password_var = tk.StringVar()
     strength_var = tk.StringVar(value="Password strength will appear here")
+    estimator_var = tk.BooleanVar(value=False)
+    breach_var = tk.StringVar()
+    passphrase_var = tk.BooleanVar(value=False)
+    passphrase_words_var = tk.IntVar(value=6)
+    clipboard_clear_var = tk.IntVar(value=CLIPBOARD_CLEAR_SECONDS)
+    metrics_var = tk.BooleanVar(value=metrics.registry.enabled)
 
 def create_title():
     """Create the application title"""
@@ -144,6 +357,43 @@ def create_options_section():
             fg='#95a5a6'
         )
         example_label.pack(side='right')
+    
+    # Passphrase mode replaces the character types with random words
+    passphrase_frame = tk.Frame(options_frame, bg='#f0f2f5')
+    passphrase_frame.pack(fill='x', pady=(10, 5))
+    
+    passphrase_checkbox = tk.Checkbutton(
+        passphrase_frame,
+        text="Passphrase (random words)",
+        variable=passphrase_var,
+        font=('Arial', 11),
+        bg='#f0f2f5',
+        fg='#2c3e50',
+        activebackground='#f0f2f5',
+        selectcolor='#3498db',
+        command=update_password_display
+    )
+    passphrase_checkbox.pack(side='left')
+    
+    words_spinbox = tk.Spinbox(
+        passphrase_frame,
+        from_=3,
+        to=12,
+        width=4,
+        textvariable=passphrase_words_var,
+        font=('Arial', 10),
+        command=update_password_display
+    )
+    words_spinbox.pack(side='right')
+    
+    words_label = tk.Label(
+        passphrase_frame,
+        text="Words:",
+        font=('Arial', 9),
+        bg='#f0f2f5',
+        fg='#95a5a6'
+    )
+    words_label.pack(side='right')
 
 def create_buttons_section():
     """Create the action buttons section"""
@@ -211,6 +461,29 @@ def create_password_display():
     )
     password_text.pack(fill='x', pady=(0, 10))
     
+    # Clipboard auto-clear delay
+    clear_frame = tk.Frame(display_frame, bg='#f0f2f5')
+    clear_frame.pack(fill='x')
+    
+    clear_label = tk.Label(
+        clear_frame,
+        text="Clear clipboard after (seconds, 0 = never):",
+        font=('Arial', 9),
+        bg='#f0f2f5',
+        fg='#95a5a6'
+    )
+    clear_label.pack(side='left')
+    
+    clear_spinbox = tk.Spinbox(
+        clear_frame,
+        from_=0,
+        to=600,
+        width=5,
+        textvariable=clipboard_clear_var,
+        font=('Arial', 10)
+    )
+    clear_spinbox.pack(side='left', padx=5)
+    
     # Store reference for updating
     root.password_text = password_text
 
@@ -227,6 +500,30 @@ def create_strength_indicator():
     )
     strength_frame.pack(pady=10, padx=30, fill='x')
     
+    # Field for checking an existing password, scored as it is typed
+    global own_password_scorer
+    own_password_scorer = IncrementalStrength()
+    check_frame = tk.Frame(strength_frame, bg='#f0f2f5')
+    check_frame.pack(fill='x', pady=(0, 10))
+    
+    check_label = tk.Label(
+        check_frame,
+        text="Check your own:",
+        font=('Arial', 9),
+        bg='#f0f2f5',
+        fg='#7f8c8d'
+    )
+    check_label.pack(side='left')
+    
+    check_entry = tk.Entry(
+        check_frame,
+        show='•',
+        font=('Courier New', 11),
+        validate='key',
+        validatecommand=(root.register(check_own_password), '%d', '%S', '%P')
+    )
+    check_entry.pack(side='left', fill='x', expand=True, padx=(5, 0))
+    
     # Strength progress bar
     global strength_progress
     strength_progress = ttk.Progressbar(
@@ -246,6 +543,30 @@ def create_strength_indicator():
         fg='#7f8c8d'
     )
     strength_label.pack()
+    
+    # Breach corpus result (only shown when a corpus has been built)
+    breach_label = tk.Label(
+        strength_frame,
+        textvariable=breach_var,
+        font=('Arial', 10, 'bold'),
+        bg='#f0f2f5',
+        fg='#7f8c8d'
+    )
+    breach_label.pack()
+    root.breach_label = breach_label
+    
+    # Optional dictionary/pattern-aware estimate
+    estimator_checkbox = tk.Checkbutton(
+        strength_frame,
+        text="Entropy estimate (dictionary words, dates, sequences, keyboard walks)",
+        variable=estimator_var,
+        font=('Arial', 9),
+        bg='#f0f2f5',
+        fg='#7f8c8d',
+        activebackground='#f0f2f5',
+        command=update_estimator_mode
+    )
+    estimator_checkbox.pack(pady=(5, 0))
 
 def configure_styles():
     """Configure custom styles for the application"""
@@ -266,18 +587,20 @@ def get_character_sets():
     char_sets = ""
     
     if uppercase_var.get():
-        char_sets += string.ascii_uppercase
+        char_sets += UPPERCASE_CHARS
     if lowercase_var.get():
-        char_sets += string.ascii_lowercase
+        char_sets += LOWERCASE_CHARS
     if numbers_var.get():
-        char_sets += string.digits
+        char_sets += DIGIT_CHARS
     if symbols_var.get():
-        char_sets += "!@#$%^&*()_+-=[]{}|;:,.<>?"
+        char_sets += SYMBOL_CHARS
     
     return char_sets
 
 def validate_selection():
     """Validate that at least one character type is selected"""
+    if passphrase_var.get():
+        return True
     if not any([uppercase_var.get(), lowercase_var.get(), numbers_var.get(), symbols_var.get()]):
         messagebox.showerror(
             "Invalid Selection",
@@ -286,36 +609,507 @@ def validate_selection():
         return False
     return True
 
-def generate_secure_password(length, char_sets):
-    """Generate a secure password with guaranteed character diversity"""
-    if not char_sets:
-        return ""
+@functools.lru_cache(maxsize=None)
+def _byte_table(symbols):
+    """Build a bytes.translate table mapping random bytes onto symbols without bias"""
+    limit = 256 - 256 % len(symbols)
+    table = bytes(symbols[b % len(symbols)] if b < limit else 0 for b in range(256))
+    return table, bytes(range(limit, 256))
+
+class Policy:
+    """Password rules, compiled once into alphabets and completion counts
     
-    password = []
-    guaranteed_chars = []
+    Sampling is exactly uniform over every password the rules allow. Rules
+    without no_repeats are sampled by drawing whole strings over the combined
+    alphabet and dropping those below a minimum, as long as at least
+    POLICY_REJECTION_ACCEPTANCE of them pass: that needs a bounded number of
+    redraws on average and runs far faster than unranking. Stricter rules,
+    and no_repeats, unrank one uniform integer per password instead, which
+    never retries and costs the same per password however strict the rules.
+    """
     
-    # Ensure at least one character from each selected set
-    if uppercase_var.get():
-        guaranteed_chars.append(random.choice(string.ascii_uppercase))
-    if lowercase_var.get():
-        guaranteed_chars.append(random.choice(string.ascii_lowercase))
-    if numbers_var.get():
-        guaranteed_chars.append(random.choice(string.digits))
-    if symbols_var.get():
-        guaranteed_chars.append(random.choice("!@#$%^&*()_+-=[]{}|;:,.<>?"))
+    CLASS_NAMES = ('uppercase', 'lowercase', 'numbers', 'symbols')
+    
+    def __init__(self, length=12, uppercase=True, lowercase=True, numbers=True, symbols=True,
+                 min_counts=None, exclude="", exclude_ambiguous=False, no_repeats=False, prefix=""):
+        min_counts = dict(min_counts or {})
+        enabled = dict(zip(self.CLASS_NAMES, (uppercase, lowercase, numbers, symbols)))
+        unknown = [name for name in min_counts if not enabled.get(name)]
+        if unknown:
+            raise ValueError(f"Minimum counts given for unselected character types: {', '.join(unknown)}")
+        
+        charsets = (UPPERCASE_CHARS, LOWERCASE_CHARS, DIGIT_CHARS, SYMBOL_CHARS)
+        self.classes = tuple(
+            (name, chars, min_counts.get(name, 1))
+            for name, chars in zip(self.CLASS_NAMES, charsets) if enabled[name]
+        )
+        if not self.classes:
+            raise ValueError("At least one character type must be selected")
+        
+        if exclude_ambiguous:
+            exclude += AMBIGUOUS_CHARS
+        self.length = length
+        self.exclude = "".join(sorted(set(exclude)))
+        self.no_repeats = bool(no_repeats)
+        self.prefix = prefix
+    
+    def key(self):
+        """Return a hashable description of the rules"""
+        return (self.length, self.classes, self.exclude, self.no_repeats, self.prefix)
+    
+    def __eq__(self, other):
+        return isinstance(other, Policy) and self.key() == other.key()
+    
+    def __hash__(self):
+        return hash(self.key())
+    
+    def compile(self):
+        """Return the shared compiled form of these rules"""
+        return _compile_policy(self.key())
+
+class CompiledPolicy:
+    """Samples passwords uniformly from everything a policy allows"""
+    
+    def __init__(self, length, classes, exclude, no_repeats, prefix):
+        excluded = set(exclude.encode('ascii', 'ignore'))
+        self.alphabets = []
+        minimums = []
+        for name, chars, minimum in classes:
+            alphabet = bytes(sorted(set(chars.encode('ascii')) - excluded))
+            if not alphabet:
+                raise ValueError(f"No {name} characters are left after exclusions")
+            self.alphabets.append(alphabet)
+            minimums.append(minimum)
+        self.alphabet = b"".join(self.alphabets)
+        self.no_repeats = no_repeats
+        self.prefix = prefix
+        self.prefix_bytes = prefix.encode('utf-8')
+        
+        # The prefix counts towards the minimums and the no-repeat rule
+        self.free_length = length - len(prefix)
+        if self.free_length < 0:
+            raise ValueError("Prefix is longer than the password length")
+        prefix_counts = [sum(c.isascii() and ord(c) in alphabet for c in prefix) for alphabet in self.alphabets]
+        self.minimums = tuple(max(0, m - c) for m, c in zip(minimums, prefix_counts))
+        if sum(self.minimums) > self.free_length:
+            raise ValueError(f"Length must be at least {len(prefix) + sum(self.minimums)} for the selected character types")
+        
+        self._steps = {}
+        if no_repeats:
+            self.prefix_last = ord(prefix[-1]) if prefix and prefix[-1].isascii() else None
+            last = -1
+            if self.prefix_last is not None:
+                last = next((j for j, alphabet in enumerate(self.alphabets) if self.prefix_last in alphabet), -1)
+            self.start = (self.free_length, self.minimums, last)
+            self._counts = self._completion_counts()
+            self.total = self._counts[self.start]
+        else:
+            self.total = self._count_valid()
+            # Share of unconstrained strings that already meet the minimums
+            self.acceptance = self.total / len(self.alphabet) ** self.free_length
+            self._class_ids = bytes.maketrans(self.alphabet, bytes(j for j, a in enumerate(self.alphabets) for _ in a))
+        if self.total == 0:
+            raise ValueError("No password satisfies this policy")
+    
+    def _count_valid(self):
+        """Count free-length strings that meet every minimum, by inclusion-exclusion over the classes missing theirs"""
+        # Work grows with the minimums rather than the length, so long policies compile quickly
+        n = self.free_length
+        sizes = [len(alphabet) for alphabet in self.alphabets]
+        constrained = [j for j, minimum in enumerate(self.minimums) if minimum]
+        total = 0
+        for r in range(len(constrained) + 1):
+            for short in itertools.combinations(constrained, r):
+                # ways[d]: strings of length d over the short classes, each below its minimum
+                ways = [1]
+                for j in short:
+                    size, minimum = sizes[j], self.minimums[j]
+                    ways = [
+                        sum(math.comb(d, c) * size ** c * ways[d - c] for c in range(max(0, d - len(ways) + 1), min(minimum, d + 1)))
+                        for d in range(len(ways) + minimum - 1)
+                    ]
+                others = sum(sizes) - sum(sizes[j] for j in short)
+                term = sum(math.comb(n, d) * w * others ** (n - d) for d, w in enumerate(ways[:n + 1]))
+                total += -term if r % 2 else term
+        return total
+    
+    @functools.cached_property
+    def _suffix_counts(self):
+        """table[j][m]: strings of length m over classes j.. that meet their minimums
+        
+        This is O(classes * length**2) big-integer products, so it is only
+        built once unranking actually runs.
+        """
+        k = len(self.alphabets)
+        n = self.free_length
+        table = [[0] * (n + 1) for _ in range(k + 1)]
+        table[k][0] = 1
+        for j in range(k - 1, -1, -1):
+            size = len(self.alphabets[j])
+            for m in range(n + 1):
+                table[j][m] = sum(
+                    math.comb(m, c) * size ** c * table[j + 1][m - c]
+                    for c in range(self.minimums[j], m + 1)
+                )
+        return table
+    
+    def _count_choices(self, j, m):
+        """Cumulative weights of each class-j count c, with the completions left after it"""
+        key = (j, m)
+        if key not in self._steps:
+            size = len(self.alphabets[j])
+            bounds = []
+            choices = []
+            total = 0
+            for c in range(self.minimums[j], m + 1):
+                rest = self._suffix_counts[j + 1][m - c]
+                if rest:
+                    total += math.comb(m, c) * size ** c * rest
+                    bounds.append(total)
+                    choices.append((c, rest))
+            self._steps[key] = (bounds, choices)
+        return self._steps[key]
+    
+    def _sample_class_counts(self, index):
+        """Map a uniform index over all valid strings to that string's per-class counts"""
+        m = self.free_length
+        counts = []
+        for j in range(len(self.alphabets) - 1):
+            bounds, choices = self._count_choices(j, m)
+            choice = bisect.bisect_right(bounds, index)
+            if choice:
+                index -= bounds[choice - 1]
+            c, rest = choices[choice]
+            # Each arrangement of the chosen class-j characters owns rest consecutive indices
+            index %= rest
+            counts.append(c)
+            m -= c
+        counts.append(m)
+        return counts
+    
+    def _fill_shuffled(self, view, start, stride, count, draw):
+        """Draw class counts, fill each class uniformly, then shuffle positions"""
+        n = self.free_length
+        if not n:
+            return
+        if not any(self.minimums) or len(self.alphabets) == 1:
+            # Unconstrained: every string over the alphabet is equally likely
+            bulk = draw(self.alphabet, count * n)
+            for k in range(n):
+                view[start + k::stride] = bulk[k::n]
+            return
+        
+        if self.acceptance >= POLICY_REJECTION_ACCEPTANCE:
+            self._fill_rejected(view, start, stride, count, draw)
+            return
+        
+        all_counts = [self._sample_class_counts(index) for index in _randbelow_batch(self.total, count, draw)]
+        pools = [draw(alphabet, sum(counts[j] for counts in all_counts)) for j, alphabet in enumerate(self.alphabets)]
+        swaps = [draw(bytes(range(i + 1)), count) if i < 256 else None for i in range(n)]
+        
+        offsets = [0] * len(pools)
+        rows = bytearray()
+        for p, counts in enumerate(all_counts):
+            chars = bytearray()
+            for j, c in enumerate(counts):
+                chars += pools[j][offsets[j]:offsets[j] + c]
+                offsets[j] += c
+            
+            # Fisher-Yates shuffle with pre-drawn swap indices
+            for i in range(n - 1, 0, -1):
+                swap = swaps[i][p] if i < 256 else _randbelow(i + 1, draw)
+                chars[i], chars[swap] = chars[swap], chars[i]
+            rows += chars
+        
+        # Rows are packed back to back; the record buffer takes them one column at a time
+        for k in range(n):
+            view[start + k::stride] = rows[k::n]
+    
+    def _fill_rejected(self, view, start, stride, count, draw):
+        """Draw uniform strings over the whole alphabet and keep those that meet the minimums"""
+        # Every valid string is equally likely to be drawn, so the kept ones stay uniform
+        n = self.free_length
+        checks = [(bytes((j,)), minimum) for j, minimum in enumerate(self.minimums) if minimum]
+        done = 0
+        while done < count:
+            bulk = draw(self.alphabet, (int((count - done) / self.acceptance * 1.05) + 8) * n)
+            classes = bulk.translate(self._class_ids)
+            
+            # Keep runs of consecutive valid strings as single slices
+            runs = []
+            run_start = 0
+            wanted = count - done
+            for offset in range(0, len(bulk), n):
+                for symbol, minimum in checks:
+                    if (classes.find(symbol, offset, offset + n) < 0 if minimum == 1 else
+                            classes.count(symbol, offset, offset + n) < minimum):
+                        runs.append(bulk[run_start:offset])
+                        run_start = offset + n
+                        break
+                else:
+                    wanted -= 1
+                    if not wanted:
+                        break
+            runs.append(bulk[run_start:offset + n])
+            kept = b"".join(runs)
+            
+            rows = len(kept) // n
+            region = view[done * stride:(done + rows) * stride]
+            for k in range(n):
+                region[start + k::stride] = kept[k::n]
+            done += rows
+    
+    def _weight(self, j, last):
+        """Characters of class j allowed after a character of class last"""
+        return len(self.alphabets[j]) - (j == last)
+    
+    def _next_state(self, m, r, j):
+        """State after placing a class-j character with m positions left"""
+        return (m - 1, r[:j] + (max(0, r[j] - 1),) + r[j + 1:], j)
+    
+    def _completion_counts(self):
+        """Count no-repeat completions for every (positions left, unmet minimums, last class)"""
+        requirements = list(itertools.product(*(range(r + 1) for r in self.minimums)))
+        counts = {}
+        for m in range(self.free_length + 1):
+            for r in requirements:
+                for last in range(-1, len(self.alphabets)):
+                    if sum(r) > m:
+                        value = 0
+                    elif m == 0:
+                        value = 1
+                    else:
+                        value = sum(
+                            self._weight(j, last) * counts[self._next_state(m, r, j)]
+                            for j in range(len(self.alphabets))
+                        )
+                    counts[(m, r, last)] = value
+        return counts
+    
+    def _choices(self, state):
+        """Cumulative block bounds and (class, completions, next state) for state"""
+        if state not in self._steps:
+            m, r, last = state
+            bounds = []
+            choices = []
+            total = 0
+            for j in range(len(self.alphabets)):
+                next_state = self._next_state(m, r, j)
+                completions = self._counts[next_state]
+                total += self._weight(j, last) * completions
+                if completions:
+                    bounds.append(total)
+                    choices.append((j, completions, next_state))
+            self._steps[state] = (bounds, choices)
+        return self._steps[state]
+    
+    def _fill_no_repeats(self, view, start, stride, count, draw):
+        """Unrank one uniform integer per password over all no-repeat completions"""
+        base = start
+        for index in _randbelow_batch(self.total, count, draw):
+            state = self.start
+            previous = self.prefix_last
+            position = base
+            while state[0]:
+                bounds, choices = self._choices(state)
+                choice = bisect.bisect_right(bounds, index)
+                if choice:
+                    index -= bounds[choice - 1]
+                j, completions, next_state = choices[choice]
+                char_index, index = divmod(index, completions)
+                alphabet = self.alphabets[j]
+                if j == state[2] and char_index >= alphabet.index(previous):
+                    char_index += 1
+                previous = alphabet[char_index]
+                view[position] = previous
+                position += 1
+                state = next_state
+            base += stride
+    
+    @property
+    def stride(self):
+        """Bytes per newline-terminated record; every password encodes to the same length"""
+        return len(self.prefix_bytes) + self.free_length + 1
+    
+    def sample_into(self, out, count, draw):
+        """Write count newline-terminated records at a fixed stride into a writable buffer"""
+        stride = self.stride
+        view = memoryview(out).cast('B')
+        if len(view) < count * stride:
+            raise ValueError(f"Buffer holds {len(view) // stride} records, {count} requested")
+        view = view[:count * stride]
+        if not count:
+            return
+        
+        # Prefix and newline columns are constant, so each is one strided copy
+        for k, byte in enumerate(self.prefix_bytes):
+            view[k::stride] = bytes((byte,)) * count
+        view[stride - 1::stride] = b"\n" * count
+        
+        if self.no_repeats:
+            self._fill_no_repeats(view, len(self.prefix_bytes), stride, count, draw)
+        else:
+            self._fill_shuffled(view, len(self.prefix_bytes), stride, count, draw)
+    
+    def sample(self, count, draw):
+        """Generate count passwords; draw(symbols, n) must return n uniform symbols"""
+        buffer = bytearray(count * self.stride)
+        self.sample_into(buffer, count, draw)
+        text = buffer.decode('utf-8')
+        width = len(self.prefix) + self.free_length + 1
+        return [text[p * width:(p + 1) * width - 1] for p in range(count)]
+
+@functools.lru_cache(maxsize=128)
+def _compile_policy(key):
+    """Compile policy rules once and share the result"""
+    return CompiledPolicy(*key)
+
+def _randbelow(limit, draw):
+    """Return a uniform integer in [0, limit) built from drawn random bytes"""
+    return _randbelow_batch(limit, 1, draw)[0]
+
+def _randbelow_batch(limit, count, draw):
+    """Return count uniform integers in [0, limit) built from drawn random bytes"""
+    bits = (limit - 1).bit_length()
+    if not bits:
+        return [0] * count
+    width = (bits + 7) // 8
+    mask = (1 << bits) - 1
+    values = []
+    while len(values) < count:
+        # Out-of-range values are redrawn; fewer than half are rejected on average
+        data = draw(ALL_BYTES, (count - len(values)) * width)
+        for offset in range(0, len(data), width):
+            value = int.from_bytes(data[offset:offset + width], 'little') & mask
+            if value < limit:
+                values.append(value)
+    return values
+
+class SeededSource:
+    """Deterministic stand-in for os.urandom, for reproducible tests and benchmarks only
+    
+    Each call returns SHAKE-256 output over (seed, stream, call number), so
+    streams of one seed are independent and replay exactly on every run.
+    """
+    
+    def __init__(self, seed, stream=0):
+        import hashlib
+        if not isinstance(seed, bytes):
+            seed = str(seed).encode('utf-8')
+        self.seed = seed
+        self.stream = stream
+        self._key = hashlib.blake2b(seed, digest_size=32, person=SEEDED_SOURCE_PERSON).digest()
+        self._shake = hashlib.shake_256
+        self._calls = 0
+    
+    def __call__(self, count):
+        counter = SEEDED_SOURCE_COUNTER.pack(self.stream, self._calls)
+        self._calls += 1
+        return self._shake(self._key + counter).digest(count)
+    
+    def spawn(self, stream):
+        """Independent source for another stream of the same seed"""
+        return SeededSource(self.seed, stream)
+
+class PasswordGenerator:
+    """Headless bulk password generator driven by an explicit policy"""
+    
+    def __init__(self, length=12, uppercase=True, lowercase=True, numbers=True, symbols=True, policy=None, source=None):
+        if policy is None:
+            policy = Policy(length, uppercase, lowercase, numbers, symbols)
+        self.policy = policy
+        self.length = policy.length
+        self.source = source if source is not None else os.urandom
+        self._compiled = policy.compile()
+        self._raw = b""
+        self._lock = threading.Lock()
+    
+    def with_source(self, source):
+        """Return a generator for the same policy drawing its bytes from source"""
+        return PasswordGenerator(policy=self.policy, source=source)
+    
+    def _sample(self, symbols, count):
+        """Draw count symbols uniformly from symbols using chunked source bytes"""
+        table, reject = _byte_table(symbols)
+        raw = self._raw
+        drawn = b""
+        
+        while len(drawn) < count:
+            # Rejected bytes are dropped so every symbol is equally likely; the margin avoids most second passes
+            needed = (count - len(drawn)) * 256 // (256 - len(reject)) + (16 if reject else 0)
+            if len(raw) < needed:
+                raw += self.source(max(needed - len(raw), RANDOM_CHUNK_SIZE))
+            drawn += raw[:needed].translate(table, reject)
+            raw = raw[needed:]
+        
+        # One raw buffer serves every alphabet, and only a small tail of it outlives the call
+        self._raw = raw[:RANDOM_KEEP_BYTES]
+        return drawn[:count]
+    
+    @property
+    def distinct(self):
+        """Number of different passwords the policy allows"""
+        return self._compiled.total
+    
+    def generate(self, count=1, unique=None):
+        """Generate count passwords that satisfy the policy, skipping any already in unique"""
+        if unique is not None:
+            return _generate_unique(self.generate, count, unique, self.distinct)
+        with self._lock:
+            return self._compiled.sample(count, self._sample)
     
-    # Add guaranteed characters
-    password.extend(guaranteed_chars)
+    @property
+    def stride(self):
+        """Bytes per record written by generate_into() and generate_buffer()"""
+        return self._compiled.stride
     
-    # Fill remaining positions with random characters
-    remaining_length = length - len(guaranteed_chars)
-    for _ in range(remaining_length):
-        password.append(random.choice(char_sets))
+    def generate_into(self, out, count):
+        """Fill a writable buffer (bytearray, mmap, memoryview) with count newline-terminated records"""
+        with self._lock:
+            self._compiled.sample_into(out, count, self._sample)
     
-    # Shuffle to avoid predictable patterns
-    random.shuffle(password)
+    def generate_buffer(self, count):
+        """Generate count records into one new buffer viewed as (count, stride) bytes"""
+        # The view goes straight to file.write()/socket.sendall(); numpy.asarray() wraps it without copying
+        buffer = bytearray(count * self.stride)
+        self.generate_into(buffer, count)
+        if not count:
+            # memoryview cannot have a zero-length dimension
+            return memoryview(buffer)
+        return memoryview(buffer).cast('B', (count, self.stride))
+
+@functools.lru_cache(maxsize=64)
+def get_password_generator(length=12, uppercase=True, lowercase=True, numbers=True, symbols=True, policy=None):
+    """Return a shared generator for the given policy so its random buffers are reused"""
+    return PasswordGenerator(length, uppercase, lowercase, numbers, symbols, policy)
+
+@functools.lru_cache(maxsize=64)
+def _char_sets_policy(length, char_sets):
+    """Return a Policy drawing from exactly the characters in char_sets, at least one from each type present"""
+    chars = set(char_sets)
+    charsets = (UPPERCASE_CHARS, LOWERCASE_CHARS, DIGIT_CHARS, SYMBOL_CHARS)
+    unsupported = chars.difference(*charsets)
+    if unsupported:
+        raise ValueError(f"Unsupported characters in character set: {''.join(sorted(unsupported))}")
+    
+    # Characters left out of a partly chosen type are excluded rather than filled back in
+    enabled = [not chars.isdisjoint(charset) for charset in charsets]
+    exclude = "".join(c for charset, on in zip(charsets, enabled) if on for c in charset if c not in chars)
+    return Policy(length, *enabled, exclude=exclude)
+
+def generate_secure_passwords(length, char_sets, count, source=None):
+    """Generate count passwords using the character sets chosen in the GUI (source: see SeededSource)"""
+    if not char_sets:
+        return [""] * count
     
-    return ''.join(password)
+    generator = get_password_generator(policy=_char_sets_policy(length, char_sets))
+    if source is not None:
+        generator = generator.with_source(source)
+    return generator.generate(count)
+
+def generate_secure_password(length, char_sets, source=None):
+    """Generate a secure password with guaranteed character diversity"""
+    return generate_secure_passwords(length, char_sets, 1, source)[0]
 
 def calculate_password_strength(password):
     """Calculate password strength score (0-100)"""
@@ -337,7 +1131,7 @@ def calculate_password_strength(password):
     has_lower = any(c.islower() for c in password)
     has_upper = any(c.isupper() for c in password)
     has_digit = any(c.isdigit() for c in password)
-    has_symbol = any(c in "!@#$%^&*()_+-=[]{}|;:,.<>?" for c in password)
+    has_symbol = any(c in SYMBOL_CHARS for c in password)
     
     variety_score = sum([has_lower, has_upper, has_digit, has_symbol]) * 10
     score += variety_score
@@ -349,92 +1143,1369 @@ def calculate_password_strength(password):
     
     return min(score, 100)
 
+class IncrementalStrength:
+    """Running counts behind calculate_password_strength, updated per edit in O(change)"""
+    
+    def __init__(self, password=""):
+        self.reset(password)
+    
+    def reset(self, password=""):
+        """Start over from a complete password"""
+        self.length = 0
+        self.lower = 0
+        self.upper = 0
+        self.digits = 0
+        self.symbols = 0
+        self.frequencies = {}
+        self.insert(password)
+    
+    def insert(self, text):
+        """Account for characters added anywhere in the password"""
+        frequencies = self.frequencies
+        for c in text:
+            frequencies[c] = frequencies.get(c, 0) + 1
+            self.lower += c.islower()
+            self.upper += c.isupper()
+            self.digits += c.isdigit()
+            self.symbols += c in SYMBOL_CHARS
+        self.length += len(text)
+    
+    def remove(self, text):
+        """Account for characters deleted from anywhere in the password"""
+        frequencies = self.frequencies
+        for c in text:
+            if frequencies[c] == 1:
+                del frequencies[c]
+            else:
+                frequencies[c] -= 1
+            self.lower -= c.islower()
+            self.upper -= c.isupper()
+            self.digits -= c.isdigit()
+            self.symbols -= c in SYMBOL_CHARS
+        self.length -= len(text)
+    
+    @property
+    def score(self):
+        """Same score calculate_password_strength gives the current password"""
+        length = self.length
+        if not length:
+            return 0
+        score = (length >= 8) * 10 + (length >= 12) * 10 + (length >= 16) * 10
+        score += sum([self.lower > 0, self.upper > 0, self.digits > 0, self.symbols > 0]) * 10
+        score += int(len(self.frequencies) / length * 30)
+        return min(score, 100)
+
 def get_strength_description(score):
     """Get strength description and color based on score"""
-    if score < 30:
-        return "Very Weak", "#e74c3c"
-    elif score < 50:
-        return "Weak", "#f39c12"
-    elif score < 70:
-        return "Moderate", "#f1c40f"
-    elif score < 85:
-        return "Strong", "#27ae60"
-    else:
-        return "Very Strong", "#2ecc71"
+    for limit, description, color in STRENGTH_BANDS:
+        if limit is None or score < limit:
+            return description, color
 
-def update_strength_display(password):
-    """Update the password strength indicator"""
-    score = calculate_password_strength(password)
-    description, color = get_strength_description(score)
+def _score_chunk(np, passwords):
+    """Score one chunk of passwords with vectorized NumPy operations"""
+    encoded = []
+    fallback = []
+    for index, password in enumerate(passwords):
+        # Non-ASCII text needs str.isupper() etc., and NUL collides with padding
+        if password.isascii() and '\x00' not in password:
+            encoded.append(password.encode('ascii'))
+        else:
+            encoded.append(b"")
+            fallback.append(index)
+    
+    count = len(encoded)
+    packed = np.array(encoded, dtype=bytes)
+    codes = packed.view(np.uint8).reshape(count, packed.dtype.itemsize)
+    lengths = np.fromiter(map(len, encoded), dtype=np.int64, count=count)
+    
+    # Length scoring (0-30 points)
+    scores = 10 * ((lengths >= 8).astype(np.int64) + (lengths >= 12) + (lengths >= 16))
+    
+    # Character variety scoring (0-40 points) from a per-byte class bitmask
+    class_bits = np.zeros(256, dtype=np.uint8)
+    class_bits[np.frombuffer(LOWERCASE_CHARS.encode('ascii'), dtype=np.uint8)] = 1
+    class_bits[np.frombuffer(UPPERCASE_CHARS.encode('ascii'), dtype=np.uint8)] = 2
+    class_bits[np.frombuffer(DIGIT_CHARS.encode('ascii'), dtype=np.uint8)] = 4
+    class_bits[np.frombuffer(SYMBOL_CHARS.encode('ascii'), dtype=np.uint8)] = 8
+    present = np.bitwise_or.reduce(class_bits[codes], axis=1)
+    popcount = np.array([bin(mask).count('1') for mask in range(16)], dtype=np.int64)
+    scores += popcount[present] * 10
+    
+    # Complexity bonus (0-30 points), ignoring the NUL padding column
+    seen = np.zeros((count, 256), dtype=bool)
+    seen[np.arange(count)[:, None], codes] = True
+    seen[:, 0] = False
+    unique = seen.sum(axis=1)
+    nonempty = lengths > 0
+    ratio = np.zeros(count)
+    np.divide(unique, lengths, out=ratio, where=nonempty)
+    scores += np.floor(ratio * 30).astype(np.int64)
+    
+    scores[~nonempty] = 0
+    np.minimum(scores, 100, out=scores)
+    for index in fallback:
+        scores[index] = calculate_password_strength(passwords[index])
+    return scores
+
+def calculate_password_strength_batch(passwords):
+    """Calculate strength scores (0-100) for many passwords at once"""
+    import numpy as np  # For batch scoring (install: pip install numpy)
+    
+    passwords = list(passwords)
+    scores = np.zeros(len(passwords), dtype=np.int64)
+    for start in range(0, len(passwords), SCORE_CHUNK_SIZE):
+        chunk = passwords[start:start + SCORE_CHUNK_SIZE]
+        scores[start:start + len(chunk)] = _score_chunk(np, chunk)
+    return scores
+
+def score_passwords(passwords):
+    """Score many passwords, using the NumPy batch scorer when it is installed"""
+    try:
+        return calculate_password_strength_batch(passwords).tolist()
+    except ImportError:
+        return [calculate_password_strength(password) for password in passwords]
+
+def get_strength_description_batch(scores):
+    """Get arrays of strength descriptions and colors for many scores"""
+    import numpy as np  # For batch scoring (install: pip install numpy)
+    
+    limits = [limit for limit, _, _ in STRENGTH_BANDS if limit is not None]
+    bands = np.searchsorted(limits, np.asarray(scores), side='right')
+    descriptions = np.array([description for _, description, _ in STRENGTH_BANDS])
+    colors = np.array([color for _, _, color in STRENGTH_BANDS])
+    return descriptions[bands], colors[bands]
+
+@functools.lru_cache(maxsize=None)
+def _build_keyboard_layout():
+    """Map every key on a US QWERTY layout to its (row, horizontal position)"""
+    layout = {}
+    for row, (keys, shifted_keys, offset) in enumerate(KEYBOARD_ROWS):
+        for column, (key, shifted_key) in enumerate(zip(keys, shifted_keys)):
+            layout[key] = layout[shifted_key] = (row, offset + column)
+    return layout
+
+def _keyboard_step(layout, a, b):
+    """Return the direction from key a to an adjacent key b, or None"""
+    if a not in layout or b not in layout:
+        return None
+    (row_a, x_a), (row_b, x_b) = layout[a], layout[b]
+    if row_a == row_b and abs(x_a - x_b) == 1:
+        return (0, x_b > x_a)
+    if abs(row_a - row_b) == 1 and abs(x_a - x_b) <= 1:
+        return (row_b - row_a, x_b > x_a)
+    return None
+
+class StrengthIndex:
+    """Aho-Corasick automaton over ranked wordlists, stored as flat arrays"""
+    
+    ARRAY_NAMES = ('edge_start', 'edge_chars', 'edge_target', 'fail', 'output_link', 'depth', 'rank', 'list_id')
+    
+    def __init__(self, list_names, arrays):
+        self.list_names = list_names
+        for name in self.ARRAY_NAMES:
+            setattr(self, name, arrays[name])
+    
+    @classmethod
+    def build(cls, wordlists):
+        """Compile [(list name, words in rank order), ...] into an automaton"""
+        children = [{}]
+        depth = [0]
+        rank = [0]
+        list_id = [0]
+        
+        for current_list, (_, words) in enumerate(wordlists):
+            for word_rank, word in enumerate(words, start=1):
+                word = word.strip().lower()
+                if len(word) < DICTIONARY_MIN_LENGTH:
+                    continue
+                node = 0
+                for char in word:
+                    code = ord(char)
+                    if code not in children[node]:
+                        children[node][code] = len(children)
+                        children.append({})
+                        depth.append(depth[node] + 1)
+                        rank.append(0)
+                        list_id.append(0)
+                    node = children[node][code]
+                # Keep the most common occurrence when a word is in several lists
+                if rank[node] == 0 or word_rank < rank[node]:
+                    rank[node] = word_rank
+                    list_id[node] = current_list
+        
+        # Breadth-first pass for failure links and links to the next output node
+        fail = [0] * len(children)
+        output_link = [0] * len(children)
+        queue = collections.deque(children[0].values())
+        while queue:
+            node = queue.popleft()
+            for code, child in children[node].items():
+                state = fail[node]
+                while state and code not in children[state]:
+                    state = fail[state]
+                target = children[state].get(code, 0)
+                fail[child] = target if target != child else 0
+                output_link[child] = fail[child] if rank[fail[child]] else output_link[fail[child]]
+                queue.append(child)
+        
+        edge_start = array.array('i', [0])
+        edge_chars = array.array('i')
+        edge_target = array.array('i')
+        for edges in children:
+            for code in sorted(edges):
+                edge_chars.append(code)
+                edge_target.append(edges[code])
+            edge_start.append(len(edge_chars))
+        
+        arrays = {
+            'edge_start': edge_start,
+            'edge_chars': edge_chars,
+            'edge_target': edge_target,
+            'fail': array.array('i', fail),
+            'output_link': array.array('i', output_link),
+            'depth': array.array('i', depth),
+            'rank': array.array('i', rank),
+            'list_id': array.array('b', list_id)
+        }
+        return cls([name for name, _ in wordlists], arrays)
+    
+    def save(self, path):
+        """Write the automaton in its compact on-disk format"""
+        names = "\n".join(self.list_names).encode('utf-8')
+        with open(path, 'wb') as f:
+            f.write(STRENGTH_INDEX_HEADER.pack(
+                STRENGTH_INDEX_MAGIC,
+                sys.byteorder == 'little',
+                len(self.fail),
+                len(self.edge_chars),
+                len(names)
+            ))
+            f.write(names)
+            for name in self.ARRAY_NAMES:
+                getattr(self, name).tofile(f)
+    
+    @classmethod
+    def load(cls, path):
+        """Read an automaton written by save() without rebuilding it"""
+        with open(path, 'rb') as f:
+            magic, little_endian, nodes, edges, names_size = STRENGTH_INDEX_HEADER.unpack(
+                f.read(STRENGTH_INDEX_HEADER.size)
+            )
+            if magic != STRENGTH_INDEX_MAGIC:
+                raise ValueError(f"{path} is not a strength index")
+            list_names = f.read(names_size).decode('utf-8').split("\n")
+            
+            arrays = {}
+            sizes = {'edge_start': nodes + 1, 'edge_chars': edges, 'edge_target': edges}
+            for name in cls.ARRAY_NAMES:
+                arrays[name] = array.array('b' if name == 'list_id' else 'i')
+                arrays[name].fromfile(f, sizes.get(name, nodes))
+                if bool(little_endian) != (sys.byteorder == 'little'):
+                    arrays[name].byteswap()
+        return cls(list_names, arrays)
+    
+    def find(self, text):
+        """Yield (start, end, rank, list name) for every indexed word in text"""
+        edge_start, edge_chars, edge_target = self.edge_start, self.edge_chars, self.edge_target
+        fail, output_link, depth, rank = self.fail, self.output_link, self.depth, self.rank
+        
+        node = 0
+        for end, char in enumerate(text):
+            code = ord(char)
+            while True:
+                lo, hi = edge_start[node], edge_start[node + 1]
+                edge = bisect.bisect_left(edge_chars, code, lo, hi)
+                if edge < hi and edge_chars[edge] == code:
+                    node = edge_target[edge]
+                    break
+                if node == 0:
+                    break
+                node = fail[node]
+            
+            match = node if rank[node] else output_link[node]
+            while match:
+                yield end - depth[match] + 1, end, rank[match], self.list_names[self.list_id[match]]
+                match = output_link[match]
+
+@functools.lru_cache(maxsize=None)
+def load_strength_index(path=None):
+    """Load the strength index from disk, or compile the built-in wordlists"""
+    if path is None:
+        path = os.environ.get('PASSWORD_STRENGTH_INDEX', DEFAULT_STRENGTH_INDEX)
+    if os.path.exists(path):
+        return StrengthIndex.load(path)
+    return StrengthIndex.build([
+        ('passwords', COMMON_PASSWORDS.split()),
+        ('english', COMMON_WORDS.split())
+    ])
+
+def _uppercase_variations(token):
+    """Count the capitalisations an attacker would try for a dictionary word"""
+    if token.lower() == token:
+        return 1
+    if token.upper() == token or token[1:].lower() == token[1:] or token[:-1].lower() == token[:-1]:
+        return 2
+    upper = sum(c.isupper() for c in token)
+    lower = sum(c.islower() for c in token)
+    return sum(math.comb(upper + lower, i) for i in range(1, min(upper, lower) + 1))
+
+def _dictionary_matches(password, index):
+    """Find wordlist matches, including simple l33t substitutions"""
+    lowered = password.lower()
+    if len(lowered) != len(password):
+        # Some characters lowercase to several, which would shift match offsets
+        lowered = password
+    unleeted = lowered.translate(L33T_TABLE)
+    
+    for start, end, word_rank, list_name in index.find(lowered):
+        token = password[start:end + 1]
+        yield start, end, word_rank * _uppercase_variations(token), list_name, token
+    
+    if unleeted == lowered:
+        return
+    for start, end, word_rank, list_name in index.find(unleeted):
+        substitutions = sum(a != b for a, b in zip(lowered[start:end + 1], unleeted[start:end + 1]))
+        if substitutions:
+            token = password[start:end + 1]
+            yield start, end, word_rank * _uppercase_variations(token) * 2 ** substitutions, list_name, token
+
+def _run_matches(password, min_length, step):
+    """Yield maximal runs of at least min_length where step(a, b) holds for each pair"""
+    start = 0
+    for end in range(1, len(password) + 1):
+        if end < len(password) and step(password[end - 1], password[end], start, end):
+            continue
+        if end - start >= min_length:
+            yield start, end - 1
+        start = end
+
+def _char_class(char):
+    """Name the character class an attacker would brute-force char from"""
+    if char.islower():
+        return 'lower'
+    if char.isupper():
+        return 'upper'
+    if char.isdigit():
+        return 'digit'
+    if char.isascii():
+        return 'symbol'
+    return 'other'
+
+def _pattern_matches(password):
+    """Find repeats, sequences and keyboard walks in a single pass each"""
+    for start, end in _run_matches(password, 3, lambda a, b, s, e: a == b):
+        cardinality = BRUTEFORCE_CARDINALITY[_char_class(password[start])]
+        yield start, end, cardinality * (end - start + 1), 'repeat', password[start:end + 1]
+    
+    def sequence_step(a, b, start, end):
+        delta = ord(b) - ord(a)
+        if abs(delta) != 1 or _char_class(a) != _char_class(b) or _char_class(a) == 'symbol':
+            return False
+        return end - start < 2 or ord(password[end - 1]) - ord(password[end - 2]) == delta
+    
+    for start, end in _run_matches(password, 3, sequence_step):
+        token = password[start:end + 1]
+        base = 4 if token[0] in 'aAzZ019' else (10 if token[0].isdigit() else 26)
+        descending = 2 if token[1] < token[0] else 1
+        yield start, end, base * len(token) * descending, 'sequence', token
+    
+    layout = _build_keyboard_layout()
+    for start, end in _run_matches(password, 3, lambda a, b, s, e: _keyboard_step(layout, a, b) is not None):
+        token = password[start:end + 1]
+        directions = [_keyboard_step(layout, a, b) for a, b in zip(token, token[1:])]
+        turns = 1 + sum(a != b for a, b in zip(directions, directions[1:]))
+        shifted = 2 if any(c.isupper() or c in KEYBOARD_SHIFTED for c in token) else 1
+        yield start, end, KEYBOARD_STARTS * len(token) * KEYBOARD_DEGREE ** turns * shifted, 'keyboard', token
+
+def _year_guesses(year):
+    """Guesses needed for a year, assuming years near the present are tried first"""
+    return max(abs(year - DATE_REFERENCE_YEAR), DATE_MIN_YEAR_SPACE)
+
+def _date_year(day, month, year):
+    """Return the full year if day, month and a 2- or 4-digit year form a date"""
+    if year < 100:
+        year += 1900 if year > 50 else 2000
+    if 1 <= day <= 31 and 1 <= month <= 12 and 1000 <= year <= 2050:
+        return year
+    return None
+
+def _date_matches(password):
+    """Find years and day/month/year dates with or without separators"""
+    import re
+    for match in re.finditer(DATE_PATTERN, password):
+        digits = match.group(0)
+        start, end = match.start(), match.end() - 1
+        if len(digits) == 4 and 1900 <= int(digits) <= 2050:
+            yield start, end, _year_guesses(int(digits)), 'date', digits
+        if len(digits) in (6, 8):
+            # Try day-month-year, month-day-year and year-month-day orders
+            width = len(digits) - 4
+            candidates = [
+                (digits[:2], digits[2:4], digits[4:]),
+                (digits[2:4], digits[:2], digits[4:]),
+                (digits[-2:], digits[-4:-2], digits[:width])
+            ]
+            for day, month, year in candidates:
+                full_year = _date_year(int(day), int(month), int(year))
+                if full_year:
+                    yield start, end, 365 * _year_guesses(full_year), 'date', digits
+                    break
+    
+    for match in re.finditer(SEPARATED_DATE_PATTERN, password):
+        first, middle, last = (int(group) for group in match.group(1, 3, 4))
+        for day, month, year in ((first, middle, last), (middle, first, last), (last, middle, first)):
+            full_year = _date_year(day, month, year)
+            if full_year:
+                yield match.start(), match.end() - 1, 365 * 4 * _year_guesses(full_year), 'date', match.group(0)
+                break
+
+def estimate_password_strength(password, index=None):
+    """Estimate guesses and entropy bits from the cheapest decomposition of password"""
+    if not password:
+        return {'guesses': 1, 'bits': 0.0, 'score': 0, 'sequence': []}
+    if index is None:
+        index = load_strength_index()
+    
+    ends = collections.defaultdict(list)
+    for match in itertools.chain(
+        _dictionary_matches(password, index),
+        _pattern_matches(password),
+        _date_matches(password)
+    ):
+        ends[match[1]].append(match)
     
+    # Characters not covered by a pattern are brute-forced over the password's classes
+    classes = set(map(_char_class, password))
+    bruteforce_bits = math.log2(sum(BRUTEFORCE_CARDINALITY[name] for name in classes))
+    
+    best = [0.0] + [math.inf] * len(password)
+    choice = [None] * len(password)
+    for end in range(len(password)):
+        best[end + 1] = best[end] + bruteforce_bits
+        for start, _, guesses, pattern, token in ends[end]:
+            bits = best[start] + math.log2(max(guesses, MIN_MATCH_GUESSES))
+            if bits < best[end + 1]:
+                best[end + 1] = bits
+                choice[end] = (start, pattern, token)
+    
+    sequence = []
+    position = len(password)
+    while position:
+        if choice[position - 1] is None:
+            sequence.append(('bruteforce', password[position - 1]))
+            position -= 1
+        else:
+            start, pattern, token = choice[position - 1]
+            sequence.append((pattern, token))
+            position = start
+    sequence.reverse()
+    
+    bits = best[-1]
+    return {
+        'guesses': 2 ** bits,
+        'bits': bits,
+        'score': min(int(bits), 100),
+        'sequence': sequence
+    }
+
+class BreachCorpus:
+    """Memory-mapped SHA-1 breach corpus with a Bloom filter in front of a sorted index"""
+    
+    def __init__(self, path):
+        import mmap
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        
+        magic, self.count, self.bloom_bits, self.bloom_hashes = BREACH_HEADER.unpack_from(self._map, 0)
+        if magic != BREACH_MAGIC:
+            raise ValueError(f"{path} is not a breach index")
+        self._fanout_offset = BREACH_HEADER.size
+        self._bloom_offset = self._fanout_offset + BREACH_FANOUT.size
+        self._records_offset = self._bloom_offset + (self.bloom_bits + 7) // 8
+    
+    def close(self):
+        """Release the memory map"""
+        self._map.close()
+    
+    def _maybe_contains(self, digest):
+        """Check the Bloom filter; False means the digest is definitely absent"""
+        bloom = self._map
+        h1 = int.from_bytes(digest[4:12], 'little')
+        h2 = int.from_bytes(digest[12:20], 'little') | 1
+        for i in range(self.bloom_hashes):
+            bit = (h1 + i * h2) % self.bloom_bits
+            if not bloom[self._bloom_offset + (bit >> 3)] & (1 << (bit & 7)):
+                return False
+        return True
+    
+    def lookup_digest(self, digest):
+        """Return how often a SHA-1 digest appears in the corpus (0 if absent)"""
+        if not self._maybe_contains(digest):
+            return 0
+        
+        # The fan-out table narrows the search to records sharing the first two bytes
+        prefix = int.from_bytes(digest[:2], 'big')
+        lo, hi = struct.unpack_from('<2Q', self._map, self._fanout_offset + prefix * 8)
+        records = self._map
+        while lo < hi:
+            middle = (lo + hi) // 2
+            offset = self._records_offset + middle * BREACH_RECORD.size
+            candidate = records[offset:offset + 20]
+            if candidate < digest:
+                lo = middle + 1
+            elif candidate > digest:
+                hi = middle
+            else:
+                return BREACH_RECORD.unpack_from(records, offset)[1]
+        return 0
+    
+    def lookup(self, password):
+        """Return how often password appears in the corpus (0 if absent)"""
+        import hashlib
+        return self.lookup_digest(hashlib.sha1(password.encode('utf-8')).digest())
+    
+    def lookup_batch(self, passwords):
+        """Return breach counts for many passwords"""
+        return [self.lookup(password) for password in passwords]
+
+def _bloom_size(count, false_positive_rate):
+    """Return (bits, hash count) for a Bloom filter holding count entries"""
+    bits = max(64, math.ceil(-count * math.log(false_positive_rate) / math.log(2) ** 2))
+    hashes = max(1, round(bits / max(count, 1) * math.log(2)))
+    return bits, hashes
+
+def _read_breach_records(path, plaintext):
+    """Yield sorted (digest, count) pairs from a HIBP-style file or a password list"""
+    import hashlib
+    with open(path, 'rb') as f:
+        if plaintext:
+            # Plain password lists are hashed and sorted in memory
+            counts = collections.Counter(
+                hashlib.sha1(line.rstrip(b"\r\n")).digest() for line in f if line.strip()
+            )
+            yield from sorted(counts.items())
+            return
+        
+        previous = b""
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            digest_hex, _, count = line.partition(b":")
+            digest = bytes.fromhex(digest_hex.decode('ascii'))
+            if len(digest) != 20:
+                raise ValueError(f"{path}:{line_number}: expected a SHA-1 hash")
+            if digest <= previous:
+                raise ValueError(f"{path}:{line_number}: hashes must be sorted (use the ordered-by-hash download)")
+            previous = digest
+            yield digest, int(count or 1)
+
+def build_breach_index(source, out, plaintext=False, false_positive_rate=BREACH_FALSE_POSITIVE_RATE):
+    """Convert a HIBP SHA-1 file (HASH:COUNT per line) into a breach index"""
+    import mmap
+    import tempfile
+    
+    # First pass: fixed-width records to a scratch file, plus fan-out counts
+    fanout = array.array('Q', bytes(BREACH_FANOUT.size))
+    with tempfile.TemporaryFile() as scratch:
+        count = 0
+        for digest, occurrences in _read_breach_records(source, plaintext):
+            scratch.write(BREACH_RECORD.pack(digest, min(occurrences, 0xFFFFFFFF)))
+            fanout[int.from_bytes(digest[:2], 'big') + 1] += 1
+            count += 1
+        for prefix in range(1, len(fanout)):
+            fanout[prefix] += fanout[prefix - 1]
+        if sys.byteorder != 'little':
+            fanout.byteswap()
+        
+        bloom_bits, bloom_hashes = _bloom_size(count, false_positive_rate)
+        bloom_offset = BREACH_HEADER.size + BREACH_FANOUT.size
+        records_offset = bloom_offset + (bloom_bits + 7) // 8
+        
+        # Second pass: set Bloom bits and copy records into the mapped output
+        with open(out, 'w+b') as f:
+            f.truncate(records_offset + count * BREACH_RECORD.size)
+            with mmap.mmap(f.fileno(), 0) as index:
+                BREACH_HEADER.pack_into(index, 0, BREACH_MAGIC, count, bloom_bits, bloom_hashes)
+                index[BREACH_HEADER.size:bloom_offset] = fanout.tobytes()
+                
+                scratch.seek(0)
+                position = records_offset
+                while True:
+                    block = scratch.read(BREACH_RECORD.size * 65536)
+                    if not block:
+                        break
+                    for (digest, _) in BREACH_RECORD.iter_unpack(block):
+                        h1 = int.from_bytes(digest[4:12], 'little')
+                        h2 = int.from_bytes(digest[12:20], 'little') | 1
+                        for i in range(bloom_hashes):
+                            bit = (h1 + i * h2) % bloom_bits
+                            index[bloom_offset + (bit >> 3)] |= 1 << (bit & 7)
+                    index[position:position + len(block)] = block
+                    position += len(block)
+    return count
+
+@functools.lru_cache(maxsize=None)
+def load_breach_corpus(path=None):
+    """Open the breach corpus if one has been built, otherwise return None"""
+    if path is None:
+        path = os.environ.get('PASSWORD_BREACH_INDEX', DEFAULT_BREACH_INDEX)
+    if not os.path.exists(path):
+        return None
+    return BreachCorpus(path)
+
+class Wordlist:
+    """Offset-indexed wordlist read through a memory map, one word at a time"""
+    
+    def __init__(self, buffer):
+        magic, self.count = WORDLIST_HEADER.unpack_from(buffer, 0)
+        if magic != WORDLIST_MAGIC:
+            raise ValueError("not a wordlist index")
+        self._buffer = buffer
+        self._offsets = struct.Struct(f"<{self.count + 1}Q")
+    
+    @classmethod
+    def open(cls, path):
+        """Memory-map a wordlist index written by build_wordlist_index()"""
+        import mmap
+        with open(path, 'rb') as f:
+            return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+    
+    @classmethod
+    def from_words(cls, words):
+        """Build an in-memory wordlist index from an iterable of words"""
+        return cls(_pack_wordlist(words))
+    
+    def __len__(self):
+        return self.count
+    
+    def digest(self):
+        """Hash of the packed words, which identifies the wordlist"""
+        import hashlib
+        return hashlib.blake2b(self._buffer, digest_size=16).digest()
+    
+    def __getitem__(self, index):
+        if not 0 <= index < self.count:
+            raise IndexError("word index out of range")
+        start, end = struct.unpack_from('<2Q', self._buffer, WORDLIST_HEADER.size + index * 8)
+        return self._buffer[start:end].decode('utf-8')
+
+def _pack_wordlist(words):
+    """Serialise unique words as a header, an offset table and the word bytes"""
+    encoded = [word.encode('utf-8') for word in dict.fromkeys(words)]
+    offsets = array.array('Q', [WORDLIST_HEADER.size + (len(encoded) + 1) * 8])
+    for word in encoded:
+        offsets.append(offsets[-1] + len(word))
+    if sys.byteorder != 'little':
+        offsets.byteswap()
+    return WORDLIST_HEADER.pack(WORDLIST_MAGIC, len(encoded)) + offsets.tobytes() + b"".join(encoded)
+
+def build_wordlist_index(source, out):
+    """Convert a text wordlist (one word per line, or EFF dice-number format) into an index"""
+    with open(source, encoding='utf-8') as f:
+        words = [line.split()[-1] for line in f if line.strip()]
+    with open(out, 'wb') as f:
+        f.write(_pack_wordlist(words))
+    return len(set(words))
+
+@functools.lru_cache(maxsize=None)
+def load_wordlist(path=None):
+    """Open the passphrase wordlist, falling back to the built-in word list"""
+    if path is None:
+        path = os.environ.get('PASSWORD_WORDLIST', DEFAULT_WORDLIST_INDEX)
+    if os.path.exists(path):
+        return Wordlist.open(path)
+    return Wordlist.from_words(COMMON_WORDS.split())
+
+class PassphraseGenerator:
+    """Diceware-style passphrase generator drawing words uniformly from a wordlist"""
+    
+    def __init__(self, words=6, separator="-", wordlist=None, source=None):
+        if words < 1:
+            raise ValueError("A passphrase needs at least one word")
+        self.words = words
+        self.separator = separator
+        self.wordlist = wordlist if wordlist is not None else load_wordlist()
+        self.source = source if source is not None else os.urandom
+        self._indices = collections.deque()
+        self._lock = threading.Lock()
+    
+    def with_source(self, source):
+        """Return a generator for the same settings drawing its bytes from source"""
+        return PassphraseGenerator(self.words, self.separator, self.wordlist, source)
+    
+    @property
+    def entropy_bits(self):
+        """Exact entropy of one passphrase in bits"""
+        return self.words * math.log2(len(self.wordlist))
+    
+    def _draw_indices(self, count):
+        """Draw count unbiased word indices from chunked source bytes"""
+        size = len(self.wordlist)
+        limit = (1 << 32) - (1 << 32) % size
+        while len(self._indices) < count:
+            values = array.array('I')
+            values.frombytes(self.source(4 * max(count - len(self._indices), RANDOM_CHUNK_SIZE // 4)))
+            self._indices.extend(value % size for value in values if value < limit)
+        return [self._indices.popleft() for _ in range(count)]
+    
+    @property
+    def distinct(self):
+        """Number of different passphrases the wordlist allows"""
+        return len(self.wordlist) ** self.words
+    
+    def generate(self, count=1, unique=None):
+        """Generate count passphrases, skipping any already in unique"""
+        if unique is not None:
+            return _generate_unique(self.generate, count, unique, self.distinct)
+        with self._lock:
+            indices = self._draw_indices(count * self.words)
+        wordlist = self.wordlist
+        words = self.words
+        return [
+            self.separator.join(wordlist[index] for index in indices[n * words:(n + 1) * words])
+            for n in range(count)
+        ]
+
+@functools.lru_cache(maxsize=64)
+def get_passphrase_generator(words=6, separator="-", wordlist_path=None):
+    """Return a shared passphrase generator for the given settings"""
+    return PassphraseGenerator(words, separator, load_wordlist(wordlist_path))
+
+class FingerprintSet:
+    """Keyed 64-bit password fingerprints in an open-addressing array
+    
+    Each 8-byte slot is filled to at most FINGERPRINT_MAX_LOAD and the table
+    doubles when full, so it holds 10.7-21.3 bytes per entry (32 for the
+    moment a grow copies it). Passwords are compared by fingerprint alone. A
+    repeat is always caught; a new password whose fingerprint clashes with
+    one of n earlier entries (odds about n / 2**64) is treated as seen too,
+    so output stays unique and only that new password is skipped.
+    
+    settings identifies the generator settings the set is filled under
+    (see _dedup_settings()); it is saved with the set.
+    """
+    
+    def __init__(self, expected=FINGERPRINT_MIN_SLOTS, key=None, settings=bytes(16)):
+        import hashlib
+        self.key = key if key is not None else os.urandom(16)
+        self.settings = settings
+        self._blake2b = hashlib.blake2b
+        self.count = 0
+        self.checked = 0
+        self.rejected = 0
+        self._slots = array.array('Q', bytes(8 * self._slots_for(expected)))
+    
+    @staticmethod
+    def _slots_for(entries):
+        """Table size that keeps entries under the maximum load factor"""
+        return max(FINGERPRINT_MIN_SLOTS, int(entries / FINGERPRINT_MAX_LOAD) + 1)
+    
+    def fingerprint(self, password):
+        """Keyed 64-bit fingerprint of a password (never 0, which marks empty slots)"""
+        if isinstance(password, str):
+            password = password.encode('utf-8')
+        digest = self._blake2b(password, digest_size=8, key=self.key).digest()
+        return int.from_bytes(digest, 'little') or 1
+    
+    def _insert(self, fingerprint):
+        """Insert a fingerprint, returning False if it was already present"""
+        slots = self._slots
+        size = len(slots)
+        index = fingerprint % size
+        while True:
+            current = slots[index]
+            if current == 0:
+                slots[index] = fingerprint
+                self.count += 1
+                return True
+            if current == fingerprint:
+                return False
+            index += 1
+            if index == size:
+                index = 0
+    
+    def _grow(self, entries):
+        """Rehash into a table large enough for entries fingerprints"""
+        old = self._slots
+        self._slots = array.array('Q', bytes(8 * self._slots_for(entries)))
+        self.count = 0
+        for fingerprint in old:
+            if fingerprint:
+                self._insert(fingerprint)
+    
+    def reserve(self, entries):
+        """Make room for entries more fingerprints without further rehashing"""
+        if (self.count + entries) > len(self._slots) * FINGERPRINT_MAX_LOAD:
+            self._grow(self.count + entries)
+    
+    def add(self, password):
+        """Record password; returns False if it (or its fingerprint) was already seen"""
+        if self.count + 1 > len(self._slots) * FINGERPRINT_MAX_LOAD:
+            self._grow(max(self.count * 2, FINGERPRINT_MIN_SLOTS))
+        self.checked += 1
+        # A fingerprint clash makes a new password look seen: it is replaced, never repeated
+        if self._insert(self.fingerprint(password)):
+            return True
+        self.rejected += 1
+        return False
+    
+    def __contains__(self, password):
+        fingerprint = self.fingerprint(password)
+        slots = self._slots
+        index = fingerprint % len(slots)
+        while slots[index]:
+            if slots[index] == fingerprint:
+                return True
+            index = (index + 1) % len(slots)
+        return False
+    
+    def __len__(self):
+        return self.count
+    
+    @property
+    def collision_rate(self):
+        """Fraction of checked passwords rejected as duplicates"""
+        return self.rejected / self.checked if self.checked else 0.0
+    
+    @property
+    def bytes_per_entry(self):
+        """Memory used by the table per stored fingerprint"""
+        return len(self._slots) * 8 / max(self.count, 1)
+    
+    def save(self, path):
+        """Persist the set so later runs stay unique against this one"""
+        with open(path, 'wb') as f:
+            f.write(FINGERPRINT_HEADER.pack(
+                FINGERPRINT_MAGIC, sys.byteorder == 'little', self.key, self.settings, self.count, len(self._slots)
+            ))
+            self._slots.tofile(f)
+    
+    @classmethod
+    def load(cls, path):
+        """Reload a set written by save()"""
+        with open(path, 'rb') as f:
+            header = f.read(FINGERPRINT_HEADER.size)
+            if header.startswith(b"PWFSET01"):
+                raise ValueError(f"{path} does not record the settings it was filled under; start a new file")
+            magic, little_endian, key, settings, count, size = FINGERPRINT_HEADER.unpack(header)
+            if magic != FINGERPRINT_MAGIC:
+                raise ValueError(f"{path} is not a fingerprint set")
+            fingerprints = cls(key=key, settings=settings)
+            fingerprints._slots = array.array('Q')
+            fingerprints._slots.fromfile(f, size)
+            if bool(little_endian) != (sys.byteorder == 'little'):
+                fingerprints._slots.byteswap()
+            fingerprints.count = count
+        return fingerprints
+
+def _dedup_settings(*settings):
+    """16-byte digest of the generator settings a fingerprint set is filled under"""
+    import hashlib
+    return hashlib.blake2b(repr(settings).encode('utf-8'), digest_size=16).digest()
+
+def _reserve_unique(unique, count, distinct):
+    """Check count more unique passwords exist and size the set for them"""
+    if len(unique) + count > distinct:
+        raise ValueError(f"Only {distinct - len(unique):,} more distinct passwords are possible with these settings")
+    unique.reserve(count)
+
+def _generate_unique(generate, count, unique, distinct):
+    """Call generate(n) until count passwords unseen by unique have been collected"""
+    _reserve_unique(unique, count, distinct)
+    passwords = []
+    while len(passwords) < count:
+        passwords.extend(password for password in generate(count - len(passwords)) if unique.add(password))
+    return passwords
+
+def _reset_generators_after_fork():
+    """Forked workers must not replay random bytes buffered by the parent"""
+    get_password_generator.cache_clear()
+    get_passphrase_generator.cache_clear()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_generators_after_fork)
+
+@metrics.registry.timed('password.assess_strength')
+def assess_strength(password, use_estimator=False, passphrase_words=0, score=None):
+    """Compute the strength bar value, label and color (score: precomputed basic score)"""
+    if passphrase_words and password:
+        # Passphrases have an exact entropy, scored one point per bit
+        bits = get_passphrase_generator(passphrase_words).entropy_bits
+        score = min(int(bits), 100)
+        description, color = get_strength_description(score)
+        label = f"{description} ({bits:.1f} bits of entropy)"
+    elif use_estimator:
+        estimate = estimate_password_strength(password)
+        score = estimate['score']
+        description, color = get_strength_description(score)
+        label = f"{description} (~{estimate['bits']:.0f} bits, {estimate['guesses']:.1e} guesses)"
+    else:
+        if score is None:
+            score = calculate_password_strength(password)
+        description, color = get_strength_description(score)
+        label = f"{description} ({score}/100)"
+    return score, label, color
+
+@metrics.registry.timed('password.render_strength_display')
+def render_strength_display(score, label, color):
+    """Show a computed strength assessment in the indicator"""
     # Update progress bar
     strength_progress['value'] = score
     
     # Update strength label
-    strength_var.set(f"{description} ({score}/100)")
+    strength_var.set(label)
     
     # Update progress bar color (requires style configuration)
     style = ttk.Style()
     style.configure('Strength.Horizontal.TProgressbar', background=color)
 
+def update_strength_display(password):
+    """Update the password strength indicator"""
+    render_strength_display(*assess_strength(password, estimator_var.get(), current_passphrase_words()))
+
+def lookup_breach(password):
+    """Return breach occurrences for password, or None without a corpus"""
+    corpus = load_breach_corpus()
+    if corpus is None or not password:
+        return None
+    return corpus.lookup(password)
+
+def render_breach_display(occurrences):
+    """Show a breach lookup result next to the strength bar"""
+    if occurrences is None:
+        breach_var.set("")
+    elif occurrences:
+        breach_var.set(f"⚠️ Found {occurrences:,} times in known breaches")
+        root.breach_label.config(fg='#e74c3c')
+    else:
+        breach_var.set("✅ Not found in known breaches")
+        root.breach_label.config(fg='#27ae60')
+
+def update_estimator_mode():
+    """Rescore the current password and refill the pool after toggling the estimator"""
+    update_strength_display(password_var.get())
+    if get_character_sets() or passphrase_var.get():
+        password_pool.set_policy(current_pool_policy())
+
+def check_own_password(action, text, proposed):
+    """Entry validatecommand: apply one edit to the running counts and show the new score"""
+    if action == '1':
+        own_password_scorer.insert(text)
+    elif action == '0':
+        own_password_scorer.remove(text)
+    else:
+        own_password_scorer.reset(proposed)
+    
+    if not proposed:
+        # Field cleared: show the generated password again
+        update_strength_display(password_var.get())
+        update_breach_display(password_var.get())
+    else:
+        render_strength_display(*assess_strength(proposed, estimator_var.get(), score=own_password_scorer.score))
+        render_breach_display(lookup_breach(proposed))
+    return True
+
+def update_breach_display(password):
+    """Show whether the password appears in the local breach corpus"""
+    render_breach_display(lookup_breach(password))
+
+def _generate_and_assess(length, char_sets, use_estimator, passphrase_words):
+    """Generate and score a password (runs on the background generation thread)"""
+    return _generate_and_assess_batch(length, char_sets, use_estimator, passphrase_words, 1)[0]
+
+def _generate_and_assess_batch(length, char_sets, use_estimator, passphrase_words, count):
+    """Generate and score count passwords or passphrases in one generator call"""
+    if passphrase_words:
+        passwords = get_passphrase_generator(passphrase_words).generate(count)
+    else:
+        passwords = generate_secure_passwords(length, char_sets, count)
+    return [
+        (password, assess_strength(password, use_estimator, passphrase_words), lookup_breach(password))
+        for password in passwords
+    ]
+
+class PasswordPool:
+    """Background producer keeping a bounded buffer of ready, scored passwords"""
+    
+    def __init__(self, capacity=POOL_CAPACITY, batch_size=POOL_BATCH_SIZE):
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.hits = 0
+        self.misses = 0
+        self._ready = collections.deque()
+        self._policy = None
+        self._condition = threading.Condition()
+        self._thread = None
+        self._error = None
+    
+    def _start(self):
+        """Start the producer thread unless one is running (call with the condition held)"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._produce, name='password-pool', daemon=True)
+            self._thread.start()
+    
+    def set_policy(self, policy):
+        """Switch to (length, char_sets, use_estimator, passphrase_words), dropping passwords made for the old policy"""
+        with self._condition:
+            if policy == self._policy:
+                return
+            self._policy = policy
+            self._ready.clear()
+            self._error = None
+            self._condition.notify()
+            self._start()
+    
+    def pop(self):
+        """Return a ready (password, strength, breach) result, generating one if the pool is empty
+        
+        If the producer stopped on an error, that error is raised here once
+        and a new producer is started.
+        """
+        with self._condition:
+            policy = self._policy
+            error, self._error = self._error, None
+            if error is not None:
+                self._start()
+                raise error
+            if self._ready:
+                self.hits += 1
+                self._condition.notify()
+                return self._ready.popleft()
+            self.misses += 1
+        return _generate_and_assess(*policy)
+    
+    def __len__(self):
+        return len(self._ready)
+    
+    def _produce(self):
+        """Refill the buffer whenever it drops below capacity"""
+        while True:
+            with self._condition:
+                while len(self._ready) >= self.capacity:
+                    self._condition.wait()
+                policy = self._policy
+                count = min(self.capacity - len(self._ready), self.batch_size)
+            
+            try:
+                results = _generate_and_assess_batch(*policy, count)
+            except Exception as e:
+                # Handed to the Tk thread by the next pop(), which also restarts the producer
+                with self._condition:
+                    if policy != self._policy:
+                        # The settings changed meanwhile, so the error belongs to the old ones
+                        continue
+                    self._error = e
+                    self._thread = None
+                return
+            
+            with self._condition:
+                # Results for a policy that changed meanwhile are discarded
+                if policy == self._policy:
+                    self._ready.extend(results[:self.capacity - len(self._ready)])
+
+class PasswordBatch:
+    """Generated passwords in one newline-separated buffer, with scores and a sorted, filtered row order"""
+    
+    SORT_ORDERS = ("Generated", "Strongest first", "Weakest first", "A-Z")
+    
+    def __init__(self):
+        self.data = bytearray()
+        self.ends = array.array('I')
+        self.scores = array.array('B')
+        self.order = array.array('I')
+        self.filter_text = b""
+        self.sort_order = self.SORT_ORDERS[0]
+    
+    def __len__(self):
+        return len(self.ends)
+    
+    def _bytes(self, row):
+        """Row's password bytes (ends[row] points just past its newline)"""
+        return self.data[self.ends[row - 1] if row else 0:self.ends[row] - 1]
+    
+    def password(self, row):
+        return self._bytes(row).decode('utf-8')
+    
+    def append(self, block, scores):
+        """Add a newline-terminated block of passwords and their scores"""
+        first = len(self)
+        base = len(self.data)
+        self.data += block
+        end = block.find(b"\n")
+        while end != -1:
+            self.ends.append(base + end + 1)
+            end = block.find(b"\n", end + 1)
+        self.scores.extend(scores)
+        
+        rows = range(first, len(self))
+        if self.filter_text:
+            rows = [row for row in rows if self.filter_text in self._bytes(row)]
+        self.order.extend(rows)
+        if self.sort_order != self.SORT_ORDERS[0]:
+            self._sort()
+    
+    def _filtered_rows(self):
+        """Rows containing the filter text, found with one scan of the buffer"""
+        if not self.filter_text:
+            return range(len(self))
+        # The filter holds no newline, so a match never spans two rows
+        rows = []
+        position = self.data.find(self.filter_text)
+        while position != -1:
+            row = bisect.bisect_right(self.ends, position)
+            rows.append(row)
+            position = self.data.find(self.filter_text, self.ends[row])
+        return rows
+    
+    def _sort(self):
+        """Reorder the visible rows; ties keep generation order"""
+        generated, strongest, weakest, alphabetical = self.SORT_ORDERS
+        if self.sort_order == strongest:
+            rows = sorted(self.order, key=self.scores.__getitem__, reverse=True)
+        elif self.sort_order == weakest:
+            rows = sorted(self.order, key=self.scores.__getitem__)
+        elif self.sort_order == alphabetical:
+            rows = sorted(self.order, key=self._bytes)
+        else:
+            rows = sorted(self.order)
+        self.order = array.array('I', rows)
+    
+    def set_view(self, filter_text, sort_order):
+        """Show only rows containing filter_text, in sort_order"""
+        self.filter_text = filter_text.replace("\n", "").encode('utf-8')
+        self.sort_order = sort_order
+        self.order = array.array('I', self._filtered_rows())
+        self._sort()
+
+def current_passphrase_words():
+    """Return the passphrase word count, or 0 when passphrase mode is off"""
+    return passphrase_words_var.get() if passphrase_var.get() else 0
+
+def current_pool_policy():
+    """Return the pool policy for the current GUI settings"""
+    return length_var.get(), get_character_sets(), estimator_var.get(), current_passphrase_words()
+
+def get_app_metrics():
+    """Return counters describing the running app"""
+    latencies = sorted(clipboard_latencies)
+    return {
+        'pool_hits': password_pool.hits,
+        'pool_misses': password_pool.misses,
+        'pool_ready': len(password_pool),
+        'clipboard_copies': clipboard_copies,
+        'clipboard_last_ms': round(clipboard_latencies[-1] * 1000, 3) if clipboard_latencies else None,
+        'clipboard_p50_ms': round(latencies[len(latencies) // 2] * 1000, 3) if latencies else None,
+        'clipboard_max_ms': round(latencies[-1] * 1000, 3) if latencies else None
+    }
+
 def update_password_display():
-    """Update password display when settings change"""
-    if hasattr(root, 'password_text') and password_var.get():
-        generate_password()
+    """Coalesce settings changes into a single regeneration per idle frame"""
+    global regeneration_job
+    if get_character_sets() or passphrase_var.get():
+        password_pool.set_policy(current_pool_policy())
+    if hasattr(root, 'password_text') and password_var.get() and regeneration_job is None:
+        regeneration_job = root.after_idle(start_background_generation)
 
-def generate_password():
-    """Main function to generate password"""
+def start_background_generation():
+    """Hand the latest settings to the generation thread"""
+    global regeneration_job, generation_executor, generation_token
+    regeneration_job = None
     if not validate_selection():
         return
     
-    length = length_var.get()
-    char_sets = get_character_sets()
+    if generation_executor is None:
+        from concurrent.futures import ThreadPoolExecutor
+        generation_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='password-generation')
     
-    # Generate password
-    password = generate_secure_password(length, char_sets)
+    generation_token += 1
+    future = generation_executor.submit(_generate_and_assess, *current_pool_policy())
+    root.after(GENERATION_POLL_MS, poll_background_generation, future, generation_token)
+
+def poll_background_generation(future, token):
+    """Apply a finished background generation unless newer settings superseded it"""
+    if not future.done():
+        root.after(GENERATION_POLL_MS, poll_background_generation, future, token)
+    elif token == generation_token:
+        if future.exception() is not None:
+            show_toast(f"Could not generate a password: {future.exception()}", '#e74c3c')
+            return
+        apply_generated_password(*future.result())
+
+@metrics.registry.timed('password.apply_generated_password')
+def apply_generated_password(password, strength, occurrences):
+    """Show a generated password with its strength and breach results"""
+    global title_reset_job
     password_var.set(password)
     
     # Update password display
-    password_text = root.password_text
-    password_text.config(state='normal')
-    password_text.delete(1.0, tk.END)
-    password_text.insert(1.0, password)
-    password_text.config(state='disabled')
+    with metrics.registry.timer('password.text_refresh'):
+        password_text = root.password_text
+        password_text.config(state='normal')
+        password_text.delete(1.0, tk.END)
+        password_text.insert(1.0, password)
+        password_text.config(state='disabled')
     
     # Update strength indicator
-    update_strength_display(password)
+    render_strength_display(*strength)
+    render_breach_display(occurrences)
     
-    # Show success message briefly
-    original_title = root.title()
+    # Show success message briefly, keeping a single pending title reset
+    if title_reset_job is not None:
+        root.after_cancel(title_reset_job)
     root.title("✅ Password Generated!")
-    root.after(2000, lambda: root.title(original_title))
+    title_reset_job = root.after(2000, restore_title)
+
+def restore_title():
+    """Put the window title back after the success message"""
+    global title_reset_job
+    title_reset_job = None
+    root.title(APP_TITLE)
+
+@metrics.registry.timed('password.generate_password')
+def generate_password():
+    """Main function to generate password"""
+    global generation_token
+    if not validate_selection():
+        return
+    
+    # A direct request supersedes any background regeneration still running
+    generation_token += 1
+    password_pool.set_policy(current_pool_policy())
+    try:
+        result = password_pool.pop()
+    except Exception as e:
+        show_toast(f"Could not generate a password: {e}", '#e74c3c')
+        return
+    apply_generated_password(*result)
+
+def show_toast(message, color='#2c3e50'):
+    """Show a short non-modal status message at the bottom of the window"""
+    global toast_job
+    if not hasattr(root, 'toast_label'):
+        root.toast_label = tk.Label(
+            root,
+            font=('Arial', 10, 'bold'),
+            fg='white',
+            padx=12,
+            pady=6
+        )
+    root.toast_label.config(text=message, bg=color)
+    root.toast_label.place(relx=0.5, rely=0.98, anchor='s')
+    root.toast_label.lift()
+    if toast_job is not None:
+        root.after_cancel(toast_job)
+    toast_job = root.after(TOAST_MS, hide_toast)
+
+def hide_toast():
+    """Remove the status message"""
+    global toast_job
+    toast_job = None
+    root.toast_label.place_forget()
+
+def _pyperclip_copy(text):
+    """Copy text with pyperclip (runs on the clipboard thread); returns seconds taken"""
+    started = time.perf_counter()
+    import pyperclip  # For clipboard functionality (install: pip install pyperclip)
+    pyperclip.copy(text)
+    return time.perf_counter() - started
+
+def _pyperclip_clear(text):
+    """Empty the clipboard if it still holds text (runs on the clipboard thread)"""
+    import pyperclip  # For clipboard functionality (install: pip install pyperclip)
+    if pyperclip.paste() == text:
+        pyperclip.copy("")
+
+def _submit_clipboard(func, *args):
+    """Run a clipboard call on the single clipboard thread so copies and clears stay ordered"""
+    global clipboard_executor
+    if clipboard_executor is None:
+        from concurrent.futures import ThreadPoolExecutor
+        clipboard_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='clipboard')
+    return clipboard_executor.submit(func, *args)
 
 def copy_password():
-    """Copy password to clipboard"""
+    """Copy password to clipboard without blocking the window"""
     password = password_var.get()
     if not password:
-        messagebox.showwarning("No Password", "Please generate a password first!")
+        show_toast("Please generate a password first!", '#e67e22')
         return
     
-    try:
-        # Try using pyperclip first
-        pyperclip.copy(password)
-        messagebox.showinfo("Success", "Password copied to clipboard!")
-    except:
+    # Try using pyperclip first; it may spawn a slow helper process
+    future = _submit_clipboard(_pyperclip_copy, password)
+    root.after(GENERATION_POLL_MS, poll_clipboard_copy, future, password)
+
+def poll_clipboard_copy(future, password):
+    """Finish a copy once the clipboard thread is done, falling back to Tk's clipboard"""
+    global clipboard_backend, clipboard_contents, clipboard_copies, clipboard_clear_job
+    if not future.done():
+        root.after(GENERATION_POLL_MS, poll_clipboard_copy, future, password)
+        return
+    
+    if future.exception() is None:
+        clipboard_backend = 'pyperclip'
+        clipboard_latencies.append(future.result())
+    else:
         # Fallback to tkinter clipboard
+        started = time.perf_counter()
         try:
             root.clipboard_clear()
             root.clipboard_append(password)
-            root.update()
-            messagebox.showinfo("Success", "Password copied to clipboard!")
-        except:
-            messagebox.showerror("Error", "Could not copy to clipboard")
+        except tk.TclError:
+            show_toast("Could not copy to clipboard", '#e74c3c')
+            return
+        clipboard_backend = 'tk'
+        clipboard_latencies.append(time.perf_counter() - started)
+    clipboard_contents = password
+    clipboard_copies += 1
+    
+    # Restart the auto-clear timer for the new clipboard contents
+    if clipboard_clear_job is not None:
+        root.after_cancel(clipboard_clear_job)
+        clipboard_clear_job = None
+    try:
+        seconds = max(0, clipboard_clear_var.get())
+    except tk.TclError:
+        seconds = CLIPBOARD_CLEAR_SECONDS
+    if seconds:
+        clipboard_clear_job = root.after(seconds * 1000, clear_clipboard)
+        show_toast(f"Password copied - clipboard clears in {seconds} s", '#27ae60')
+    else:
+        show_toast("Password copied to clipboard", '#27ae60')
+
+def _clear_copied_password():
+    """Wipe the copied password unless something else has been copied since"""
+    if clipboard_backend == 'pyperclip':
+        _submit_clipboard(_pyperclip_clear, clipboard_contents)
+        return
+    try:
+        if root.clipboard_get() == clipboard_contents:
+            root.clipboard_clear()
+    except tk.TclError:
+        pass
+
+def clear_clipboard():
+    """Auto-clear timer callback"""
+    global clipboard_clear_job
+    clipboard_clear_job = None
+    _clear_copied_password()
+    show_toast("Clipboard cleared")
+
+def flush_clipboard_clear():
+    """Clear a still-pending copied password immediately (used when the app exits)"""
+    global clipboard_clear_job
+    if clipboard_clear_job is not None:
+        clipboard_clear_job = None
+        _clear_copied_password()
+    if clipboard_executor is not None:
+        clipboard_executor.shutdown(wait=True)
 
 def setup_keyboard_shortcuts():
     """Setup keyboard shortcuts for common actions"""
     root.bind('<Control-g>', lambda e: generate_password())
     root.bind('<Control-c>', lambda e: copy_password())
     root.bind('<F5>', lambda e: generate_password())
+    root.bind('<Control-l>', lambda e: show_password_list())
 
 def create_menu():
     """Create application menu"""
@@ -446,6 +2517,7 @@ def create_menu():
     menubar.add_cascade(label="File", menu=file_menu)
     file_menu.add_command(label="Generate Password (Ctrl+G)", command=generate_password)
     file_menu.add_command(label="Copy Password (Ctrl+C)", command=copy_password)
+    file_menu.add_command(label="Password List... (Ctrl+L)", command=show_password_list)
     file_menu.add_separator()
     file_menu.add_command(label="Exit", command=root.quit)
     
@@ -454,6 +2526,385 @@ def create_menu():
     menubar.add_cascade(label="Help", menu=help_menu)
     help_menu.add_command(label="About", command=show_about)
     help_menu.add_command(label="Keyboard Shortcuts", command=show_shortcuts)
+    
+    # Debug menu: hot-path timings, off unless APP_METRICS is set or enabled here
+    debug_menu = tk.Menu(menubar, tearoff=0)
+    menubar.add_cascade(label="Debug", menu=debug_menu)
+    debug_menu.add_checkbutton(label="Record Timings", variable=metrics_var, command=toggle_metrics)
+    debug_menu.add_command(label="Show Metrics...", command=show_metrics)
+    debug_menu.add_command(label="Reset Metrics", command=reset_metrics)
+    debug_menu.add_command(label="Save Metrics...", command=save_metrics)
+
+def _generate_list_chunk(length, char_sets, passphrase_words, count):
+    """Generate and score one chunk of the password list (runs on the list thread)"""
+    if passphrase_words:
+        # Scored by exact entropy, as assess_strength does, not by character classes
+        generator = get_passphrase_generator(passphrase_words)
+        block = ("\n".join(generator.generate(count)) + "\n").encode('utf-8')
+        return block, [min(int(generator.entropy_bits), 100)] * count
+    
+    generator = get_password_generator(policy=_char_sets_policy(length, char_sets))
+    block = generator.generate_buffer(count).obj
+    return block, score_passwords(block.decode('utf-8').split("\n")[:-1])
+
+class PasswordListView:
+    """Canvas list that only draws the rows in view, so thousands of passwords scroll without lag"""
+    
+    def __init__(self, parent, on_change=None):
+        self.batch = PasswordBatch()
+        self.on_change = on_change
+        self.first = 0
+        self.selected = set()
+        self.anchor = None
+        self._lines = []
+        
+        self.scrollbar = tk.Scrollbar(parent, orient='vertical', command=self.yview)
+        self.scrollbar.pack(side='right', fill='y')
+        self.canvas = tk.Canvas(parent, bg='white', highlightthickness=1, highlightbackground='#bdc3c7')
+        self.canvas.pack(side='left', fill='both', expand=True)
+        self.canvas.bind('<Configure>', self.layout)
+        self.canvas.bind('<MouseWheel>', lambda e: self.scroll(-3 if e.delta > 0 else 3))
+        self.canvas.bind('<Button-4>', lambda e: self.scroll(-3))
+        self.canvas.bind('<Button-5>', lambda e: self.scroll(3))
+        self.canvas.bind('<Button-1>', lambda e: self.click(e.y, 'single'))
+        self.canvas.bind('<Shift-Button-1>', lambda e: self.click(e.y, 'range'))
+        self.canvas.bind('<Control-Button-1>', lambda e: self.click(e.y, 'toggle'))
+    
+    def layout(self, event=None):
+        """Create one background and two text items per line that fits, then redraw"""
+        width = self.canvas.winfo_width()
+        middle = LIST_ROW_HEIGHT // 2
+        self.canvas.delete('all')
+        self._lines = []
+        for line in range(self.canvas.winfo_height() // LIST_ROW_HEIGHT + 1):
+            top = line * LIST_ROW_HEIGHT
+            self._lines.append((
+                self.canvas.create_rectangle(0, top, width, top + LIST_ROW_HEIGHT, outline=''),
+                self.canvas.create_text(8, top + middle, anchor='w', font=('Courier New', 11), fill='#2c3e50'),
+                self.canvas.create_text(width - 8, top + middle, anchor='e', font=('Arial', 9, 'bold'))
+            ))
+        self.redraw()
+    
+    @property
+    def page_size(self):
+        """Fully visible lines"""
+        return max(1, len(self._lines) - 1)
+    
+    @metrics.registry.timed('password.list_redraw')
+    def redraw(self):
+        """Point the existing canvas items at the rows now in view"""
+        order = self.batch.order
+        self.first = max(0, min(self.first, len(order) - self.page_size))
+        for line, (background, text, score) in enumerate(self._lines):
+            position = self.first + line
+            if position >= len(order):
+                for item in (background, text, score):
+                    self.canvas.itemconfigure(item, state='hidden')
+                continue
+            
+            row = order[position]
+            value = self.batch.scores[row]
+            description, color = get_strength_description(value)
+            if row in self.selected:
+                fill = '#d6eaf8'
+            else:
+                fill = 'white' if position % 2 == 0 else '#f8f9fa'
+            self.canvas.itemconfigure(background, state='normal', fill=fill)
+            self.canvas.itemconfigure(text, state='normal', text=self.batch.password(row))
+            self.canvas.itemconfigure(score, state='normal', text=f"{value}  {description}", fill=color)
+        
+        if order:
+            self.scrollbar.set(self.first / len(order), min(1.0, (self.first + self.page_size) / len(order)))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+        if self.on_change is not None:
+            self.on_change()
+    
+    def yview(self, *args):
+        """Scrollbar command: ('moveto', fraction) or ('scroll', n, 'units'|'pages')"""
+        if args[0] == 'moveto':
+            self.first = int(float(args[1]) * len(self.batch.order))
+        elif args[0] == 'scroll':
+            self.first += int(args[1]) * (self.page_size if args[2] == 'pages' else 1)
+        self.redraw()
+    
+    def scroll(self, lines):
+        self.first += lines
+        self.redraw()
+    
+    def click(self, y, mode):
+        """Select the clicked row: alone, toggled (Ctrl) or as a range from the last click (Shift)"""
+        order = self.batch.order
+        position = self.first + int(y) // LIST_ROW_HEIGHT
+        if position >= len(order):
+            return
+        row = order[position]
+        
+        if mode == 'toggle':
+            self.selected ^= {row}
+            self.anchor = row
+        elif mode == 'range' and self.anchor is not None:
+            try:
+                anchor_position = order.index(self.anchor)
+            except ValueError:
+                anchor_position = position
+            low, high = sorted((anchor_position, position))
+            self.selected = set(order[low:high + 1])
+        else:
+            self.selected = {row}
+            self.anchor = row
+        self.redraw()
+    
+    def select_all(self):
+        self.selected = set(self.batch.order)
+        self.redraw()
+    
+    def selected_passwords(self):
+        """Selected passwords that pass the filter, in display order"""
+        return [self.batch.password(row) for row in self.batch.order if row in self.selected]
+    
+    def clear(self):
+        """Start again with an empty batch, keeping the filter and sort order"""
+        batch = PasswordBatch()
+        batch.set_view(self.batch.filter_text.decode('utf-8'), self.batch.sort_order)
+        self.batch = batch
+        self.first = 0
+        self.selected = set()
+        self.anchor = None
+        self.redraw()
+    
+    def append(self, block, scores):
+        self.batch.append(block, scores)
+        self.redraw()
+    
+    def set_view(self, filter_text, sort_order):
+        self.batch.set_view(filter_text, sort_order)
+        self.first = 0
+        self.redraw()
+
+def show_password_list():
+    """Open (or raise) the window that generates and browses many passwords at once"""
+    window = getattr(root, 'list_window', None)
+    if window is not None and window.winfo_exists():
+        window.lift()
+        return
+    
+    window = tk.Toplevel(root)
+    window.title("Password List")
+    window.geometry("640x620")
+    window.configure(bg='#f0f2f5')
+    window.protocol('WM_DELETE_WINDOW', close_password_list)
+    window.count_var = tk.IntVar(value=LIST_DEFAULT_COUNT)
+    window.filter_var = tk.StringVar()
+    window.sort_var = tk.StringVar(value=PasswordBatch.SORT_ORDERS[0])
+    window.status_var = tk.StringVar()
+    window.remaining = 0
+    root.list_window = window
+    
+    # Count, generate and copy
+    controls = tk.Frame(window, bg='#f0f2f5')
+    controls.pack(fill='x', padx=10, pady=(10, 5))
+    tk.Label(controls, text="Count:", font=('Arial', 10), bg='#f0f2f5', fg='#2c3e50').pack(side='left')
+    tk.Spinbox(
+        controls,
+        from_=1,
+        to=LIST_MAX_COUNT,
+        increment=1000,
+        width=8,
+        textvariable=window.count_var,
+        font=('Arial', 10)
+    ).pack(side='left', padx=5)
+    tk.Button(
+        controls,
+        text="🎲 Generate",
+        command=start_list_generation,
+        font=('Arial', 10, 'bold'),
+        bg='#3498db',
+        fg='white',
+        activebackground='#2980b9',
+        activeforeground='white',
+        relief='flat',
+        padx=12,
+        cursor='hand2'
+    ).pack(side='left', padx=5)
+    tk.Button(
+        controls,
+        text="📋 Copy Selected",
+        command=copy_selected_passwords,
+        font=('Arial', 10, 'bold'),
+        bg='#27ae60',
+        fg='white',
+        activebackground='#229954',
+        activeforeground='white',
+        relief='flat',
+        padx=12,
+        cursor='hand2'
+    ).pack(side='right')
+    
+    # Filter and sort
+    options = tk.Frame(window, bg='#f0f2f5')
+    options.pack(fill='x', padx=10, pady=5)
+    tk.Label(options, text="Filter:", font=('Arial', 10), bg='#f0f2f5', fg='#2c3e50').pack(side='left')
+    tk.Entry(options, textvariable=window.filter_var, width=18, font=('Courier New', 10)).pack(side='left', padx=5)
+    tk.Label(options, text="Sort:", font=('Arial', 10), bg='#f0f2f5', fg='#2c3e50').pack(side='left', padx=(15, 0))
+    sort_box = ttk.Combobox(options, textvariable=window.sort_var, values=PasswordBatch.SORT_ORDERS, state='readonly', width=15)
+    sort_box.pack(side='left', padx=5)
+    window.filter_var.trace_add('write', lambda *args: apply_list_view())
+    sort_box.bind('<<ComboboxSelected>>', lambda e: apply_list_view())
+    
+    # Status line, packed before the list so it keeps its space when the window shrinks
+    tk.Label(
+        window,
+        textvariable=window.status_var,
+        font=('Arial', 9),
+        bg='#f0f2f5',
+        fg='#95a5a6',
+        anchor='w'
+    ).pack(side='bottom', fill='x', padx=10, pady=(5, 10))
+    
+    list_frame = tk.Frame(window, bg='#f0f2f5')
+    list_frame.pack(fill='both', expand=True, padx=10)
+    window.view = PasswordListView(list_frame, on_change=update_list_status)
+    
+    window.bind('<Control-a>', lambda e: window.view.select_all())
+    window.bind('<Control-c>', lambda e: copy_selected_passwords())
+    start_list_generation()
+
+def close_password_list():
+    """Close the list window, abandoning any fill still in progress"""
+    global list_token
+    list_token += 1
+    root.list_window.destroy()
+    root.list_window = None
+
+def update_list_status():
+    """Summarise rows shown, selected and still being generated"""
+    window = root.list_window
+    view = window.view
+    status = f"Showing {len(view.batch.order):,} of {len(view.batch):,}  ·  {len(view.selected):,} selected"
+    if window.remaining:
+        status += f"  ·  generating {window.remaining:,} more..."
+    window.status_var.set(status)
+
+def apply_list_view():
+    """Re-filter and re-sort the list after the filter text or sort order changes"""
+    window = root.list_window
+    window.view.set_view(window.filter_var.get(), window.sort_var.get())
+
+def start_list_generation():
+    """Replace the list with a fresh batch, generated in chunks off the Tk thread"""
+    global list_token
+    if not validate_selection():
+        return
+    window = root.list_window
+    try:
+        count = max(1, min(LIST_MAX_COUNT, window.count_var.get()))
+    except tk.TclError:
+        count = LIST_DEFAULT_COUNT
+    
+    list_token += 1
+    window.remaining = count
+    window.view.clear()
+    length, char_sets, _, passphrase_words = current_pool_policy()
+    submit_list_chunk(list_token, (length, char_sets, passphrase_words))
+
+def submit_list_chunk(token, settings):
+    """Generate the next chunk of the list on the list thread"""
+    global list_executor
+    if list_executor is None:
+        from concurrent.futures import ThreadPoolExecutor
+        list_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='password-list')
+    
+    size = min(root.list_window.remaining, LIST_CHUNK_SIZE)
+    future = list_executor.submit(_generate_list_chunk, *settings, size)
+    root.after(GENERATION_POLL_MS, poll_list_chunk, future, token, settings)
+
+def poll_list_chunk(future, token, settings):
+    """Append a finished chunk and request the next, unless the fill was superseded"""
+    if not future.done():
+        root.after(GENERATION_POLL_MS, poll_list_chunk, future, token, settings)
+        return
+    if token != list_token:
+        return
+    
+    window = root.list_window
+    if future.exception() is not None:
+        window.remaining = 0
+        update_list_status()
+        show_toast(f"Could not generate passwords: {future.exception()}", '#e74c3c')
+        return
+    
+    block, scores = future.result()
+    window.remaining -= len(scores)
+    window.view.append(block, scores)
+    if window.remaining > 0:
+        submit_list_chunk(token, settings)
+
+def copy_selected_passwords():
+    """Copy the selected rows, one password per line, through the normal clipboard path"""
+    passwords = root.list_window.view.selected_passwords()
+    if not passwords:
+        show_toast("Select one or more passwords first", '#e67e22')
+        return
+    text = "\n".join(passwords)
+    future = _submit_clipboard(_pyperclip_copy, text)
+    root.after(GENERATION_POLL_MS, poll_clipboard_copy, future, text)
+
+def toggle_metrics():
+    """Start or stop recording timings from the Debug menu"""
+    metrics.registry.enabled = metrics_var.get()
+    refresh_metrics()
+
+def show_metrics():
+    """Open (or raise) the window listing recorded timings and app counters"""
+    window = getattr(root, 'metrics_window', None)
+    if window is None or not window.winfo_exists():
+        window = tk.Toplevel(root)
+        window.title("Metrics")
+        window.configure(bg='#f0f2f5')
+        window.metrics_text = tk.Text(window, font=('Courier', 10), width=84, height=24, state='disabled')
+        window.metrics_text.pack(fill='both', expand=True, padx=10, pady=(10, 5))
+        
+        buttons = tk.Frame(window, bg='#f0f2f5')
+        buttons.pack(pady=(0, 10))
+        tk.Button(buttons, text="Refresh", command=refresh_metrics).pack(side='left', padx=5)
+        tk.Button(buttons, text="Reset", command=reset_metrics).pack(side='left', padx=5)
+        root.metrics_window = window
+    window.lift()
+    refresh_metrics()
+
+def refresh_metrics():
+    """Redraw the metrics window if it is open"""
+    window = getattr(root, 'metrics_window', None)
+    if window is None or not window.winfo_exists():
+        return
+    text = window.metrics_text
+    text.config(state='normal')
+    text.delete(1.0, tk.END)
+    text.insert(1.0, metrics.registry.report(get_app_metrics()))
+    text.config(state='disabled')
+
+def reset_metrics():
+    """Forget recorded timings"""
+    metrics.registry.reset()
+    refresh_metrics()
+
+def save_metrics():
+    """Write a snapshot of the recorded timings and app counters to a JSON file"""
+    from tkinter import filedialog
+    path = filedialog.asksaveasfilename(
+        parent=root,
+        title="Save Metrics",
+        defaultextension=".json",
+        filetypes=[("JSON files", "*.json"), ("All files", "*.*")],
+        initialfile=os.path.basename(metrics.registry.path or "metrics.json")
+    )
+    if not path:
+        return
+    try:
+        metrics.registry.dump(path, extra=get_app_metrics())
+    except OSError as e:
+        messagebox.showerror("Save Metrics", f"Could not write {path}:\n{e}")
 
 def show_about():
     """Show about dialog"""
@@ -477,14 +2928,18 @@ def show_shortcuts():
         "Available Keyboard Shortcuts:\n\n"
         "Ctrl+G - Generate new password\n"
         "Ctrl+C - Copy password to clipboard\n"
+        "Ctrl+L - Open the password list\n"
         "F5 - Generate new password\n"
         "Alt+F4 - Exit application"
     )
 
 def main():
     """Main function to run the password generator"""
+    global password_pool
+    
     # Initialize GUI
     initialize_gui()
+    password_pool = PasswordPool()
     configure_styles()
     
     # Create GUI components
@@ -510,6 +2965,694 @@ def main():
     
     # Start the GUI main loop
     root.mainloop()
+    flush_clipboard_clear()
+    
+    # Written only when APP_METRICS names a file
+    metrics.registry.dump(extra=get_app_metrics())
+
+class ServiceStats:
+    """Request latency and throughput counters for the local service"""
+    
+    def __init__(self, window=SERVICE_LATENCY_WINDOW):
+        self.started = time.monotonic()
+        self.requests = 0
+        self.batches = 0
+        self.batched_requests = 0
+        self.latencies = collections.deque(maxlen=window)
+        self.finished = collections.deque(maxlen=window)
+    
+    def record_request(self, seconds):
+        """Record one completed request"""
+        self.requests += 1
+        self.latencies.append(seconds)
+        self.finished.append(time.monotonic())
+    
+    def record_batch(self, size):
+        """Record one micro-batch covering size requests"""
+        self.batches += 1
+        self.batched_requests += size
+    
+    def snapshot(self):
+        """Return p50/p99 latency, requests per second and batching counters"""
+        latencies = sorted(self.latencies)
+        now = time.monotonic()
+        recent = [t for t in self.finished if now - t <= SERVICE_RATE_WINDOW]
+        
+        def percentile(fraction):
+            if not latencies:
+                return 0.0
+            return latencies[min(len(latencies) - 1, int(fraction * len(latencies)))] * 1000
+        
+        return {
+            'requests': self.requests,
+            'uptime_s': round(now - self.started, 3),
+            'requests_per_second': round(len(recent) / min(SERVICE_RATE_WINDOW, max(now - self.started, 1e-9)), 1),
+            'p50_ms': round(percentile(0.50), 3),
+            'p99_ms': round(percentile(0.99), 3),
+            'batches': self.batches,
+            'mean_batch_size': round(self.batched_requests / self.batches, 2) if self.batches else 0.0
+        }
+
+class RequestBatcher:
+    """Coalesces concurrent generate/score requests into single bulk calls"""
+    
+    def __init__(self, stats, window=SERVICE_BATCH_WINDOW, max_batch=SERVICE_MAX_BATCH):
+        self.stats = stats
+        self.window = window
+        self.max_batch = max_batch
+        import asyncio
+        self._queue = asyncio.Queue()
+        self._task = None
+    
+    def start(self):
+        """Start the background batching task on the running loop"""
+        import asyncio
+        self._task = asyncio.get_running_loop().create_task(self._run())
+    
+    async def submit(self, kind, payload):
+        """Queue ('generate', (policy, count)) or ('score', passwords) and await the result"""
+        import asyncio
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((kind, payload, future))
+        return await future
+    
+    async def _run(self):
+        import asyncio
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.window
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            self.stats.record_batch(len(batch))
+            try:
+                results = await loop.run_in_executor(None, self._process, batch)
+            except Exception as e:
+                results = [e] * len(batch)
+            for (_, _, future), result in zip(batch, results):
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+    
+    @staticmethod
+    def _process(batch):
+        """Run one generator call per policy and one scorer call for the whole batch"""
+        results = [None] * len(batch)
+        
+        by_policy = collections.defaultdict(list)
+        for position, (kind, payload, _) in enumerate(batch):
+            if kind == 'generate':
+                by_policy[payload[0]].append((position, payload[1]))
+        for policy, requests in by_policy.items():
+            try:
+                passwords = get_password_generator(policy=policy).generate(sum(count for _, count in requests))
+            except ValueError as e:
+                for position, _ in requests:
+                    results[position] = e
+                continue
+            offset = 0
+            for position, count in requests:
+                results[position] = passwords[offset:offset + count]
+                offset += count
+        
+        scoring = [(position, payload) for position, (kind, payload, _) in enumerate(batch) if kind == 'score']
+        if scoring:
+            scores = score_passwords([password for _, passwords in scoring for password in passwords])
+            offset = 0
+            for position, passwords in scoring:
+                results[position] = scores[offset:offset + len(passwords)]
+                offset += len(passwords)
+        return results
+
+def _policy_from_query(query):
+    """Build a Policy from /generate query parameters"""
+    def flag(name, default):
+        return query.get(name, ['1' if default else '0'])[0].lower() in ('1', 'true', 'yes')
+    
+    length = int(query.get('length', ['12'])[0])
+    if not 1 <= length <= SERVICE_MAX_LENGTH:
+        raise ValueError(f"length must be between 1 and {SERVICE_MAX_LENGTH}")
+    min_counts = {
+        name: int(query[f'min_{name}'][0])
+        for name in Policy.CLASS_NAMES if f'min_{name}' in query
+    }
+    if any(count < 0 for count in min_counts.values()):
+        raise ValueError("minimum counts cannot be negative")
+    policy = Policy(
+        length,
+        flag('uppercase', True),
+        flag('lowercase', True),
+        flag('numbers', True),
+        flag('symbols', True),
+        min_counts=min_counts,
+        exclude=query.get('exclude', [''])[0],
+        exclude_ambiguous=flag('exclude_ambiguous', False),
+        no_repeats=flag('no_repeats', False),
+        prefix=query.get('prefix', [''])[0]
+    )
+    # Compile time grows quickly with the minimums under no_repeats, and every compiled policy stays cached
+    if sum(minimum for _, _, minimum in policy.classes) > SERVICE_MAX_MINIMUMS:
+        raise ValueError(f"minimum counts may add up to at most {SERVICE_MAX_MINIMUMS}")
+    return policy
+
+async def _handle_service_request(batcher, method, target, body):
+    """Route one request and return (status, JSON-serialisable body)"""
+    import json
+    from urllib.parse import urlsplit, parse_qs
+    url = urlsplit(target)
+    query = parse_qs(url.query)
+    
+    if url.path == '/generate' and method in ('GET', 'POST'):
+        count = int(query.get('count', ['1'])[0])
+        if not 0 <= count <= SERVICE_MAX_COUNT:
+            return 400, {'error': f"count must be between 0 and {SERVICE_MAX_COUNT}"}
+        passwords = await batcher.submit('generate', (_policy_from_query(query), count))
+        return 200, {'passwords': passwords}
+    
+    if url.path == '/score' and method == 'POST':
+        request = json.loads(body or b"null")
+        passwords = request.get('passwords') if isinstance(request, dict) else None
+        if not isinstance(passwords, list) or not all(isinstance(p, str) for p in passwords):
+            return 400, {'error': "body must be {\"passwords\": [...strings]}"}
+        scores = await batcher.submit('score', passwords)
+        return 200, {
+            'scores': scores,
+            'descriptions': [get_strength_description(score)[0] for score in scores]
+        }
+    
+    if url.path == '/stats' and method == 'GET':
+        return 200, batcher.stats.snapshot()
+    
+    return 404, {'error': f"no route for {method} {url.path}"}
+
+def _parse_request_head(request_line, headers):
+    """Return (method, target, version, body length), raising ValueError if the request is malformed"""
+    parts = request_line.decode('latin-1').split()
+    if len(parts) != 3:
+        raise ValueError("malformed request line")
+    length = headers.get('content-length', '0')
+    if not (length.isascii() and length.isdigit()):
+        raise ValueError("Content-Length must be a non-negative integer")
+    return (*parts, int(length))
+
+async def _serve_connection(batcher, reader, writer):
+    """Serve HTTP/1.1 requests on one keep-alive connection"""
+    import asyncio
+    import json
+    reasons = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 500: 'Internal Server Error'}
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line.strip():
+                break
+            started = time.perf_counter()
+            
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode('latin-1').partition(":")
+                headers[name.strip().lower()] = value.strip()
+            
+            try:
+                method, target, version, length = _parse_request_head(request_line, headers)
+            except ValueError as e:
+                # Where the next request starts is unknown, so the connection ends after the reply
+                status, payload = 400, {'error': str(e)}
+                keep_alive = False
+            else:
+                body = await reader.readexactly(length)
+                try:
+                    status, payload = await _handle_service_request(batcher, method, target, body)
+                except (ValueError, KeyError) as e:
+                    status, payload = 400, {'error': str(e)}
+                except Exception as e:
+                    status, payload = 500, {'error': str(e)}
+                keep_alive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+            
+            content = json.dumps(payload).encode('utf-8')
+            writer.write(
+                f"HTTP/1.1 {status} {reasons[status]}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(content)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1') + content
+            )
+            await writer.drain()
+            batcher.stats.record_request(time.perf_counter() - started)
+            if not keep_alive:
+                break
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+async def serve_passwords(host=SERVICE_HOST, port=SERVICE_PORT, unix_path=None):
+    """Run the local generation/scoring service until cancelled"""
+    import asyncio
+    batcher = RequestBatcher(ServiceStats())
+    batcher.start()
+    
+    def handler(reader, writer):
+        return _serve_connection(batcher, reader, writer)
+    
+    if unix_path:
+        server = await asyncio.start_unix_server(handler, path=unix_path)
+        where = unix_path
+    else:
+        server = await asyncio.start_server(handler, host, port)
+        where = "http://%s:%d" % server.sockets[0].getsockname()[:2]
+    print(f"Serving on {where}", file=sys.stderr, flush=True)
+    async with server:
+        await server.serve_forever()
+
+def _block_sizes(count, block_size):
+    """Split count into consecutive block sizes of at most block_size"""
+    while count > 0:
+        size = min(count, block_size)
+        yield size
+        count -= size
+
+def _generate_block(task):
+    """Generate one newline-terminated block of passwords (runs in worker processes)"""
+    count, factory, policy, seed, number = task
+    generator = factory(**policy)
+    if seed is not None:
+        # Block n always draws from stream n, whichever worker runs it
+        generator = generator.with_source(SeededSource(seed, number))
+    if hasattr(generator, 'generate_buffer'):
+        # Fixed-stride records go out as one buffer, without a str per password
+        return generator.generate_buffer(count).obj
+    return ("\n".join(generator.generate(count)) + "\n").encode('utf-8')
+
+def _unique_lines(block, unique):
+    """Drop lines of a block whose passwords unique has already seen"""
+    lines = [line for line in block.split(b"\n")[:-1] if unique.add(line)]
+    return b"\n".join(lines) + b"\n" if lines else b""
+
+def stream_passwords(out, count, policy, workers=1, block_size=CLI_BLOCK_SIZE, factory=get_password_generator, unique=None, seed=None):
+    """Write count passwords to a binary stream in blocks so memory stays flat
+    
+    With a seed the output is reproducible: the same seed and block size give
+    the same bytes for any number of workers. Never use it for real passwords.
+    """
+    import parallel
+    if unique is not None:
+        _reserve_unique(unique, count, factory(**policy).distinct)
+    
+    remaining = count
+    numbers = itertools.count()
+    while remaining > 0:
+        tasks = ((size, factory, policy, seed, next(numbers)) for size in _block_sizes(remaining, block_size))
+        blocks = parallel.ordered_map(_generate_block, tasks, workers)
+        try:
+            for block in blocks:
+                if unique is not None:
+                    # Duplicates are dropped here and replaced by the next round
+                    block = _unique_lines(block, unique)
+                out.write(block)
+                remaining -= block.count(b"\n")
+        finally:
+            blocks.close()
+        if unique is None:
+            break
+
+def _audit_chunks(path, chunk_bytes=AUDIT_CHUNK_BYTES):
+    """Yield (start, end) byte ranges of a file, each ending just after a newline"""
+    import mmap
+    size = os.path.getsize(path)
+    if not size:
+        return
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        start = 0
+        while start < size:
+            end = data.find(b"\n", min(start + chunk_bytes, size) - 1)
+            end = size if end == -1 else end + 1
+            yield start, end
+            start = end
+
+def _audit_chunk(task):
+    """Score every line in one byte range of a password file (runs in worker processes)"""
+    import heapq
+    import mmap
+    path, start, end, weakest, with_scores = task
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        lines = data[start:end].split(b"\n")
+    if lines[-1] == b"":
+        lines.pop()
+    
+    passwords = [line.rstrip(b"\r").decode('utf-8', 'surrogateescape') for line in lines]
+    present = [index for index, password in enumerate(passwords) if password]
+    scores = score_passwords([passwords[index] for index in present])
+    lowest = [(score, index, passwords[index]) for score, index in heapq.nsmallest(weakest, zip(scores, present))]
+    
+    score_lines = None
+    if with_scores:
+        # One line per input line; blank input lines stay blank
+        column = [""] * len(passwords)
+        for index, score in zip(present, scores):
+            column[index] = str(score)
+        score_lines = "".join(value + "\n" for value in column).encode('ascii')
+    return len(passwords), collections.Counter(scores), lowest, score_lines
+
+def audit_password_file(path, workers=1, weakest=AUDIT_WEAKEST, scores_out=None, chunk_bytes=AUDIT_CHUNK_BYTES):
+    """Score each line of a password file of any size
+    
+    Returns (lines read, Counter of scores, weakest (score, line number,
+    password) tuples). With scores_out, one score per input line is written
+    to that binary stream in file order.
+    """
+    import heapq
+    import parallel
+    tasks = ((path, start, end, weakest, scores_out is not None) for start, end in _audit_chunks(path, chunk_bytes))
+    results = parallel.ordered_map(_audit_chunk, tasks, workers)
+    try:
+        lines = 0
+        histogram = collections.Counter()
+        lowest = []
+        for count, chunk_histogram, chunk_lowest, score_lines in results:
+            histogram.update(chunk_histogram)
+            lowest = heapq.nsmallest(weakest, lowest + [(score, lines + index + 1, password) for score, index, password in chunk_lowest])
+            if scores_out is not None:
+                scores_out.write(score_lines)
+            lines += count
+    finally:
+        results.close()
+    return lines, histogram, lowest
+
+def _add_dedup_arguments(parser):
+    """Add the options shared by commands that can keep their output unique"""
+    parser.add_argument('--unique', action='store_true', help="never output the same password twice (passwords are compared by 64-bit fingerprint, so a rare fingerprint clash skips a new password too)")
+    parser.add_argument('--dedup-file', default=None, metavar='PATH', help="fingerprint file that keeps output unique across runs with the same settings (implies --unique)")
+
+def _open_dedup(parser, args, distinct, settings):
+    """Load or create the fingerprint set requested on the command line"""
+    if not (args.unique or args.dedup_file):
+        return None
+    try:
+        if args.dedup_file and os.path.exists(args.dedup_file):
+            unique = FingerprintSet.load(args.dedup_file)
+            # Its fingerprints only count against distinct if they came from the same settings
+            if unique.settings != settings:
+                raise ValueError(f"{args.dedup_file} was filled with different settings; use a separate file for these")
+        else:
+            unique = FingerprintSet(args.count, settings=settings)
+        _reserve_unique(unique, args.count, distinct)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    return unique
+
+def _close_dedup(args, unique):
+    """Persist the fingerprint set and report how many duplicates were replaced"""
+    if unique is None:
+        return
+    if args.dedup_file:
+        unique.save(args.dedup_file)
+    print(
+        f"{unique.rejected:,} duplicates replaced ({unique.collision_rate:.4%} collision rate); "
+        f"{len(unique):,} fingerprints at {unique.bytes_per_entry:.1f} bytes each",
+        file=sys.stderr
+    )
+
+def parse_generate_args(argv):
+    """Parse arguments for the headless generate mode"""
+    import argparse
+    parser = argparse.ArgumentParser(
+        prog="PASSWORD.py",
+        description="Generate passwords without starting the GUI"
+    )
+    parser.add_argument('--count', type=int, default=1, help="number of passwords to generate")
+    parser.add_argument('--length', type=int, default=12, help="length of each password")
+    parser.add_argument('--out', default='-', help="output file (default: stdout)")
+    parser.add_argument('--workers', type=int, default=1, help="number of generator processes")
+    parser.add_argument('--no-uppercase', dest='uppercase', action='store_false', help="exclude A-Z")
+    parser.add_argument('--no-lowercase', dest='lowercase', action='store_false', help="exclude a-z")
+    parser.add_argument('--no-numbers', dest='numbers', action='store_false', help="exclude 0-9")
+    parser.add_argument('--no-symbols', dest='symbols', action='store_false', help="exclude special characters")
+    for name in Policy.CLASS_NAMES:
+        parser.add_argument(f'--min-{name}', type=int, default=None, metavar='N', help=f"require at least N {name} characters")
+    parser.add_argument('--exclude', default="", help="characters never to use")
+    parser.add_argument('--exclude-ambiguous', action='store_true', help=f"skip look-alike characters ({AMBIGUOUS_CHARS})")
+    parser.add_argument('--no-repeats', action='store_true', help="never repeat a character twice in a row")
+    parser.add_argument('--prefix', default="", help="text every password starts with")
+    parser.add_argument('--seed', default=None, help="reproducible output for tests and benchmarks (NOT secure)")
+    _add_dedup_arguments(parser)
+    
+    args = parser.parse_args(argv)
+    if args.count < 0 or args.workers < 1:
+        parser.error("--count must be non-negative and --workers at least 1")
+    
+    min_counts = {}
+    for name in Policy.CLASS_NAMES:
+        if getattr(args, f'min_{name}') is not None:
+            min_counts[name] = getattr(args, f'min_{name}')
+    try:
+        args.policy = Policy(
+            args.length, args.uppercase, args.lowercase, args.numbers, args.symbols,
+            min_counts=min_counts,
+            exclude=args.exclude,
+            exclude_ambiguous=args.exclude_ambiguous,
+            no_repeats=args.no_repeats,
+            prefix=args.prefix
+        )
+        distinct = args.policy.compile().total
+    except ValueError as e:
+        parser.error(str(e))
+    args.unique_set = _open_dedup(parser, args, distinct, _dedup_settings('password', args.policy.key()))
+    return args
+
+def run_generate_cli(argv):
+    """Stream generated passwords to stdout or a file"""
+    args = parse_generate_args(argv)
+    policy = {'policy': args.policy}
+    
+    if args.out == '-':
+        stream_passwords(sys.stdout.buffer, args.count, policy, args.workers, unique=args.unique_set, seed=args.seed)
+        sys.stdout.flush()
+    else:
+        with open(args.out, 'wb', buffering=1 << 20) as out:
+            stream_passwords(out, args.count, policy, args.workers, unique=args.unique_set, seed=args.seed)
+    _close_dedup(args, args.unique_set)
+    return 0
+
+def _read_wordlist(path):
+    """Read a wordlist file with one entry per line, most common first"""
+    with open(path, encoding='utf-8', errors='replace') as f:
+        return [line.strip() for line in f if line.strip()]
+
+def run_build_index_cli(argv):
+    """Compile local wordlists into the estimator's on-disk index"""
+    import argparse
+    parser = argparse.ArgumentParser(
+        prog="PASSWORD.py build-index",
+        description="Compile wordlists (one entry per line, most common first) for the strength estimator"
+    )
+    parser.add_argument('--passwords', action='append', default=[], help="common password list")
+    parser.add_argument('--words', action='append', default=[], help="dictionary word list")
+    parser.add_argument('--out', default=DEFAULT_STRENGTH_INDEX, help="index file to write")
+    args = parser.parse_args(argv)
+    
+    wordlists = [('passwords', COMMON_PASSWORDS.split()), ('english', COMMON_WORDS.split())]
+    wordlists += [('passwords', _read_wordlist(path)) for path in args.passwords]
+    wordlists += [(os.path.splitext(os.path.basename(path))[0], _read_wordlist(path)) for path in args.words]
+    
+    index = StrengthIndex.build(wordlists)
+    index.save(args.out)
+    print(f"Wrote {len(index.fail)} nodes from {len(wordlists)} wordlists to {args.out}")
+    return 0
+
+def run_build_breach_cli(argv):
+    """Convert a HIBP-style hash list into a memory-mappable breach index"""
+    import argparse
+    parser = argparse.ArgumentParser(
+        prog="PASSWORD.py build-breach",
+        description="Build a breach index from a SHA-1 list ordered by hash (HASH:COUNT per line)"
+    )
+    parser.add_argument('source', help="HIBP SHA-1 file, or a password list with --plaintext")
+    parser.add_argument('--out', default=DEFAULT_BREACH_INDEX, help="index file to write")
+    parser.add_argument('--plaintext', action='store_true', help="source contains one password per line")
+    parser.add_argument('--fp-rate', type=float, default=BREACH_FALSE_POSITIVE_RATE, help="Bloom filter false positive rate")
+    args = parser.parse_args(argv)
+    
+    try:
+        count = build_breach_index(args.source, args.out, args.plaintext, args.fp_rate)
+    except ValueError as e:
+        parser.error(str(e))
+    print(f"Indexed {count:,} hashes into {args.out}")
+    return 0
+
+def run_check_breach_cli(argv):
+    """Report which passwords in a file appear in the breach corpus"""
+    import argparse
+    parser = argparse.ArgumentParser(
+        prog="PASSWORD.py check-breach",
+        description="Check a file of passwords (one per line) against the breach index"
+    )
+    parser.add_argument('passwords', help="password file ('-' for stdin)")
+    parser.add_argument('--index', default=None, help="breach index built with build-breach")
+    args = parser.parse_args(argv)
+    
+    corpus = load_breach_corpus(args.index)
+    if corpus is None:
+        parser.error("no breach index found; build one with 'PASSWORD.py build-breach'")
+    
+    source = sys.stdin if args.passwords == '-' else open(args.passwords, encoding='utf-8', errors='surrogateescape')
+    checked = breached = 0
+    with source:
+        for line_number, line in enumerate(source, start=1):
+            password = line.rstrip("\r\n")
+            if not password:
+                continue
+            checked += 1
+            occurrences = corpus.lookup(password)
+            if occurrences:
+                breached += 1
+                print(f"{line_number}\t{occurrences}\t{password}")
+    
+    print(f"{breached:,} of {checked:,} passwords found in known breaches", file=sys.stderr)
+    return 1 if breached else 0
+
+def run_audit_cli(argv):
+    """Report the strength distribution and weakest entries of a password file"""
+    import argparse
+    parser = argparse.ArgumentParser(
+        prog="PASSWORD.py audit",
+        description="Score every line of a password file and summarise the strength bands"
+    )
+    parser.add_argument('passwords', help="password file, one per line")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="number of scoring processes (default: all cores)")
+    parser.add_argument('--weakest', type=int, default=AUDIT_WEAKEST, metavar='N', help="list the N lowest-scoring passwords")
+    parser.add_argument('--scores', default=None, metavar='PATH', help="write one score per input line to PATH")
+    args = parser.parse_args(argv)
+    if args.workers < 1 or args.weakest < 0:
+        parser.error("--workers must be at least 1 and --weakest non-negative")
+    if not os.path.isfile(args.passwords):
+        parser.error(f"{args.passwords} is not a file")
+    
+    started = time.perf_counter()
+    if args.scores:
+        with open(args.scores, 'wb', buffering=1 << 20) as scores_out:
+            lines, histogram, lowest = audit_password_file(args.passwords, args.workers, args.weakest, scores_out)
+    else:
+        lines, histogram, lowest = audit_password_file(args.passwords, args.workers, args.weakest)
+    elapsed = time.perf_counter() - started
+    
+    scored = sum(histogram.values())
+    bands = collections.Counter()
+    for score, count in histogram.items():
+        bands[get_strength_description(score)[0]] += count
+    print(f"Scored {scored:,} passwords ({lines:,} lines) in {elapsed:.2f} s ({scored / max(elapsed, 1e-9):,.0f}/s)")
+    if scored:
+        print(f"Mean score {sum(score * count for score, count in histogram.items()) / scored:.1f}")
+    print()
+    for _, description, _ in STRENGTH_BANDS:
+        share = bands[description] / scored if scored else 0.0
+        print(f"{description:<12} {bands[description]:>14,} {share:>7.1%}  {'#' * round(share * 40)}")
+    
+    if lowest:
+        print(f"\nWeakest {len(lowest)}:")
+        for score, line_number, password in lowest:
+            # Undecodable bytes are shown as escapes rather than breaking the terminal
+            print(f"{line_number:>12}  {score:>3}  {password.encode('utf-8', 'surrogateescape').decode('utf-8', 'backslashreplace')}")
+    return 0
+
+def run_passphrase_cli(argv):
+    """Stream generated passphrases to stdout or a file"""
+    import argparse
+    parser = argparse.ArgumentParser(
+        prog="PASSWORD.py passphrase",
+        description="Generate diceware-style passphrases without starting the GUI"
+    )
+    parser.add_argument('--count', type=int, default=1, help="number of passphrases to generate")
+    parser.add_argument('--words', type=int, default=6, help="words per passphrase")
+    parser.add_argument('--separator', default="-", help="text placed between words")
+    parser.add_argument('--wordlist', default=None, help="wordlist index built with build-wordlist")
+    parser.add_argument('--out', default='-', help="output file (default: stdout)")
+    parser.add_argument('--workers', type=int, default=1, help="number of generator processes")
+    parser.add_argument('--seed', default=None, help="reproducible output for tests and benchmarks (NOT secure)")
+    _add_dedup_arguments(parser)
+    args = parser.parse_args(argv)
+    if args.count < 0 or args.workers < 1:
+        parser.error("--count must be non-negative and --workers at least 1")
+    
+    policy = {'words': args.words, 'separator': args.separator, 'wordlist_path': args.wordlist}
+    try:
+        generator = get_passphrase_generator(**policy)
+    except ValueError as e:
+        parser.error(str(e))
+    settings = _dedup_settings('passphrase', args.words, args.separator, generator.wordlist.digest())
+    unique = _open_dedup(parser, args, generator.distinct, settings)
+    print(f"{generator.entropy_bits:.1f} bits of entropy per passphrase", file=sys.stderr)
+    
+    if args.out == '-':
+        stream_passwords(sys.stdout.buffer, args.count, policy, args.workers, factory=get_passphrase_generator, unique=unique, seed=args.seed)
+        sys.stdout.flush()
+    else:
+        with open(args.out, 'wb', buffering=1 << 20) as out:
+            stream_passwords(out, args.count, policy, args.workers, factory=get_passphrase_generator, unique=unique, seed=args.seed)
+    _close_dedup(args, unique)
+    return 0
+
+def run_build_wordlist_cli(argv):
+    """Convert a text wordlist into the memory-mappable passphrase index"""
+    import argparse
+    parser = argparse.ArgumentParser(
+        prog="PASSWORD.py build-wordlist",
+        description="Index a wordlist (one word per line, or EFF 'dice-number word' lines) for passphrases"
+    )
+    parser.add_argument('source', help="text wordlist")
+    parser.add_argument('--out', default=DEFAULT_WORDLIST_INDEX, help="index file to write")
+    args = parser.parse_args(argv)
+    
+    count = build_wordlist_index(args.source, args.out)
+    print(f"Indexed {count:,} words into {args.out} ({math.log2(max(count, 1)):.2f} bits per word)")
+    return 0
+
+def run_serve_cli(argv):
+    """Run the local HTTP generation and scoring service"""
+    import argparse
+    import asyncio
+    parser = argparse.ArgumentParser(
+        prog="PASSWORD.py serve",
+        description="Serve GET /generate, POST /score and GET /stats over local HTTP"
+    )
+    parser.add_argument('--host', default=SERVICE_HOST, help="address to bind (default: localhost only)")
+    parser.add_argument('--port', type=int, default=SERVICE_PORT, help="TCP port")
+    parser.add_argument('--unix', default=None, metavar='PATH', help="listen on a Unix socket instead of TCP")
+    args = parser.parse_args(argv)
+    
+    try:
+        asyncio.run(serve_passwords(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+def run_cli(argv):
+    """Run a headless command and return the exit status"""
+    commands = {
+        'serve': run_serve_cli,
+        'passphrase': run_passphrase_cli,
+        'build-wordlist': run_build_wordlist_cli,
+        'build-index': run_build_index_cli,
+        'build-breach': run_build_breach_cli,
+        'check-breach': run_check_breach_cli,
+        'audit': run_audit_cli
+    }
+    if argv[0] in commands:
+        return commands[argv[0]](argv[1:])
+    return run_generate_cli(argv)
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(run_cli(sys.argv[1:]))
     main()
@@ -0,0 +1,455 @@
+"""Headless benchmarks and perf-regression check for PASSWORD.py and CALCULATOR.py
+
+Run from anywhere:
+    python benchmarks/bench.py              # compare against baseline.json
+    python benchmarks/bench.py --save       # record a new baseline on this machine
+    python benchmarks/bench.py -k score     # only benchmarks whose name contains "score"
+    python benchmarks/bench.py --importtime # slowest imports per entry point vs. the startup budget
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import string
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import PASSWORD
+import CALCULATOR
+
+# Stored results to compare against
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# Fixed seed so every run scores and calculates the same inputs
+SEED = 20240601
+
+# A benchmark fails when it is this much slower than its baseline
+REGRESSION_THRESHOLD = 0.25
+
+# A benchmark that looks regressed or over budget is rerun, next to a fresh
+# calibration, up to this many times; it fails only if every run is slow
+REGRESSION_RETRIES = 3
+
+# Timing: best of REPEAT runs, each lasting at least MIN_TIME seconds
+REPEAT = 5
+MIN_TIME = 0.2
+STARTUP_REPEAT = 5
+
+# Generation matrix
+GENERATE_LENGTHS = (8, 12, 16, 32, 64)
+GENERATE_POLICIES = {
+    'default': {},
+    'letters': {'numbers': False, 'symbols': False},
+    'min-counts': {'min_counts': {'uppercase': 2, 'numbers': 2, 'symbols': 2}},
+    'no-repeats': {'no_repeats': True},
+    'no-ambiguous': {'exclude_ambiguous': True}
+}
+GENERATE_BATCH = 1000
+
+# Scoring and calculator inputs
+SCORE_CORPUS_SIZE = 20000
+ESTIMATOR_CORPUS_SIZE = 500
+EXPRESSION_COUNT = 20000
+COLUMN_ROWS = 1000000
+REPEATED_FORMULAS = 500
+
+# Entry points timed from a fresh interpreter; GUI launches import Tk but open no window
+STARTUP_COMMANDS = {
+    'password-headless': ["-c", "import PASSWORD"],
+    'password-cli': ["PASSWORD.py", "--count", "1"],
+    'password-gui': ["-c", "import PASSWORD; PASSWORD.load_gui_modules()"],
+    'calculator-headless': ["-c", "import CALCULATOR"],
+    'calculator-gui': ["-c", "import CALCULATOR; CALCULATOR.load_gui_modules()"]
+}
+
+# Modules whose bytecode is refreshed before startup is timed
+STARTUP_MODULES = ("PASSWORD.py", "CALCULATOR.py", "metrics.py")
+
+# Startup budget: total seconds spent importing modules, as reported by -X importtime,
+# on a machine as fast as the baseline's; scaled by calibration like the baseline values
+IMPORT_BUDGETS = {
+    'imports/password-headless': 0.030,
+    'imports/password-cli': 0.045,
+    'imports/password-gui': 0.060,
+    'imports/calculator-headless': 0.020,
+    'imports/calculator-gui': 0.050
+}
+
+def measure(func, items=1):
+    """Return the best rate (items per second) of func() over REPEAT timed runs"""
+    func()  # Warm caches, buffers and compiled policies before timing
+    best = 0.0
+    for _ in range(REPEAT):
+        calls = 0
+        start = time.perf_counter()
+        while True:
+            func()
+            calls += 1
+            elapsed = time.perf_counter() - start
+            if elapsed >= MIN_TIME:
+                break
+        best = max(best, calls * items / elapsed)
+    return best
+
+def compile_startup_modules():
+    """Write fresh bytecode for the timed modules so no startup run includes compiling them"""
+    # Under PYTHONDONTWRITEBYTECODE an edited module keeps a stale .pyc and is recompiled on every start
+    import py_compile
+    for name in STARTUP_MODULES:
+        py_compile.compile(os.path.join(ROOT, name), doraise=True)
+
+def measure_startup(args):
+    """Return the fastest wall time of a fresh interpreter running args"""
+    best = float('inf')
+    for _ in range(STARTUP_REPEAT):
+        start = time.perf_counter()
+        subprocess.run([sys.executable] + args, cwd=ROOT, stdout=subprocess.DEVNULL, check=True)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def import_profile(args):
+    """Run args under -X importtime; return (total seconds, [(self us, cumulative us, module)])"""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime"] + args,
+        cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True
+    )
+    rows = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, module = line[len("import time:"):].split("|")
+        rows.append((int(own), int(cumulative), module[1:].rstrip()))
+    # Nested imports are indented and already counted in their parent's cumulative time
+    total = sum(cumulative for _, cumulative, module in rows if not module.startswith(" "))
+    return total / 1e6, rows
+
+def measure_imports(args):
+    """Return the smallest total import time of a fresh interpreter running args"""
+    return min(import_profile(args)[0] for _ in range(STARTUP_REPEAT))
+
+def report_imports(top, speed=1.0):
+    """Print an -X importtime summary for every entry point; return the names over budget"""
+    compile_startup_modules()
+    over = []
+    for name, args in STARTUP_COMMANDS.items():
+        total, rows = min((import_profile(args) for _ in range(STARTUP_REPEAT)), key=lambda profile: profile[0])
+        budget = IMPORT_BUDGETS[f'imports/{name}'] / speed
+        status = "ok" if total <= budget else "OVER BUDGET"
+        if total > budget:
+            over.append(name)
+        print(f"{name}: {total * 1000:.1f} ms of imports (budget {budget * 1000:.0f} ms) {status}")
+        print(f"  {'self ms':>8} {'cumul ms':>9}  module")
+        for own, cumulative, module in sorted(rows, reverse=True)[:top]:
+            print(f"  {own / 1000:>8.2f} {cumulative / 1000:>9.2f}  {module.strip()}")
+    return over
+
+def calibrate():
+    """Rate of a fixed pure-Python loop, used to factor out machine speed and load"""
+    def work():
+        total = 0
+        for i in range(10000):
+            total += i * i % 7
+        return total
+    
+    return measure(work, 10000)
+
+def password_corpus(count, rng):
+    """Build a fixed mix of weak, typical and strong passwords"""
+    alphabets = [
+        string.ascii_lowercase,
+        string.ascii_lowercase + string.digits,
+        string.ascii_letters + string.digits,
+        string.ascii_letters + string.digits + PASSWORD.SYMBOL_CHARS
+    ]
+    words = PASSWORD.COMMON_WORDS.split() + PASSWORD.COMMON_PASSWORDS.split()
+    corpus = []
+    for n in range(count):
+        if n % 4 == 0:
+            corpus.append(rng.choice(words) + str(rng.randrange(100)))
+        else:
+            alphabet = rng.choice(alphabets)
+            corpus.append("".join(rng.choice(alphabet) for _ in range(rng.randint(4, 24))))
+    return corpus
+
+def expression_corpus(count, rng):
+    """Build fixed 'first operation second' calculator inputs without zero divisors"""
+    expressions = []
+    for _ in range(count):
+        operation = rng.choice('+-×÷')
+        first = str(rng.choice([rng.randint(-999, 999), round(rng.uniform(-1e6, 1e6), rng.randint(0, 6))]))
+        second = str(rng.choice([rng.randint(1, 999), round(rng.uniform(0.001, 1e4), rng.randint(1, 6))]))
+        expressions.append(first + operation + second)
+    return expressions
+
+def bench_generation():
+    """Passwords per second for each length and policy, plus the single-password GUI path"""
+    for name, options in GENERATE_POLICIES.items():
+        for length in GENERATE_LENGTHS:
+            generator = PASSWORD.PasswordGenerator(policy=PASSWORD.Policy(length, **options))
+            run = lambda generator=generator: measure(lambda: generator.generate(GENERATE_BATCH), GENERATE_BATCH)
+            yield f'generate/{name}/{length}', 'passwords/s', run
+    
+    # Same policy from the deterministic source, so runs can be replayed and compared
+    seeded = PASSWORD.PasswordGenerator(policy=PASSWORD.Policy(12), source=PASSWORD.SeededSource(SEED))
+    yield 'generate/seeded/12', 'passwords/s', lambda: measure(lambda: seeded.generate(GENERATE_BATCH), GENERATE_BATCH)
+    
+    char_sets = PASSWORD.UPPERCASE_CHARS + PASSWORD.LOWERCASE_CHARS + PASSWORD.DIGIT_CHARS + PASSWORD.SYMBOL_CHARS
+    yield 'generate/single/12', 'passwords/s', lambda: measure(lambda: PASSWORD.generate_secure_password(12, char_sets))
+
+def bench_scoring():
+    """Scores per second one at a time, in bulk, and with the entropy estimator"""
+    corpus = password_corpus(SCORE_CORPUS_SIZE, random.Random(SEED))
+    sample = corpus[:ESTIMATOR_CORPUS_SIZE]
+    
+    def score_single():
+        for password in corpus:
+            PASSWORD.calculate_password_strength(password)
+    
+    def estimate():
+        index = PASSWORD.load_strength_index()
+        for password in sample:
+            PASSWORD.estimate_password_strength(password, index)
+    
+    yield 'score/single', 'scores/s', lambda: measure(score_single, len(corpus))
+    yield 'score/batch', 'scores/s', lambda: measure(lambda: PASSWORD.score_passwords(corpus), len(corpus))
+    yield 'score/estimator', 'scores/s', lambda: measure(estimate, len(sample))
+
+def formula_corpus(count, rng, depth=3, binary=False):
+    """Build fixed expression strings with nesting, precedence, signs and percentages
+    
+    With binary=True every number and step is exact in binary floating point
+    (whole numbers and eighths joined by +, - and ×), so the exact modes
+    can stay on their float fast path.
+    """
+    def build(level):
+        if level == 0 or rng.random() < 0.3:
+            if binary:
+                return rng.choice(['', '', '', '-']) + str(rng.randint(1, 999) / rng.choice([1, 2, 4, 8]))
+            number = str(rng.choice([rng.randint(1, 999), round(rng.uniform(0.01, 1e4), rng.randint(1, 4))]))
+            return rng.choice(['', '', '', '-']) + number + rng.choice(['', '', '', '', '%'])
+        left = build(level - 1)
+        right = build(level - 1)
+        text = f"{left}{rng.choice('+-×' if binary else '+-×÷')}{right}"
+        return f"({text})" if rng.random() < 0.5 else text
+    
+    formulas = []
+    while len(formulas) < count:
+        text = build(depth)
+        try:
+            for mode in CALCULATOR.MODES:
+                CALCULATOR.evaluate_expression(text, mode)
+        except (ArithmeticError, ValueError):
+            continue
+        formulas.append(text)
+    return formulas
+
+def bench_calculator():
+    """Expressions per second through the calculator's arithmetic and expression engine"""
+    expressions = expression_corpus(EXPRESSION_COUNT, random.Random(SEED))
+    formulas = formula_corpus(EXPRESSION_COUNT, random.Random(SEED))
+    compiled = [CALCULATOR.compile_expression(text) for text in formulas]
+    
+    def evaluate():
+        # What the = key runs: the shared expression cache plus display formatting
+        for text in expressions:
+            CALCULATOR.evaluate_expression(text)
+    
+    def compile_formulas():
+        for text in formulas:
+            CALCULATOR.compile_expression(text)
+    
+    def evaluate_compiled():
+        for expression in compiled:
+            expression.evaluate()
+    
+    yield 'calculator/expressions', 'expressions/s', lambda: measure(evaluate, len(expressions))
+    yield 'calculator/compile', 'expressions/s', lambda: measure(compile_formulas, len(formulas))
+    yield 'calculator/evaluate', 'expressions/s', lambda: measure(evaluate_compiled, len(compiled))
+    
+    # The --eval-file path in one process: line splitting, evaluation, formatting and errors
+    lines = ("\n".join(formulas) + "\n").encode('utf-8')
+    yield 'calculator/batch', 'lines/s', lambda: measure(lambda: CALCULATOR.evaluate_stream(io.BytesIO(lines), io.BytesIO()), len(formulas))
+    
+    # A few hundred formulas resubmitted over and over: constant ones come from the
+    # result memo, ones with a variable skip parsing through the compiled-expression cache
+    repeated = [formulas[i % REPEATED_FORMULAS] for i in range(len(formulas))]
+    with_variable = [f"({text})×x" for text in repeated]
+    cache = CALCULATOR.ExpressionCache()
+    
+    def evaluate_repeated():
+        for text in repeated:
+            cache.evaluate(text)
+    
+    def evaluate_with_variable():
+        for x, text in enumerate(with_variable):
+            cache.evaluate(text, {'x': x})
+    
+    yield 'calculator/repeated', 'expressions/s', lambda: measure(evaluate_repeated, len(repeated))
+    yield 'calculator/repeated-variables', 'expressions/s', lambda: measure(evaluate_with_variable, len(with_variable))
+    
+    # One formula over whole columns: in-place ufunc steps into a preallocated result
+    import numpy as np
+    column_rng = np.random.default_rng(SEED)
+    columns = {'x': column_rng.uniform(0, 100, COLUMN_ROWS), 'y': column_rng.uniform(1, 50, COLUMN_ROWS)}
+    column_formula = CALCULATOR.compile_expression("(x*1.2 + y) / y - 5%")
+    result = np.empty(COLUMN_ROWS)
+    yield 'calculator/columns', 'rows/s', lambda: measure(lambda: column_formula.evaluate_columns(columns, out=result), COLUMN_ROWS)
+    
+    # Per-operation cost of each arithmetic mode, on general formulas and on ones
+    # the exact modes can answer from their float fast path
+    binary = [CALCULATOR.compile_expression(text) for text in formula_corpus(EXPRESSION_COUNT, random.Random(SEED), binary=True)]
+    for corpus_name, corpus in (('', compiled), ('-binary', binary)):
+        operations = sum(opcode != CALCULATOR.PUSH for expression in corpus for opcode, _ in expression.code)
+        for mode in CALCULATOR.MODES:
+            def evaluate_mode(corpus=corpus, mode=mode):
+                for expression in corpus:
+                    expression.evaluate(mode)
+            yield f'calculator/ops/{mode}{corpus_name}', 'operations/s', lambda run=evaluate_mode, n=operations: measure(run, n)
+
+def bench_startup():
+    """Seconds from process start to each entry point being ready, and the import share of it"""
+    compile_startup_modules()
+    for name, args in STARTUP_COMMANDS.items():
+        yield f'startup/{name}', 's', lambda args=args: measure_startup(args)
+        yield f'imports/{name}', 's', lambda args=args: measure_imports(args)
+
+BENCHMARKS = (bench_generation, bench_scoring, bench_calculator, bench_startup)
+
+def run_benchmarks(selected=None):
+    """Run every benchmark (or those whose name contains selected)
+    
+    Returns {name: (value, unit)} and {name: run}, so that a result can be
+    measured again.
+    """
+    results = {}
+    runners = {}
+    for bench in BENCHMARKS:
+        for name, unit, run in bench():
+            if selected and selected not in name:
+                continue
+            results[name] = (run(), unit)
+            runners[name] = run
+            print(f"  {name}: {format_value(results[name][0], unit)} {unit}", file=sys.stderr, flush=True)
+    return results, runners
+
+def rerun(names, results, runners, calibration):
+    """Measure names again and keep each one's best result
+    
+    Every rerun is bracketed by its own calibration, and its value rescaled to
+    the run-wide calibration, so a burst of load during the first measurement
+    does not count against the code. Returns the updated results for names.
+    """
+    rerun_results = {}
+    for name in names:
+        value, unit = results[name]
+        local = calibrate()
+        again = runners[name]()
+        local = (local + calibrate()) / 2
+        if unit == 's':
+            value = min(value, again * local / calibration)
+        else:
+            value = max(value, again * calibration / local)
+        results[name] = rerun_results[name] = (value, unit)
+        print(f"  {name}: {format_value(again, unit)} {unit} (rerun)", file=sys.stderr, flush=True)
+    return rerun_results
+
+def format_value(value, unit):
+    """Format a rate as a whole number and a time in seconds to 0.1 ms"""
+    return f"{value:,.4f}" if unit == 's' else f"{value:,.0f}"
+
+def compare(results, baseline, threshold, speed=1.0):
+    """Print a comparison table and return the names that regressed
+    
+    Baseline values and import budgets are scaled by speed, this machine's
+    calibration rate relative to the one the baseline was recorded on.
+    """
+    regressions = []
+    print(f"Machine speed relative to baseline: {speed:.2f}x")
+    print(f"{'benchmark':<32} {'baseline':>14} {'current':>14} {'change':>8}  unit")
+    for name, (value, unit) in results.items():
+        if name in IMPORT_BUDGETS and value > IMPORT_BUDGETS[name] / speed:
+            regressions.append(name)
+            print(f"{name:<32} {'budget':>14} {format_value(value, unit):>14} {'':>8}  {unit}  OVER BUDGET ({IMPORT_BUDGETS[name] / speed:.4f} s)")
+            continue
+        previous = baseline.get(name, {}).get('value')
+        if previous is not None:
+            previous = previous / speed if unit == 's' else previous * speed
+        if previous is None:
+            print(f"{name:<32} {'-':>14} {format_value(value, unit):>14} {'new':>8}  {unit}")
+            continue
+        # Rates should not drop; times (unit 's') should not grow
+        change = (previous / value - 1) if unit == 's' else (value / previous - 1)
+        status = ""
+        if change < -threshold:
+            regressions.append(name)
+            status = "  REGRESSED"
+        print(f"{name:<32} {format_value(previous, unit):>14} {format_value(value, unit):>14} {change:>+8.1%}  {unit}{status}")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark PASSWORD.py and CALCULATOR.py hot paths")
+    parser.add_argument('-k', dest='selected', default=None, help="only run benchmarks whose name contains this text")
+    parser.add_argument('--save', action='store_true', help="write the results as the new baseline")
+    parser.add_argument('--baseline', default=BASELINE_PATH, help="baseline file to compare against")
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD, help="allowed slowdown before failing (0.25 = 25%%)")
+    parser.add_argument('--importtime', type=int, nargs='?', const=15, default=None, metavar='TOP',
+                        help="only report the slowest imports of each entry point against the startup budget")
+    args = parser.parse_args(argv)
+    
+    stored = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            stored = json.load(f)
+    
+    if args.importtime is not None:
+        speed = calibrate() / stored['calibration'] if stored else 1.0
+        return 1 if report_imports(args.importtime, speed) else 0
+    
+    calibration = calibrate()
+    results, runners = run_benchmarks(args.selected)
+    # Average the calibration over the run so gradual throttling is accounted for
+    calibration = (calibration + calibrate()) / 2
+    
+    baseline = {}
+    speed = 1.0
+    if stored:
+        baseline = stored['results']
+        speed = calibration / stored['calibration']
+    regressions = compare(results, baseline, args.threshold, speed)
+    for _ in range(REGRESSION_RETRIES):
+        if not regressions or args.save:
+            break
+        print(f"Rerunning {len(regressions)} benchmark(s) that look slower", file=sys.stderr)
+        regressions = compare(rerun(regressions, results, runners, calibration), baseline, args.threshold, speed)
+    
+    if args.save:
+        # Benchmarks not rerun keep their old values, rescaled to this run's calibration
+        merged = {
+            name: {'value': entry['value'] / speed if entry['unit'] == 's' else entry['value'] * speed, 'unit': entry['unit']}
+            for name, entry in baseline.items()
+        }
+        merged.update({name: {'value': value, 'unit': unit} for name, (value, unit) in results.items()})
+        with open(args.baseline, 'w') as f:
+            json.dump({
+                'python': platform.python_version(),
+                'machine': platform.machine(),
+                'calibration': calibration,
+                'results': dict(sorted(merged.items()))
+            }, f, indent=2)
+            f.write("\n")
+        print(f"Saved {len(results)} results to {args.baseline}")
+        return 0
+    
+    if regressions:
+        print(f"{len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
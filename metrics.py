@@ -0,0 +1,186 @@
+"""In-process counters and latency histograms shared by the GUI apps
+
+Recording is off unless the APP_METRICS environment variable names a JSON
+file (written when the app exits) or it is switched on from a debug menu,
+which can also save a snapshot with dump(). While off, a timed() hook costs
+one attribute check per call.
+"""
+import collections
+import functools
+import os
+import time
+
+# Histogram buckets double in width from 1 µs; the last one also holds anything slower
+HISTOGRAM_BUCKETS = 25
+
+# Environment variable that turns recording on and names the JSON file written on exit
+METRICS_ENV = "APP_METRICS"
+
+class LatencyHistogram:
+    """Call count, total, max and power-of-two microsecond buckets for one hook"""
+    
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * HISTOGRAM_BUCKETS
+    
+    def observe(self, seconds):
+        """Record one duration in seconds"""
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        self.buckets[min(HISTOGRAM_BUCKETS - 1, int(seconds * 1e6).bit_length())] += 1
+    
+    @staticmethod
+    def bucket_limit(index):
+        """Upper bound of a bucket in seconds"""
+        return (1 << index) / 1e6
+    
+    def percentile(self, fraction):
+        """Upper bound (seconds) of the bucket holding the given fraction of calls"""
+        if not self.count:
+            return 0.0
+        target = fraction * self.count
+        seen = 0
+        for index, n in enumerate(self.buckets):
+            seen += n
+            if seen >= target:
+                return min(self.bucket_limit(index), self.max)
+        return self.max
+    
+    def snapshot(self):
+        """Return the histogram as JSON-serialisable milliseconds"""
+        return {
+            'count': self.count,
+            'total_ms': round(self.total * 1000, 3),
+            'mean_ms': round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            'p50_ms': round(self.percentile(0.50) * 1000, 3),
+            'p99_ms': round(self.percentile(0.99) * 1000, 3),
+            'max_ms': round(self.max * 1000, 3),
+            'buckets_ms': {
+                f"<={self.bucket_limit(index) * 1000:g}": n
+                for index, n in enumerate(self.buckets) if n
+            }
+        }
+
+class _Timer:
+    """Context manager that records the time spent in its block"""
+    
+    def __init__(self, registry, name):
+        self.registry = registry
+        self.name = name
+    
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.registry.observe(self.name, time.perf_counter() - self.started)
+        if exc_type is not None:
+            self.registry.count(self.name + '.errors')
+        return False
+
+class _NullTimer:
+    """Shared do-nothing stand-in for _Timer while recording is off"""
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+NULL_TIMER = _NullTimer()
+
+class Metrics:
+    """Registry of named counters and latency histograms"""
+    
+    def __init__(self, enabled=False, path=None):
+        self.enabled = enabled
+        self.path = path
+        self.started = time.monotonic()
+        self.counters = collections.Counter()
+        self.histograms = collections.defaultdict(LatencyHistogram)
+    
+    @classmethod
+    def from_environment(cls):
+        """Registry that records from startup when APP_METRICS names an output file"""
+        path = os.environ.get(METRICS_ENV) or None
+        return cls(enabled=path is not None, path=path)
+    
+    def count(self, name, n=1):
+        """Add n to a counter"""
+        if self.enabled:
+            self.counters[name] += n
+    
+    def observe(self, name, seconds):
+        """Add one duration to a histogram"""
+        if self.enabled:
+            self.histograms[name].observe(seconds)
+    
+    def timer(self, name):
+        """Context manager timing a block into the histogram name"""
+        return _Timer(self, name) if self.enabled else NULL_TIMER
+    
+    def timed(self, name):
+        """Decorator timing every call of a function into the histogram name"""
+        def decorate(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                started = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                except Exception:
+                    self.counters[name + '.errors'] += 1
+                    raise
+                finally:
+                    self.histograms[name].observe(time.perf_counter() - started)
+            return wrapper
+        return decorate
+    
+    def reset(self):
+        """Forget everything recorded so far"""
+        self.started = time.monotonic()
+        self.counters.clear()
+        self.histograms.clear()
+    
+    def snapshot(self, extra=None):
+        """Return counters, histograms and any extra app values as one dict"""
+        return {
+            'enabled': self.enabled,
+            'uptime_s': round(time.monotonic() - self.started, 3),
+            'counters': dict(sorted(self.counters.items())),
+            'histograms': {name: self.histograms[name].snapshot() for name in sorted(self.histograms)},
+            'app': dict(extra or {})
+        }
+    
+    def report(self, extra=None):
+        """Format a snapshot as aligned text for a debug window"""
+        snapshot = self.snapshot(extra)
+        lines = [f"Recording: {'on' if self.enabled else 'off'}   uptime {snapshot['uptime_s']:.1f} s", ""]
+        lines.append(f"{'hook':<30} {'calls':>7} {'mean ms':>9} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+        for name, h in snapshot['histograms'].items():
+            lines.append(f"{name:<30} {h['count']:>7} {h['mean_ms']:>9.3f} {h['p50_ms']:>9.3f} {h['p99_ms']:>9.3f} {h['max_ms']:>9.3f}")
+        if not snapshot['histograms']:
+            lines.append("(no timings recorded)")
+        for title, values in (("Counters", snapshot['counters']), ("App", snapshot['app'])):
+            if values:
+                lines += ["", title]
+                lines += [f"  {name:<28} {value}" for name, value in values.items()]
+        return "\n".join(lines)
+    
+    def dump(self, path=None, extra=None):
+        """Write a snapshot as JSON to path (default: the APP_METRICS file); returns the path used"""
+        import json
+        path = path or self.path
+        if path:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(self.snapshot(extra), f, indent=2)
+                f.write("\n")
+        return path
+
+# Process-wide registry used by the timing hooks in PASSWORD.py and CALCULATOR.py
+registry = Metrics.from_environment()
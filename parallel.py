@@ -0,0 +1,40 @@
+"""Ordered fan-out of batch work to worker processes
+
+Shared by the bulk commands of PASSWORD.py and CALCULATOR.py. Callers import
+it only when a batch runs, and multiprocessing is imported only when a pool
+is actually started.
+"""
+import collections
+import itertools
+
+def bounded_imap(pool, func, tasks, window):
+    """Like Pool.imap, but never keeps more than window results in flight"""
+    pending = collections.deque()
+    for task in tasks:
+        if len(pending) >= window:
+            yield pending.popleft().get()
+        pending.append(pool.apply_async(func, (task,)))
+    while pending:
+        yield pending.popleft().get()
+
+def ordered_map(func, tasks, workers=1):
+    """Yield func(task) for every task in order, on up to workers processes
+
+    A single task is run in this process: starting the workers would cost
+    more than it saves. At most two tasks per worker are read ahead, and
+    closing the iterator stops the workers.
+    """
+    tasks = iter(tasks)
+    head = list(itertools.islice(tasks, 2 if workers > 1 else 0))
+    tasks = itertools.chain(head, tasks)
+    if len(head) < 2:
+        yield from map(func, tasks)
+        return
+
+    import multiprocessing
+    pool = multiprocessing.Pool(workers)
+    try:
+        yield from bounded_imap(pool, func, tasks, workers * 2)
+    finally:
+        pool.terminate()
+        pool.join()
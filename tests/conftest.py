@@ -0,0 +1,7 @@
+"""Make PASSWORD.py, CALCULATOR.py and metrics.py importable from the tests"""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
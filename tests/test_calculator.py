@@ -0,0 +1,190 @@
+"""Tests for CALCULATOR.py's expression engine, without the GUI"""
+
+import io
+
+import pytest
+
+import CALCULATOR
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("2+3×4", 14),
+    ("(2+3)×4", 20),
+    ("10-4-3", 3),
+    ("64÷4÷2", 8),
+    ("2^3^2", 512),
+    ("-2^2", -4),
+    ("(-2)^2", 4),
+    ("2^-1", 0.5),
+    ("2×-3", -6),
+    ("3-(-2)", 5),
+    ("--2", 2),
+    ("50%", 0.5),
+    ("200+10%", 200.1),
+    ("200×10%", 20),
+    ("5%^2", 0.0025),
+    ("1÷3", 0.33333333),
+    ("0.1+0.2", 0.3),
+    (" 1 + 2 ", 3),
+    ("1.5e3+1", 1501),
+])
+def test_precedence_and_associativity(text, expected):
+    assert CALCULATOR.evaluate_expression(text) == expected
+
+
+@pytest.mark.parametrize("text, message, position", [
+    ("", "Empty expression", 0),
+    ("2+", "Incomplete expression", 2),
+    ("(2", "Missing ')'", 2),
+    ("2)", "Unexpected ')'", 1),
+    ("()", "Unexpected ')'", 1),
+    ("×2", "Unexpected '×'", 0),
+    ("2(3)", "Unexpected '('", 1),
+    ("2$3", "Unexpected character '$'", 1),
+    ("2..3", "Invalid number '2..3'", 0),
+    ("x+1", "No value for 'x'", 0),
+])
+def test_syntax_errors_report_a_position(text, message, position):
+    with pytest.raises(CALCULATOR.ExpressionError) as error:
+        CALCULATOR.evaluate_expression(text)
+    assert str(error.value) == message
+    assert error.value.position == position
+
+
+def test_division_by_zero():
+    with pytest.raises(ZeroDivisionError):
+        CALCULATOR.evaluate_expression("1÷(2-2)")
+
+
+def test_compiled_expression_is_reusable():
+    expression = CALCULATOR.compile_expression("(x+1)×y")
+    assert set(expression.names) == {'x', 'y'}
+    assert expression.evaluate(variables={'x': 2, 'y': 3}) == 9
+    assert expression.evaluate(variables={'x': -1, 'y': 3}) == 0
+
+
+@pytest.mark.parametrize("text, precision, expected", [
+    ("2^10000", 28, "1.995063116880758384883742163E+3010"),
+    ("-2^200", 28, "-1.606938044258990275541962092E+60"),
+    ("10^30", 28, "1E+30"),
+    ("0.1^40", 28, "1E-40"),
+    ("10^27", 28, 10 ** 27),
+    ("2^100", 50, 2 ** 100),
+    ("1e3", 28, 1000),
+    ("0", 28, 0),
+])
+def test_decimal_results_never_print_uncomputed_digits(text, precision, expected):
+    assert CALCULATOR.evaluate_expression(text, CALCULATOR.MODE_DECIMAL, precision) == expected
+
+
+@pytest.mark.parametrize("text, float_result, decimal_result, fraction_result", [
+    ("0.1+0.2", 0.3, "0.3", "0.3"),
+    ("1÷3", 0.33333333, "0.3333333333333333333333333333", "1/3"),
+    ("1÷3×3", 1, "0.9999999999999999999999999999", 1),
+    ("(1÷3)^2", 0.11111111, "0.1111111111111111111111111111", "1/9"),
+    ("2^-2", 0.25, "0.25", "0.25"),
+    ("10%", 0.1, "0.1", "0.1"),
+    ("0.1×3-0.3", 0, 0, 0),
+])
+def test_arithmetic_modes(text, float_result, decimal_result, fraction_result):
+    assert CALCULATOR.evaluate_expression(text, CALCULATOR.MODE_FLOAT) == float_result
+    assert CALCULATOR.evaluate_expression(text, CALCULATOR.MODE_DECIMAL) == decimal_result
+    assert CALCULATOR.evaluate_expression(text, CALCULATOR.MODE_FRACTION) == fraction_result
+
+
+def test_decimal_precision():
+    assert CALCULATOR.evaluate_expression("1÷3", CALCULATOR.MODE_DECIMAL, 5) == "0.33333"
+    assert CALCULATOR.evaluate_expression("2^0.5", CALCULATOR.MODE_DECIMAL, 10) == "1.414213562"
+
+
+@pytest.mark.parametrize("text, error", [
+    ("2^0.5", ValueError),
+    ("2^5000", OverflowError),
+    ("1÷0", ZeroDivisionError),
+])
+def test_fraction_mode_errors(text, error):
+    with pytest.raises(error):
+        CALCULATOR.evaluate_expression(text, CALCULATOR.MODE_FRACTION)
+
+
+@pytest.mark.parametrize("text, mode, error, message", [
+    ("10^400", CALCULATOR.MODE_FLOAT, OverflowError, "Numerical result out of range"),
+    ("1e308×10", CALCULATOR.MODE_FLOAT, OverflowError, "Numerical result out of range"),
+    ("1e308×10-1e308×10", CALCULATOR.MODE_FLOAT, ValueError, "Not a number"),
+    ("(-8)^(1÷3)", CALCULATOR.MODE_FLOAT, ValueError, "Result is not a real number"),
+    ("(-8)^(1÷3)", CALCULATOR.MODE_DECIMAL, ValueError, "Result is not a real number"),
+    ("10^10^10", CALCULATOR.MODE_DECIMAL, OverflowError, "Numerical result out of range"),
+])
+def test_out_of_range_results_raise_readable_errors(text, mode, error, message):
+    with pytest.raises(error) as raised:
+        CALCULATOR.evaluate_expression(text, mode)
+    assert str(raised.value) == message
+
+
+def test_exact_float_path_matches_fractions():
+    # Fraction mode runs exact-in-float expressions on floats; the result must not change
+    from fractions import Fraction
+    expression = CALCULATOR.compile_expression("(1.5+2.25)×4-0.125÷2")
+    assert expression.evaluate(CALCULATOR.MODE_FRACTION) == Fraction(15) - Fraction(1, 16)
+
+
+def test_column_mode_matches_scalar_evaluation():
+    np = pytest.importorskip("numpy")
+    rng = np.random.default_rng(7)
+    x = rng.uniform(-100, 100, 500)
+    y = rng.uniform(0.5, 50, 500)
+    expression = CALCULATOR.compile_expression("(x+3)×y-x÷y+10%")
+    expected = [expression.evaluate(variables={'x': a, 'y': b}) for a, b in zip(x.tolist(), y.tolist())]
+    assert expression.evaluate_columns({'x': x, 'y': y}).tolist() == pytest.approx(expected, rel=1e-15)
+
+
+def test_column_mode_flags_failing_rows():
+    np = pytest.importorskip("numpy")
+    expression = CALCULATOR.compile_expression("1÷x")
+    x = np.array([2.0, 0.0, 4.0])
+    with pytest.raises(ZeroDivisionError):
+        expression.evaluate_columns({'x': x})
+    errors = np.zeros(3, dtype=np.int8)
+    result = expression.evaluate_columns({'x': x}, errors=errors)
+    assert errors.tolist() == [0, CALCULATOR.ROW_DIVIDE_BY_ZERO, 0]
+    assert result[0] == 0.5 and np.isnan(result[1]) and result[2] == 0.25
+    
+    # Printed rows fail where format_result() would: inf, and nan not coming from an empty cell
+    source = io.StringIO("x,y\n2,1\n,1\n0,1\n1e308,0\n1e308,1\n")
+    out = io.BytesIO()
+    assert CALCULATOR.evaluate_csv(source, out, CALCULATOR.compile_expression("1÷x+x×10×y")) == (5, 3)
+    assert out.getvalue().decode('utf-8').split("\n") == [
+        "20.5", "nan", "error: Cannot divide by zero!", "error: Not a number", "error: Numerical result out of range", ""
+    ]
+
+
+def test_evaluate_stream_keeps_input_order():
+    source = io.BytesIO(b"".join(b"%d+1\n" % i for i in range(25)) + b"\n1+\n")
+    out = io.BytesIO()
+    assert CALCULATOR.evaluate_stream(source, out, workers=2, chunk_lines=10) == (26, 1)
+    lines = out.getvalue().decode('utf-8').split("\n")
+    assert lines[:25] == [str(i + 1) for i in range(25)]
+    assert lines[25] == "" and lines[26].startswith("error: Incomplete expression")
+
+
+def test_single_chunk_is_evaluated_without_a_pool(monkeypatch):
+    import multiprocessing
+    
+    def no_pool(*args, **kwargs):
+        raise AssertionError("worker pool started for a single chunk")
+    monkeypatch.setattr(multiprocessing, "Pool", no_pool)
+    out = io.BytesIO()
+    assert CALCULATOR.evaluate_stream(io.BytesIO("1+2\n3×4\n".encode('utf-8')), out, workers=4) == (2, 0)
+    assert out.getvalue() == b"3\n12\n"
+
+
+@pytest.mark.parametrize("text, mode, line", [
+    ("(-8)^(1÷3)", CALCULATOR.MODE_DECIMAL, "error: Result is not a real number"),
+    ("10^400", CALCULATOR.MODE_FLOAT, "error: Numerical result out of range"),
+    ("1e308×10", CALCULATOR.MODE_FLOAT, "error: Numerical result out of range"),
+    ("1e308×10-1e308×10", CALCULATOR.MODE_FLOAT, "error: Not a number"),
+])
+def test_batch_errors_use_the_display_messages(text, mode, line):
+    out = io.BytesIO()
+    assert CALCULATOR.evaluate_stream(io.BytesIO(f"1+1\n{text}\n".encode('utf-8')), out, mode=mode) == (2, 1)
+    assert out.getvalue().decode('utf-8').split("\n") == ["2", line, ""]
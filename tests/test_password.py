@@ -0,0 +1,562 @@
+"""Tests for the headless parts of PASSWORD.py"""
+
+import collections
+import io
+import itertools
+import math
+import random
+
+import pytest
+
+import PASSWORD
+
+# Passwords the batch scorer must agree with calculate_password_strength() on
+EDGE_PASSWORDS = [
+    "", "a", "A", "7", "!", "aaaaaaaa", "Password1", "P@ssw0rd!", "correct horse battery staple",
+    "x" * 100, "Aa1!" * 4, "ÄÖÜäöü", "naïve1!", "nul\x00byte", "tab\there", "~`'\"\\/", " " * 12,
+]
+
+
+def random_passwords(count, seed):
+    rng = random.Random(seed)
+    alphabet = PASSWORD.UPPERCASE_CHARS + PASSWORD.LOWERCASE_CHARS + PASSWORD.DIGIT_CHARS + PASSWORD.SYMBOL_CHARS + " ~é"
+    return ["".join(rng.choice(alphabet) for _ in range(rng.randint(0, 24))) for _ in range(count)]
+
+
+def test_batch_scores_match_scalar_scorer():
+    pytest.importorskip("numpy")
+    passwords = EDGE_PASSWORDS + random_passwords(2000, seed=3)
+    expected = [PASSWORD.calculate_password_strength(password) for password in passwords]
+    assert PASSWORD.calculate_password_strength_batch(passwords).tolist() == expected
+    assert PASSWORD.score_passwords(passwords) == expected
+
+
+def test_batch_scores_span_chunks(monkeypatch):
+    pytest.importorskip("numpy")
+    monkeypatch.setattr(PASSWORD, "SCORE_CHUNK_SIZE", 7)
+    passwords = random_passwords(50, seed=4)
+    expected = [PASSWORD.calculate_password_strength(password) for password in passwords]
+    assert PASSWORD.calculate_password_strength_batch(passwords).tolist() == expected
+    assert PASSWORD.calculate_password_strength_batch([]).tolist() == []
+
+
+def test_batch_descriptions_match_bands():
+    pytest.importorskip("numpy")
+    scores = list(range(101))
+    descriptions, colors = PASSWORD.get_strength_description_batch(scores)
+    assert list(zip(descriptions, colors)) == [PASSWORD.get_strength_description(score) for score in scores]
+
+
+def test_incremental_strength_tracks_random_edits():
+    rng = random.Random(5)
+    alphabet = PASSWORD.LOWERCASE_CHARS[:5] + PASSWORD.UPPERCASE_CHARS[:3] + "12!? é"
+    password = ""
+    strength = PASSWORD.IncrementalStrength()
+    for _ in range(2000):
+        start = rng.randint(0, len(password))
+        end = rng.randint(start, min(len(password), start + 3))
+        inserted = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 3)))
+        strength.remove(password[start:end])
+        strength.insert(inserted)
+        password = password[:start] + inserted + password[end:]
+        assert strength.score == PASSWORD.calculate_password_strength(password), password
+
+
+def test_incremental_strength_reset():
+    strength = PASSWORD.IncrementalStrength("Tr0ub4dor&3")
+    assert strength.score == PASSWORD.calculate_password_strength("Tr0ub4dor&3")
+    strength.reset()
+    assert strength.score == 0 and not strength.frequencies
+
+
+def class_counts(password):
+    return {
+        'uppercase': sum(c in PASSWORD.UPPERCASE_CHARS for c in password),
+        'lowercase': sum(c in PASSWORD.LOWERCASE_CHARS for c in password),
+        'numbers': sum(c in PASSWORD.DIGIT_CHARS for c in password),
+        'symbols': sum(c in PASSWORD.SYMBOL_CHARS for c in password),
+    }
+
+
+@pytest.fixture(params=["rejection", "unranking"])
+def sampling_path(request, monkeypatch):
+    """Run a test through both ways of sampling a constrained policy"""
+    if request.param == "unranking":
+        monkeypatch.setattr(PASSWORD, "POLICY_REJECTION_ACCEPTANCE", 2.0)
+    PASSWORD._compile_policy.cache_clear()
+    yield request.param
+    PASSWORD._compile_policy.cache_clear()
+
+
+@pytest.mark.parametrize("options", [
+    {},
+    {'length': 7, 'min_counts': {'uppercase': 2, 'numbers': 2, 'symbols': 2}},
+    {'length': 20, 'min_counts': {'symbols': 5}, 'exclude_ambiguous': True},
+    {'length': 10, 'prefix': "ab-", 'min_counts': {'lowercase': 3}},
+    {'length': 9, 'no_repeats': True},
+    {'length': 9, 'no_repeats': True, 'prefix': "zz"},
+])
+def test_policy_output_is_valid(sampling_path, options):
+    policy = PASSWORD.Policy(**options)
+    passwords = PASSWORD.PasswordGenerator(policy=policy).generate(500)
+    minimums = dict.fromkeys(PASSWORD.Policy.CLASS_NAMES, 1)
+    minimums.update(options.get('min_counts', {}))
+    for password in passwords:
+        assert len(password) == policy.length
+        assert password.startswith(options.get('prefix', ""))
+        assert not set(password) & set(PASSWORD.AMBIGUOUS_CHARS if options.get('exclude_ambiguous') else "")
+        counts = class_counts(password)
+        assert all(counts[name] >= minimum for name, minimum in minimums.items()), password
+        if options.get('no_repeats'):
+            # The prefix is taken as given; the rule applies from its last character on
+            tail = password[max(0, len(options.get('prefix', "")) - 1):]
+            assert all(a != b for a, b in zip(tail, tail[1:])), password
+
+
+def test_no_repeats_without_prefix():
+    # Regression: Policy(no_repeats=True) with no prefix used to raise TypeError
+    assert len(PASSWORD.PasswordGenerator(policy=PASSWORD.Policy(no_repeats=True)).generate(3)) == 3
+
+
+@pytest.mark.parametrize("options", [
+    {'length': 12},
+    {'length': 10, 'prefix': "é-", 'min_counts': {'numbers': 3}},
+    {'length': 9, 'no_repeats': True, 'prefix': "zz"},
+])
+def test_buffer_records_have_a_fixed_layout(sampling_path, options):
+    policy = PASSWORD.Policy(**options)
+    prefix = options.get('prefix', "").encode('utf-8')
+    generator = PASSWORD.PasswordGenerator(policy=policy, source=PASSWORD.SeededSource("layout"))
+    stride = generator.stride
+    assert stride == len(prefix) + policy.length - len(options.get('prefix', "")) + 1
+    
+    records = generator.generate_buffer(300)
+    assert records.shape == (300, stride)
+    assert all(bytes(record[:len(prefix)]) == prefix and record[-1] == ord("\n") for record in records.tolist())
+    # Same draws as generate(), so both paths give the same passwords
+    replay = generator.with_source(PASSWORD.SeededSource("layout"))
+    assert records.obj.decode('utf-8').split("\n")[:-1] == replay.generate(300)
+    
+    # generate_into() leaves the rest of a larger buffer alone and refuses a short one
+    out = bytearray(b"#" * (5 * stride + 3))
+    generator.generate_into(out, 5)
+    assert out[5 * stride:] == b"###" and out.count(b"\n") == 5
+    with pytest.raises(ValueError, match="holds 4 records, 5 requested"):
+        generator.generate_into(bytearray(5 * stride - 1), 5)
+    assert len(generator.generate_buffer(0)) == 0
+
+
+@pytest.mark.parametrize("no_repeats", [False, True])
+def test_policy_is_uniform(sampling_path, no_repeats):
+    # Only A, B, 0 and 1 are left, so every valid password can be counted
+    exclude = "".join(c for c in PASSWORD.UPPERCASE_CHARS + PASSWORD.DIGIT_CHARS if c not in "AB01")
+    policy = PASSWORD.Policy(4, lowercase=False, symbols=False, exclude=exclude, no_repeats=no_repeats)
+    generator = PASSWORD.PasswordGenerator(policy=policy, source=PASSWORD.SeededSource("uniform"))
+    valid = {
+        "".join(chars) for chars in itertools.product("AB01", repeat=4)
+        if set(chars) & set("AB") and set(chars) & set("01")
+        and not (no_repeats and any(a == b for a, b in zip(chars, chars[1:])))
+    }
+    assert generator.distinct == len(valid)
+    
+    samples = 200 * len(valid)
+    counts = collections.Counter(generator.generate(samples))
+    assert set(counts) == valid
+    expected = samples / len(valid)
+    chi_square = sum((counts[password] - expected) ** 2 / expected for password in valid)
+    # 99.9th percentile of chi-square with fewer than 200 degrees of freedom is below 1.5 * df + 60
+    assert chi_square < 1.5 * (len(valid) - 1) + 60
+
+
+@pytest.mark.parametrize("options", [
+    {'length': 0, 'min_counts': {'uppercase': 0, 'lowercase': 0, 'numbers': 0, 'symbols': 0}},
+    {'length': 7, 'min_counts': {'uppercase': 2, 'numbers': 2, 'symbols': 2}},
+    {'length': 30, 'min_counts': {'uppercase': 0, 'symbols': 6}, 'exclude': "ABC!@#"},
+    {'length': 12, 'prefix': "Ab1", 'min_counts': {'lowercase': 4}},
+    {'length': 15, 'uppercase': False, 'symbols': False, 'min_counts': {'numbers': 9}},
+])
+def test_policy_count_matches_the_unranking_table(options):
+    compiled = PASSWORD.CompiledPolicy(*PASSWORD.Policy(**options).key())
+    assert '_suffix_counts' not in compiled.__dict__
+    assert compiled.total == compiled._suffix_counts[0][compiled.free_length]
+
+
+def test_long_policy_compiles_without_the_unranking_table():
+    compiled = PASSWORD.CompiledPolicy(*PASSWORD.Policy(1000).key())
+    assert compiled.acceptance == pytest.approx(1.0)
+    assert '_suffix_counts' not in compiled.__dict__
+    assert len(PASSWORD.PasswordGenerator(policy=PASSWORD.Policy(1000)).generate(1)[0]) == 1000
+
+
+def test_secure_passwords_use_the_given_characters():
+    for char_sets in ("abc", "ABC" + PASSWORD.DIGIT_CHARS, "x!"):
+        passwords = PASSWORD.generate_secure_passwords(12, char_sets, 200)
+        assert all(len(password) == 12 and set(password) <= set(char_sets) for password in passwords)
+        # Every character type present in char_sets shows up in every password
+        types = {name for name, count in class_counts(char_sets).items() if count}
+        assert all({name for name, count in class_counts(password).items() if count} == types for password in passwords)
+    assert PASSWORD.generate_secure_passwords(12, "", 2) == ["", ""]
+    with pytest.raises(ValueError, match="Unsupported characters"):
+        PASSWORD.generate_secure_passwords(12, "abc ", 1)
+
+
+def wait_for(condition, timeout=5):
+    import time
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.001)
+
+
+def test_pool_producer_recovers_from_a_failed_batch(monkeypatch):
+    batch = PASSWORD._generate_and_assess_batch
+    calls = []
+    
+    def fail_once(*args):
+        calls.append(args)
+        if len(calls) == 1:
+            raise ValueError("bad word count")
+        return batch(*args)
+    monkeypatch.setattr(PASSWORD, "_generate_and_assess_batch", fail_once)
+    
+    pool = PASSWORD.PasswordPool(capacity=4, batch_size=2)
+    pool.set_policy((12, PASSWORD.LOWERCASE_CHARS, False, 0))
+    wait_for(lambda: pool._thread is None)
+    # The producer's error reaches the caller once, and a new producer refills the pool
+    with pytest.raises(ValueError, match="bad word count"):
+        pool.pop()
+    wait_for(lambda: len(pool) == 4)
+    password, (score, label, color), breach = pool.pop()
+    assert len(password) == 12 and set(password) <= set(PASSWORD.LOWERCASE_CHARS)
+    assert pool.hits == 1
+
+
+def test_seeded_source_replays_and_streams_differ():
+    assert PASSWORD.SeededSource("seed")(64) == PASSWORD.SeededSource("seed")(64)
+    source = PASSWORD.SeededSource("seed")
+    assert source(64) != source(64)
+    assert PASSWORD.SeededSource("seed")(64) != PASSWORD.SeededSource("seed").spawn(1)(64)
+    assert PASSWORD.SeededSource("seed")(64) != PASSWORD.SeededSource("other")(64)
+
+
+def stream(workers, seed="bench", count=1000, block_size=100):
+    out = io.BytesIO()
+    PASSWORD.stream_passwords(out, count, {'length': 12}, workers=workers, block_size=block_size, seed=seed)
+    return out.getvalue()
+
+
+def test_seeded_stream_is_independent_of_workers():
+    single = stream(workers=1)
+    assert single.count(b"\n") == 1000
+    assert stream(workers=2) == single
+    assert stream(workers=1, seed="other") != single
+    # Every block draws from its own stream, so no two blocks repeat each other
+    blocks = [single[offset:offset + 1300] for offset in range(0, len(single), 1300)]
+    assert len(set(blocks)) == len(blocks) == 10
+
+
+def test_single_block_is_generated_without_a_pool(monkeypatch):
+    import multiprocessing
+    
+    def no_pool(*args, **kwargs):
+        raise AssertionError("worker pool started for a single block")
+    monkeypatch.setattr(multiprocessing, "Pool", no_pool)
+    assert stream(workers=4, count=50).count(b"\n") == 50
+
+
+def service_exchange(*requests):
+    """Send raw HTTP requests to an in-process service and return the raw replies"""
+    import asyncio
+    
+    async def run():
+        batcher = PASSWORD.RequestBatcher(PASSWORD.ServiceStats())
+        batcher.start()
+        server = await asyncio.start_server(lambda r, w: PASSWORD._serve_connection(batcher, r, w), "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        replies = []
+        async with server:
+            for request in requests:
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+                writer.write(request)
+                await writer.drain()
+                replies.append(await asyncio.wait_for(reader.read(), 5))
+                writer.close()
+        return replies
+    return asyncio.run(run())
+
+
+def post_score(body):
+    return b"POST /score HTTP/1.1\r\nConnection: close\r\nContent-Length: %d\r\n\r\n%s" % (len(body), body)
+
+
+def test_audit_is_independent_of_chunks_and_workers(tmp_path):
+    passwords = random_passwords(400, seed=11)
+    passwords[7] = passwords[250] = ""
+    path = tmp_path / "passwords.txt"
+    # A CRLF line and no newline after the last one
+    path.write_bytes("\n".join(passwords[:-1]).encode('utf-8') + b"\r\n" + passwords[-1].encode('utf-8'))
+    scores = [PASSWORD.calculate_password_strength(password) if password else None for password in passwords]
+    weakest = sorted((score, line, password) for line, (score, password) in enumerate(zip(scores, passwords), 1) if password)[:10]
+    
+    for workers, chunk_bytes in ((1, 1 << 20), (1, 100), (2, 100)):
+        scores_out = io.BytesIO()
+        lines, histogram, lowest = PASSWORD.audit_password_file(path, workers, 10, scores_out, chunk_bytes)
+        assert lines == len(passwords)
+        assert histogram == collections.Counter(score for score in scores if score is not None)
+        assert lowest == weakest
+        assert scores_out.getvalue().decode('ascii').split("\n")[:-1] == ["" if score is None else str(score) for score in scores]
+
+
+def test_service_rejects_malformed_requests():
+    replies = service_exchange(
+        b"GARBAGE\r\n\r\n",
+        b"POST /score HTTP/1.1\r\nContent-Length: ten\r\n\r\n",
+        b"POST /score HTTP/1.1\r\nContent-Length: -1\r\n\r\n",
+        post_score(b'["hunter2"]'),
+        post_score(b'{"passwords": "hunter2"}'),
+        post_score(b'{"passwords": [1]}'),
+        post_score(b'{not json'),
+        post_score(b''),
+    )
+    for reply in replies:
+        assert reply.startswith(b"HTTP/1.1 400 Bad Request\r\n"), reply
+
+
+def test_service_rejects_out_of_range_policies():
+    def generate(query):
+        return b"GET /generate?%s HTTP/1.1\r\nConnection: close\r\n\r\n" % query.encode('ascii')
+    queries = [
+        f"length={PASSWORD.SERVICE_MAX_LENGTH + 1}",
+        "length=0",
+        "length=-5",
+        f"count={PASSWORD.SERVICE_MAX_COUNT + 1}",
+        "count=-1",
+        "min_symbols=-1",
+        f"length=64&min_symbols={PASSWORD.SERVICE_MAX_MINIMUMS}",
+        "length=64&no_repeats=1&min_numbers=3&min_symbols=3&min_uppercase=3",
+    ]
+    replies = service_exchange(*map(generate, queries))
+    for query, reply in zip(queries, replies):
+        assert reply.startswith(b"HTTP/1.1 400 Bad Request\r\n"), query
+    
+    # The limits themselves are accepted
+    ok, = service_exchange(generate(f"length={PASSWORD.SERVICE_MAX_LENGTH}&count=2&min_symbols=5"))
+    assert ok.startswith(b"HTTP/1.1 200 OK\r\n")
+
+
+def test_service_scores_and_generates():
+    import json
+    score, generate = service_exchange(
+        post_score(b'{"passwords": ["hunter2", "Tr0ub4dor&3"]}'),
+        b"GET /generate?count=3&length=20 HTTP/1.1\r\nConnection: close\r\n\r\n",
+    )
+    assert score.startswith(b"HTTP/1.1 200 OK\r\n")
+    scores = json.loads(score.split(b"\r\n\r\n", 1)[1])['scores']
+    assert scores == [PASSWORD.calculate_password_strength(p) for p in ("hunter2", "Tr0ub4dor&3")]
+    assert generate.startswith(b"HTTP/1.1 200 OK\r\n")
+    passwords = json.loads(generate.split(b"\r\n\r\n", 1)[1])['passwords']
+    assert len(passwords) == 3 and all(len(p) == 20 for p in passwords)
+
+
+def test_fingerprint_set_round_trip(tmp_path):
+    unique = PASSWORD.FingerprintSet(expected=10, settings=PASSWORD._dedup_settings('password', 8))
+    passwords = PASSWORD.PasswordGenerator(8).generate(5000, unique=unique)
+    assert len(set(passwords)) == 5000 == len(unique)
+    assert not unique.add(passwords[0]) and passwords[-1] in unique
+    
+    path = tmp_path / "seen.fp"
+    unique.save(path)
+    loaded = PASSWORD.FingerprintSet.load(path)
+    assert loaded.key == unique.key and loaded.settings == unique.settings and len(loaded) == 5000
+    assert all(password in loaded for password in passwords)
+
+
+def small_index():
+    return PASSWORD.StrengthIndex.build([
+        ('passwords', ["password", "dragon"]),
+        ('english', ["horse", "battery", "staple", "correct", "pass"]),
+    ])
+
+
+def test_strength_index_finds_overlapping_words():
+    index = small_index()
+    assert sorted(index.find("xpasswordhorse")) == [
+        (1, 4, 5, 'english'), (1, 8, 1, 'passwords'), (9, 13, 1, 'english'),
+    ]
+    assert list(index.find("zzz")) == []
+
+
+def test_strength_index_save_and_load(tmp_path):
+    index = small_index()
+    path = tmp_path / "strength.bin"
+    index.save(path)
+    loaded = PASSWORD.StrengthIndex.load(path)
+    assert loaded.list_names == index.list_names
+    for name in PASSWORD.StrengthIndex.ARRAY_NAMES:
+        assert getattr(loaded, name) == getattr(index, name), name
+    assert list(loaded.find("correcthorsebatterystaple")) == list(index.find("correcthorsebatterystaple"))
+    
+    (tmp_path / "other.bin").write_bytes(b"\0" * 64)
+    with pytest.raises(ValueError, match="not a strength index"):
+        PASSWORD.StrengthIndex.load(tmp_path / "other.bin")
+
+
+@pytest.mark.parametrize("password, pattern", [
+    ("aaaaaaaa", 'repeat'),
+    ("abcdefgh", 'sequence'),
+    ("87654321", 'sequence'),
+    ("qwertyui", 'keyboard'),
+    ("1987", 'date'),
+    ("12/05/1987", 'date'),
+    ("password", 'passwords'),
+])
+def test_estimator_finds_patterns(password, pattern):
+    result = PASSWORD.estimate_password_strength(password, small_index())
+    assert result['sequence'] == [(pattern, password)]
+    # Every pattern is far cheaper than brute-forcing the same characters
+    classes = {PASSWORD._char_class(char) for char in password}
+    bruteforce = len(password) * math.log2(sum(PASSWORD.BRUTEFORCE_CARDINALITY[name] for name in classes))
+    assert result['bits'] < bruteforce / 2
+    assert result['score'] == min(int(result['bits']), 100)
+
+
+def test_estimator_penalties():
+    words = [f"filler{rank}" for rank in range(999)] + ["sunshine"]
+    index = PASSWORD.StrengthIndex.build([('english', words)])
+    
+    def bits(password):
+        return PASSWORD.estimate_password_strength(password, index)['bits']
+    plain = bits("sunshine")
+    assert plain == pytest.approx(math.log2(1000))
+    # Capitalisation and each l33t substitution add guesses on top of the word's rank
+    assert bits("Sunshine") == pytest.approx(plain + 1)
+    assert bits("sun5hine") == pytest.approx(plain + 1)
+    assert bits("5un5hine") == pytest.approx(plain + 2)
+    # Uncovered characters are brute-forced over the classes present
+    assert bits("sunshine!") == pytest.approx(plain + math.log2(26 + 33))
+    assert PASSWORD.estimate_password_strength("", index) == {'guesses': 1, 'bits': 0.0, 'score': 0, 'sequence': []}
+
+
+def build_corpus(tmp_path, lines, plaintext=False, **options):
+    source = tmp_path / "breach.txt"
+    source.write_bytes(b"".join(lines))
+    index = tmp_path / "breach.idx"
+    count = PASSWORD.build_breach_index(source, index, plaintext=plaintext, **options)
+    return count, PASSWORD.BreachCorpus(index)
+
+
+def test_breach_corpus_reads_both_formats(tmp_path):
+    import hashlib
+    passwords = ["hunter2", "hunter2", "letmein", "hunter2", "Tr0ub4dor&3", "naïve"]
+    count, plain = build_corpus(tmp_path, [p.encode('utf-8') + b"\r\n" for p in passwords] + [b"\n"], plaintext=True)
+    assert count == 4
+    assert plain.lookup_batch(["hunter2", "letmein", "naïve", "missing"]) == [3, 1, 1, 0]
+    plain.close()
+    
+    counts = collections.Counter(hashlib.sha1(p.encode('utf-8')).hexdigest().upper() for p in passwords)
+    lines = [f"{digest}:{counts[digest]}\r\n".encode('ascii') for digest in sorted(counts)]
+    _, hibp = build_corpus(tmp_path, lines)
+    assert [hibp.lookup(p) for p in passwords] == [passwords.count(p) for p in passwords]
+    assert hibp.lookup("missing") == 0
+    hibp.close()
+
+
+def test_breach_corpus_fanout_edges(tmp_path):
+    # First and last two-byte buckets, and several records sharing one bucket
+    digests = sorted([b"\x00" * 20, b"\x00\x00" + b"\x01" * 18, b"\x12\x34" + b"\x00" * 18,
+                      b"\x12\x34" + b"\x80" * 18, b"\x12\x34" + b"\xff" * 18, b"\xff" * 20])
+    lines = [f"{digest.hex()}:{n + 1}\n".encode('ascii') for n, digest in enumerate(digests)]
+    _, corpus = build_corpus(tmp_path, lines)
+    assert [corpus.lookup_digest(digest) for digest in digests] == [1, 2, 3, 4, 5, 6]
+    
+    # Absent digests next to present ones, with the Bloom filter bypassed so the search itself is tested
+    corpus._maybe_contains = lambda digest: True
+    for absent in (b"\x00" * 19 + b"\x01", b"\x12\x34" + b"\x40" * 18, b"\x12\x35" + b"\x00" * 18, b"\xff" * 19 + b"\xfe"):
+        assert corpus.lookup_digest(absent) == 0
+    corpus.close()
+
+
+def test_breach_bloom_filter_rejects_most_absent_passwords(tmp_path):
+    import hashlib
+    present = [f"password{n}" for n in range(2000)]
+    _, corpus = build_corpus(tmp_path, [p.encode('ascii') + b"\n" for p in present], plaintext=True)
+    assert all(corpus._maybe_contains(hashlib.sha1(p.encode('ascii')).digest()) for p in present)
+    absent = [hashlib.sha1(f"absent{n}".encode('ascii')).digest() for n in range(5000)]
+    false_positives = sum(map(corpus._maybe_contains, absent))
+    assert false_positives < 5000 * PASSWORD.BREACH_FALSE_POSITIVE_RATE * 2
+    corpus.close()
+
+
+def test_breach_index_rejects_bad_input(tmp_path):
+    with pytest.raises(ValueError, match="sorted"):
+        build_corpus(tmp_path, [b"ff" * 20 + b":1\n", b"00" * 20 + b":1\n"])
+    with pytest.raises(ValueError, match="SHA-1"):
+        build_corpus(tmp_path, [b"abcd:1\n"])
+    (tmp_path / "other.idx").write_bytes(b"\0" * PASSWORD.BREACH_HEADER.size)
+    with pytest.raises(ValueError, match="not a breach index"):
+        PASSWORD.BreachCorpus(tmp_path / "other.idx")
+
+
+def test_wordlist_index_round_trip(tmp_path):
+    # EFF dice-number lines and plain lines, with a duplicate and a non-ASCII word
+    source = tmp_path / "words.txt"
+    source.write_text("11111\tabacus\n11112 abdomen\n\nzebra\nabacus\ncafé\n", encoding='utf-8')
+    index = tmp_path / "words.idx"
+    assert PASSWORD.build_wordlist_index(source, index) == 4
+    
+    wordlist = PASSWORD.Wordlist.open(index)
+    assert len(wordlist) == 4
+    assert [wordlist[i] for i in range(4)] == ["abacus", "abdomen", "zebra", "café"]
+    for bad in (-1, 4):
+        with pytest.raises(IndexError):
+            wordlist[bad]
+    
+    (tmp_path / "other.idx").write_bytes(b"\0" * 64)
+    with pytest.raises(ValueError, match="not a wordlist index"):
+        PASSWORD.Wordlist.open(tmp_path / "other.idx")
+
+
+def test_passphrase_generator():
+    words = [f"word{n}" for n in range(7)]
+    generator = PASSWORD.PassphraseGenerator(3, "_", PASSWORD.Wordlist.from_words(words), PASSWORD.SeededSource("words"))
+    assert generator.entropy_bits == pytest.approx(3 * math.log2(7))
+    assert generator.distinct == 7 ** 3
+    
+    passphrases = generator.generate(7000)
+    assert all(len(passphrase.split("_")) == 3 for passphrase in passphrases)
+    # Word indices are unbiased even though 7 does not divide 2**32
+    counts = collections.Counter(word for passphrase in passphrases for word in passphrase.split("_"))
+    assert set(counts) == set(words)
+    assert all(abs(count - 3000) < 250 for count in counts.values()), counts
+    
+    for bad in (0, -2):
+        with pytest.raises(ValueError, match="at least one word"):
+            PASSWORD.PassphraseGenerator(bad)
+
+
+def test_dedup_file_only_accepts_its_own_settings(tmp_path, capsys):
+    dedup = str(tmp_path / "seen.fp")
+    out = str(tmp_path / "out.txt")
+    for _ in range(2):
+        assert PASSWORD.run_generate_cli(["--count", "100", "--length", "6", "--dedup-file", dedup, "--out", out]) == 0
+    assert len(PASSWORD.FingerprintSet.load(dedup)) == 200
+    
+    with pytest.raises(SystemExit):
+        PASSWORD.run_generate_cli(["--count", "100", "--length", "7", "--dedup-file", dedup, "--out", out])
+    assert "filled with different settings" in capsys.readouterr().err
+    with pytest.raises(SystemExit):
+        PASSWORD.run_passphrase_cli(["--count", "5", "--dedup-file", dedup, "--out", out])
+    assert "filled with different settings" in capsys.readouterr().err
+
+
+def test_list_chunks_score_like_the_strength_display():
+    block, scores = PASSWORD._generate_list_chunk(0, "", 5, 20)
+    passphrases = block.decode('utf-8').split("\n")[:-1]
+    assert len(passphrases) == 20
+    assert scores == [PASSWORD.assess_strength(passphrase, passphrase_words=5)[0] for passphrase in passphrases]
+    
+    char_sets = PASSWORD.LOWERCASE_CHARS[:6] + PASSWORD.DIGIT_CHARS
+    block, scores = PASSWORD._generate_list_chunk(14, char_sets, 0, 50)
+    passwords = block.decode('utf-8').split("\n")[:-1]
+    assert all(len(password) == 14 and set(password) <= set(char_sets) for password in passwords)
+    assert list(scores) == [PASSWORD.calculate_password_strength(password) for password in passwords]